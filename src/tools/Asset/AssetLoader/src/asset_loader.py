@@ -2,7 +2,7 @@
 
 # Can't find PySide6 modules pylint: disable=I1101
 
-__version__ = "1.0.0"
+__version__ = "1.4.0"
 
 from functools import partial
 import logging
@@ -17,6 +17,8 @@ from Core import maya_start as ms
 from Core.ui.UIUtilTools.src import pyside_util_tools as put
 from Core.util import project_util_tools as prj
 
+from Asset.AssetManager.src.gui import asset_widget_item as awi
+
 from .gui import asset_loader_utils
 from .gui import asset_selection_utils as asu
 
@@ -87,6 +89,9 @@ class AssetLoader(QtWidgets.QMainWindow):
             self.project_configs["asset_publish_preview_regex"]
         )
 
+        # Low-res variant used as the proxy of referenced assets
+        self.proxy_variant = self.project_configs.get("asset_proxy_variant", "Proxy")
+
         # Other important information
         self.current_cg_project_path = MAIN_PATHS["cg_path"]
 
@@ -113,43 +118,29 @@ class AssetLoader(QtWidgets.QMainWindow):
             partial(asu.on_version_change, self)
         )
         self.root.btn_load_asset.clicked.connect(self.load_asset)
+        self.root.btn_load_selected_refs.clicked.connect(
+            partial(self.load_deferred_references, False)
+        )
+        self.root.btn_load_visible_refs.clicked.connect(
+            partial(self.load_deferred_references, True)
+        )
+        self.root.radio_reference.toggled.connect(self.update_reference_options)
 
     def closeEvent(self) -> None:  # Qt Override pylint:disable=C0103
         self.deleteLater()
 
     def load_asset(self) -> bool:
-        selected_item = asu.get_selected_asset_widget_item(
-            self.root.list_asset_previews
-        )
-        selected_variant = self.root.cbo_variations.currentText()
-        selected_version = self.root.cbo_versions.currentText()
-        asset_namespace = selected_item.get_valkyrie_asset().get_asset_name().upper()
-
-        published_file_path = selected_item.get_published_maya_files(selected_variant)[
-            selected_version
-        ]["maya_file"]
-
-        if not os.path.exists(published_file_path):
-            LOG.error("No valid published file found at path: %s", published_file_path)
+        load_requests = self.get_load_requests()
+        if not load_requests:
+            LOG.error("No valid published files selected to load.")
             return False
 
-        load_success = False
-        if self.root.radio_reference.isChecked():
-            load_success = asset_loading_handler.reference_asset(
-                selected_item.get_valkyrie_asset().get_asset_category(),
-                published_file_path,
-                asset_namespace,
-                self.root.spin_load_count.value(),
-                True,
-            )
-        else:
-            load_success = asset_loading_handler.import_asset(
-                selected_item.get_valkyrie_asset().get_asset_category(),
-                published_file_path,
-                asset_namespace,
-                self.root.spin_load_count.value(),
-                True,
-            )
+        load_success = asset_loading_handler.load_assets(
+            load_requests,
+            self.get_load_method(),
+            True,
+            self.root.chk_deferred.isChecked(),
+        )
 
         if not load_success:
             LOG.error("Failed to load assets. See log for details.")
@@ -157,6 +148,127 @@ class AssetLoader(QtWidgets.QMainWindow):
 
         return True
 
+    def get_load_method(self) -> asset_loading_handler.LoadMethod:
+        if self.root.radio_import.isChecked():
+            return asset_loading_handler.LoadMethod.IMPORT
+        if self.root.radio_instance.isChecked():
+            return asset_loading_handler.LoadMethod.INSTANCE
+        if self.root.radio_gpu_cache.isChecked():
+            return asset_loading_handler.LoadMethod.GPU_CACHE
+        return asset_loading_handler.LoadMethod.REFERENCE
+
+    def get_load_requests(self) -> list:
+        """Build load requests for every selected asset.
+
+        The current asset uses the variant and version chosen in the UI. Other
+        selected assets use the same variant when available, otherwise their default
+        variant, and their latest published version.
+
+        Returns:
+            list(AssetLoadRequest): Load requests for the selected assets.
+        """
+        current_item = self.root.list_asset_previews.currentItem()
+        selected_variant = self.root.cbo_variations.currentText()
+        selected_version = self.root.cbo_versions.currentText()
+
+        load_requests = []
+        for selected_item in asu.get_selected_asset_widget_items(
+            self.root.list_asset_previews
+        ):
+            valkyrie_asset = selected_item.get_valkyrie_asset()
+            variant_names = list(selected_item.get_variation_names())
+            load_variant = selected_variant
+            if load_variant not in variant_names:
+                load_variant = asu.get_default_variant(variant_names)
+
+            published_versions = selected_item.get_published_maya_files(load_variant)
+            load_version = selected_version
+            if selected_item is not current_item:
+                load_version = asu.get_latest_version(published_versions)
+
+            if load_version not in published_versions:
+                LOG.warning(
+                    "No published %s version found for %s.",
+                    load_variant,
+                    valkyrie_asset.get_asset_name(),
+                )
+                continue
+
+            published_file_path = published_versions[load_version]["maya_file"]
+            if not os.path.exists(published_file_path):
+                LOG.error(
+                    "No valid published file found at path: %s", published_file_path
+                )
+                continue
+
+            load_requests.append(
+                asset_loading_handler.AssetLoadRequest(
+                    valkyrie_asset.get_asset_category(),
+                    published_file_path,
+                    valkyrie_asset.get_asset_name().upper(),
+                    self.root.spin_load_count.value(),
+                    self.get_proxy_file_path(selected_item, load_variant),
+                    published_versions[load_version]["gpu_cache"],
+                )
+            )
+
+        return load_requests
+
+    def get_proxy_file_path(
+        self, selected_item: awi.AssetWidgetItem, load_variant: str
+    ) -> str:
+        """Get latest published proxy variant file of an asset.
+
+        Args:
+            selected_item (awi.AssetWidgetItem): Asset widget item to load.
+            load_variant (str): Variant being loaded.
+
+        Returns:
+            str: Path to proxy file if proxies are requested and published.
+                Otherwise, an empty string.
+        """
+        if not self.root.chk_proxy.isChecked() or load_variant == self.proxy_variant:
+            return ""
+
+        if self.proxy_variant not in selected_item.get_variation_names():
+            LOG.warning(
+                "No %s variant found for %s. Loading without proxy.",
+                self.proxy_variant,
+                selected_item.asset_name,
+            )
+            return ""
+
+        proxy_versions = selected_item.get_published_maya_files(self.proxy_variant)
+        latest_proxy_version = asu.get_latest_version(proxy_versions)
+        if not latest_proxy_version:
+            return ""
+
+        return proxy_versions[latest_proxy_version]["maya_file"]
+
+    def load_deferred_references(self, visible_only: bool = False) -> int:
+        """Load deferred references and switch proxies to high-res.
+
+        Args:
+            visible_only (bool, optional): Use references of visible nodes instead of
+                the current selection. Defaults to False.
+
+        Returns:
+            int: Number of references loaded.
+        """
+        reference_nodes = asset_loading_handler.get_selected_reference_nodes()
+        if visible_only:
+            reference_nodes = asset_loading_handler.get_visible_reference_nodes()
+
+        if not reference_nodes:
+            LOG.warning("No references found to load.")
+            return 0
+
+        return asset_loading_handler.load_references(reference_nodes)
+
+    def update_reference_options(self, is_reference: bool) -> None:
+        self.root.chk_deferred.setEnabled(is_reference)
+        self.root.chk_proxy.setEnabled(is_reference)
+
 
 def run_maya() -> AssetLoader:
     """Run tool in maya."""
@@ -55,7 +55,7 @@ def on_asset_selection(
 
 
 def on_variation_change(tool_object: AssetLoader, selected_variant: str) -> None:
-    selected_item = tool_object.root.list_asset_previews.selectedItems()[0]
+    selected_item = tool_object.root.list_asset_previews.currentItem()
     if selected_item is None:
         return
     update_asset_versions(
@@ -64,7 +64,7 @@ def on_variation_change(tool_object: AssetLoader, selected_variant: str) -> None
 
 
 def on_version_change(tool_object: AssetLoader, selected_version: str) -> None:
-    selected_item = tool_object.root.list_asset_previews.selectedItems()[0]
+    selected_item = tool_object.root.list_asset_previews.currentItem()
     if selected_item is None:
         return
     selected_variant = tool_object.root.cbo_variations.currentText()
@@ -130,3 +130,23 @@ def get_selected_asset_widget_item(list_widget: QListWidget) -> awi.AssetWidgetI
     if not isinstance(selected_item, awi.AssetWidgetItem):
         return None
     return selected_item
+
+
+def get_selected_asset_widget_items(list_widget: QListWidget) -> list:
+    return [
+        selected_item
+        for selected_item in list_widget.selectedItems()
+        if isinstance(selected_item, awi.AssetWidgetItem)
+    ]
+
+
+def get_default_variant(variant_names: list) -> str:
+    if "Base" in variant_names:
+        return "Base"
+    return variant_names[0] if variant_names else ""
+
+
+def get_latest_version(published_versions: dict) -> str:
+    if not published_versions:
+        return ""
+    return sorted(published_versions.keys())[-1]
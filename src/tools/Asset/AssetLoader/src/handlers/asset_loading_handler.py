@@ -3,14 +3,21 @@
 # Can't find PySide6 modules pylint: disable=I1101
 
 from __future__ import annotations
+from dataclasses import dataclass
+from enum import Enum
 import logging
 import os
+from pathlib import PurePath
+from typing import Dict, List
 
-from maya import cmds
+from maya import cmds, mel
 
 from Core import core_paths as cpath
 
+from Asset.AssetManager.src.util import asset_categories as acat
+
 from Util.UtilTools.src import outliner_utils
+from Util.UtilTools.src import util_tools
 
 
 # Main paths
@@ -24,9 +31,37 @@ RSRC_PATH = f"{MODULE_PATH}/resources"
 NO_PREVIEW_IMAGE_PATH = f"{RSRC_PATH}/images/No_preview.png"
 ASSET_WIDGET_UI_PATH = f"{RSRC_PATH}/ui/asset_widget.ui"
 
+# Proxy tags used when switching between published low/high-res variants
+PROXY_TAG_LOW = "low"
+PROXY_TAG_HIGH = "high"
+
+# Message attribute linking a deferred reference's locator to its reference node
+DEFERRED_REFERENCE_ATTRIBUTE = "deferredReference"
+
 LOG = logging.getLogger(os.path.basename(__file__))
 
 
+class LoadMethod(Enum):
+    """Ways a published asset can be brought into the scene."""
+
+    REFERENCE = "reference"
+    IMPORT = "import"
+    INSTANCE = "instance"
+    GPU_CACHE = "gpu_cache"
+
+
+@dataclass
+class AssetLoadRequest:
+    """Single published asset file to load into the scene."""
+
+    asset_category: str
+    asset_file_path: str
+    load_namespace: str
+    load_count: int = 1
+    proxy_file_path: str = ""
+    gpu_cache_path: str = ""
+
+
 def reference_asset(
     asset_category: str,
     asset_file_path: str,
@@ -34,26 +69,10 @@ def reference_asset(
     load_count: int,
     organize: bool = False,
 ) -> bool:
-    if not os.path.exists(asset_file_path):
-        LOG.error("Asset file path invalid at: %s", asset_file_path)
-        return False
-
-    for _ in range(load_count):
-        new_nodes = cmds.file(
-            asset_file_path,
-            ignoreVersion=True,
-            mergeNamespacesOnClash=False,
-            groupLocator=True,
-            namespace=load_namespace,
-            options="v=0",
-            preserveReferences=True,
-            returnNewNodes=True,
-            r=True,
-        )
-        if organize:
-            organize_loaded_asset(asset_category, new_nodes)
-
-    return True
+    load_request = AssetLoadRequest(
+        asset_category, asset_file_path, load_namespace, load_count
+    )
+    return load_assets([load_request], LoadMethod.REFERENCE, organize)
 
 
 def import_asset(
@@ -63,59 +82,522 @@ def import_asset(
     load_count: int,
     organize: bool = False,
 ) -> bool:
-    if not os.path.exists(asset_file_path):
-        LOG.error("Asset file path invalid at: %s", asset_file_path)
-        return False
-
-    for _ in range(load_count):
-        new_nodes = cmds.file(
-            asset_file_path,
-            ignoreVersion=True,
-            mergeNamespacesOnClash=False,
-            groupLocator=True,
-            namespace=load_namespace,
-            options="v=0",
-            preserveReferences=True,
-            returnNewNodes=True,
-            i=True,
+    load_request = AssetLoadRequest(
+        asset_category, asset_file_path, load_namespace, load_count
+    )
+    return load_assets([load_request], LoadMethod.IMPORT, organize)
+
+
+def load_assets(
+    load_requests: List[AssetLoadRequest],
+    load_method: LoadMethod = LoadMethod.REFERENCE,
+    organize: bool = False,
+    defer_load: bool = False,
+) -> bool:
+    """Load many published asset files in one batch operation.
+
+    Viewport refresh and undo are suspended for the whole batch. When organizing, the
+    shot tree is created once and every top node is parented with a single
+    cmds.parent call per outliner group.
+
+    Deferred references are created unloaded and are organized once they're loaded
+    with load_references. Requests with a proxy file reference the low-res proxy and
+    register the requested file as the high-res proxy of the same reference.
+
+    Instanced requests import each file once and create the remaining load count as
+    Maya instances of the loaded top node. GPU cache requests create gpuCache nodes
+    pointing at the request's published GPU cache file.
+
+    Args:
+        load_requests (List[AssetLoadRequest]): Asset files to load.
+        load_method (LoadMethod, optional): How to bring the files into the scene.
+            Defaults to LoadMethod.REFERENCE.
+        organize (bool, optional): Parent loaded top nodes into their category
+            outliner groups. Defaults to False.
+        defer_load (bool, optional): Create references unloaded. Only used when
+            referencing. Defaults to False.
+
+    Returns:
+        bool: True if every requested file was loaded. Otherwise, False.
+    """
+    all_loaded = True
+    loaded_assets = []
+    as_reference = load_method == LoadMethod.REFERENCE
+
+    with util_tools.suspend_scene_updates():
+        for load_request in load_requests:
+            if not os.path.exists(load_request.asset_file_path):
+                LOG.error(
+                    "Asset file path invalid at: %s", load_request.asset_file_path
+                )
+                all_loaded = False
+                continue
+
+            if load_method == LoadMethod.INSTANCE:
+                loaded_assets.extend(instance_asset(load_request))
+                continue
+
+            if load_method == LoadMethod.GPU_CACHE:
+                if not os.path.exists(load_request.gpu_cache_path):
+                    LOG.error(
+                        "No published GPU cache found for: %s",
+                        load_request.asset_file_path,
+                    )
+                    all_loaded = False
+                    continue
+
+                for _ in range(load_request.load_count):
+                    new_nodes = load_gpu_cache(
+                        load_request.gpu_cache_path, load_request.load_namespace
+                    )
+                    loaded_assets.append((load_request.asset_category, new_nodes))
+                continue
+
+            use_proxy = as_reference and bool(load_request.proxy_file_path)
+            load_file_path = load_request.asset_file_path
+            if use_proxy:
+                load_file_path = load_request.proxy_file_path
+
+            for _ in range(load_request.load_count):
+                if as_reference and defer_load:
+                    reference_node = create_deferred_reference(
+                        load_file_path, load_request.load_namespace
+                    )
+                else:
+                    new_nodes = load_asset_file(
+                        load_file_path, load_request.load_namespace, as_reference
+                    )
+                    loaded_assets.append((load_request.asset_category, new_nodes))
+                    if not use_proxy or not new_nodes:
+                        continue
+                    reference_node = cmds.referenceQuery(
+                        new_nodes[0], referenceNode=True
+                    )
+
+                if use_proxy:
+                    add_proxy_reference(reference_node, load_request.asset_file_path)
+
+        if organize:
+            organize_loaded_assets(loaded_assets)
+
+    LOG.info("Loaded %s asset(s).", len(loaded_assets))
+
+    return all_loaded
+
+
+def load_asset_file(
+    asset_file_path: str, load_namespace: str, as_reference: bool = True
+) -> list:
+    """Reference or import a single asset file.
+
+    Args:
+        asset_file_path (str): Path to published asset file.
+        load_namespace (str): Namespace to load the asset under.
+        as_reference (bool, optional): Reference file instead of importing it.
+            Defaults to True.
+
+    Returns:
+        list: New nodes created by the load.
+    """
+    load_type = {"r": True} if as_reference else {"i": True}
+
+    return cmds.file(
+        asset_file_path,
+        ignoreVersion=True,
+        mergeNamespacesOnClash=False,
+        groupLocator=True,
+        namespace=load_namespace,
+        options="v=0",
+        preserveReferences=True,
+        returnNewNodes=True,
+        **load_type,
+    )
+
+
+def instance_asset(load_request: AssetLoadRequest) -> List[tuple]:
+    """Import an asset file once and instance its top node for the load count.
+
+    Each instance gets its own namespace following Maya's clash numbering i.e.
+    PROP, PROP1, PROP2 so instances can be organized like separately loaded assets.
+
+    Args:
+        load_request (AssetLoadRequest): Asset file to load.
+
+    Returns:
+        list: (asset category, nodes) tuples of the loaded asset and its instances.
+    """
+    new_nodes = load_asset_file(
+        load_request.asset_file_path, load_request.load_namespace, False
+    )
+    loaded_assets = [(load_request.asset_category, new_nodes)]
+
+    top_node = get_loaded_asset_top_node(load_request.asset_category, new_nodes)
+    if top_node is None:
+        LOG.error(
+            "Can't instance %s without a top node.", load_request.asset_file_path
+        )
+        return loaded_assets
+
+    top_node_name = top_node.split(":")[-1]
+    for _ in range(load_request.load_count - 1):
+        instance_namespace = get_unique_namespace(load_request.load_namespace)
+        cmds.namespace(add=instance_namespace)
+        new_instance = cmds.instance(
+            top_node, name=f"{instance_namespace}:{top_node_name}"
         )
+        loaded_assets.append((load_request.asset_category, new_instance))
+
+    return loaded_assets
+
+
+def load_gpu_cache(gpu_cache_path: str, load_namespace: str) -> list:
+    """Create a gpuCache node for a published GPU cache file.
+
+    The cache transform is named like a published asset top node so it can be
+    organized like any other loaded asset.
+
+    Args:
+        gpu_cache_path (str): Path to published GPU cache (.abc) file.
+        load_namespace (str): Namespace to load the cache under.
+
+    Returns:
+        list: New cache transform and gpuCache shape nodes.
+    """
+    cmds.loadPlugin("gpuCache", quiet=True)
+
+    cache_namespace = get_unique_namespace(load_namespace)
+    cmds.namespace(add=cache_namespace)
+    cache_transform = cmds.createNode("transform", name=f"{cache_namespace}:asset")
+    cache_shape = cmds.createNode(
+        "gpuCache", name=f"{cache_namespace}:assetGpuCacheShape", parent=cache_transform
+    )
+    cmds.setAttr(f"{cache_shape}.cacheFileName", gpu_cache_path, type="string")
+
+    return [cache_transform, cache_shape]
+
+
+def get_unique_namespace(base_namespace: str) -> str:
+    """Get first unused namespace using Maya's clash numbering.
+
+    Args:
+        base_namespace (str): Namespace to start from.
+
+    Returns:
+        str: Unused namespace i.e. PROP2 if PROP and PROP1 exist.
+    """
+    if not cmds.namespace(exists=base_namespace):
+        return base_namespace
+
+    namespace_number = 1
+    while cmds.namespace(exists=f"{base_namespace}{namespace_number}"):
+        namespace_number += 1
+
+    return f"{base_namespace}{namespace_number}"
+
+
+def create_deferred_reference(asset_file_path: str, load_namespace: str) -> str:
+    """Create an unloaded reference to an asset file.
+
+    Unloaded references have no DAG nodes, so a locator linked to the reference node
+    is created to stand in for it. Selecting or showing the locator lets the
+    reference be found by get_selected_reference_nodes and
+    get_visible_reference_nodes. It's deleted once the reference is loaded.
+
+    Args:
+        asset_file_path (str): Path to published asset file.
+        load_namespace (str): Namespace to load the asset under.
+
+    Returns:
+        str: New reference node.
+    """
+    reference_file = cmds.file(
+        asset_file_path,
+        ignoreVersion=True,
+        mergeNamespacesOnClash=False,
+        namespace=load_namespace,
+        options="v=0",
+        loadReferenceDepth="none",
+        r=True,
+    )
+    reference_node = cmds.referenceQuery(reference_file, referenceNode=True)
+
+    reference_namespace = cmds.referenceQuery(reference_node, namespace=True)
+    deferred_locator = cmds.spaceLocator(
+        name=f"{reference_namespace.lstrip(':')}_deferred_LOC"
+    )[0]
+    cmds.addAttr(
+        deferred_locator,
+        longName=DEFERRED_REFERENCE_ATTRIBUTE,
+        attributeType="message",
+    )
+    cmds.connectAttr(
+        f"{reference_node}.message",
+        f"{deferred_locator}.{DEFERRED_REFERENCE_ATTRIBUTE}",
+    )
+
+    return reference_node
+
+
+def get_deferred_locators(reference_node: str = None) -> List[str]:
+    """Get locators standing in for deferred references.
+
+    Args:
+        reference_node (str, optional): Only get this reference node's locators.
+            Defaults to all deferred references.
+
+    Returns:
+        list: Deferred reference locators.
+    """
+    if reference_node is not None:
+        linked_plugs = cmds.listConnections(
+            f"{reference_node}.message", source=False, plugs=True
+        )
+        return [
+            linked_plug.split(".", 1)[0]
+            for linked_plug in linked_plugs or []
+            if linked_plug.endswith(f".{DEFERRED_REFERENCE_ATTRIBUTE}")
+        ]
+
+    return cmds.ls(f"*.{DEFERRED_REFERENCE_ATTRIBUTE}", objectsOnly=True) or []
+
+
+def add_proxy_reference(
+    reference_node: str, proxy_file_path: str, proxy_tag: str = PROXY_TAG_HIGH
+) -> None:
+    """Add a proxy file to an existing reference.
+
+    The existing reference file is tagged as the low-res proxy.
+
+    Args:
+        reference_node (str): Reference node to add the proxy to.
+        proxy_file_path (str): Path to the proxy's published file.
+        proxy_tag (str, optional): Tag of the new proxy. Defaults to PROXY_TAG_HIGH.
+    """
+    if not cmds.getAttr(f"{reference_node}.proxyTag"):
+        cmds.setAttr(f"{reference_node}.proxyTag", PROXY_TAG_LOW, type="string")
+
+    mel.eval(f'proxyAdd "{reference_node}" "{proxy_file_path}" "{proxy_tag}"')
+
+
+def get_reference_proxies(reference_node: str) -> Dict[str, str]:
+    """Get all proxy reference nodes sharing a proxy manager with a reference.
+
+    Args:
+        reference_node (str): Reference node to query.
+
+    Returns:
+        dict: Proxy reference nodes keyed by proxy tag.
+    """
+    proxy_managers = cmds.listConnections(
+        f"{reference_node}.proxyMsg", type="proxyManager"
+    )
+    if not proxy_managers:
+        return {}
+
+    proxy_nodes = cmds.listConnections(
+        f"{proxy_managers[0]}.proxyList", type="reference"
+    )
+    return {
+        cmds.getAttr(f"{proxy_node}.proxyTag"): proxy_node
+        for proxy_node in set(proxy_nodes or [])
+    }
+
+
+def switch_reference_proxy(reference_node: str, proxy_tag: str) -> str:
+    """Switch a proxied reference to the proxy with the given tag.
+
+    Args:
+        reference_node (str): Any reference node of the proxy set.
+        proxy_tag (str): Proxy tag to switch to.
+
+    Returns:
+        str: Active reference node after switching. None if no proxy has the tag.
+    """
+    proxy_node = get_reference_proxies(reference_node).get(proxy_tag)
+    if proxy_node is None:
+        return None
+
+    if proxy_node != reference_node:
+        cmds.proxySwitch(proxy_node)
+
+    return proxy_node
+
+
+def get_reference_nodes_from_nodes(nodes: list) -> List[str]:
+    """Get unique reference nodes of the given nodes.
+
+    Args:
+        nodes (list): Reference nodes or nodes coming from references.
+
+    Returns:
+        list: Reference nodes in the order they were found.
+    """
+    reference_nodes = []
+    for node in nodes or []:
+        if cmds.nodeType(node) == "reference":
+            reference_node = node
+        elif cmds.attributeQuery(DEFERRED_REFERENCE_ATTRIBUTE, node=node, exists=True):
+            linked_references = cmds.listConnections(
+                f"{node}.{DEFERRED_REFERENCE_ATTRIBUTE}", type="reference"
+            )
+            if not linked_references:
+                continue
+            reference_node = linked_references[0]
+        elif cmds.referenceQuery(node, isNodeReferenced=True):
+            reference_node = cmds.referenceQuery(
+                node, referenceNode=True, topReference=True
+            )
+        else:
+            continue
+
+        if reference_node not in reference_nodes:
+            reference_nodes.append(reference_node)
+
+    return reference_nodes
+
+
+def get_selected_reference_nodes() -> List[str]:
+    """Get reference nodes of the current selection."""
+    return get_reference_nodes_from_nodes(cmds.ls(selection=True))
+
+
+def get_visible_reference_nodes() -> List[str]:
+    """Get reference nodes with visible DAG nodes or deferred locators."""
+    visible_nodes = cmds.ls(type="transform", visible=True, referencedNodes=True)
+    deferred_locators = get_deferred_locators()
+    if deferred_locators:
+        visible_nodes += cmds.ls(deferred_locators, visible=True)
+
+    return get_reference_nodes_from_nodes(visible_nodes)
+
+
+def get_category_from_published_path(published_file_path: str) -> str:
+    """Get long asset category name from a published asset file path.
+
+    Published files live in <category>/<asset>/<variant>/Publish/v###/.
+
+    Args:
+        published_file_path (str): Path to published asset file.
+
+    Returns:
+        str: Long category name.
+    """
+    return PurePath(published_file_path).parents[4].name
+
+
+def load_references(reference_nodes: List[str], organize: bool = True) -> int:
+    """Load deferred references and switch proxied references to high-res.
+
+    Args:
+        reference_nodes (List[str]): Reference nodes to load.
+        organize (bool, optional): Parent newly loaded top nodes into their category
+            outliner groups. Defaults to True.
+
+    Returns:
+        int: Number of references loaded.
+    """
+    loaded_assets = []
+    deferred_locators = []
+    switched_count = 0
+    with util_tools.suspend_scene_updates():
+        for reference_node in reference_nodes:
+            deferred_locators.extend(get_deferred_locators(reference_node))
+            active_node = switch_reference_proxy(reference_node, PROXY_TAG_HIGH)
+            if active_node is None:
+                active_node = reference_node
+            elif active_node != reference_node:
+                switched_count += 1
+
+            reference_file = cmds.referenceQuery(
+                active_node, filename=True, withoutCopyNumber=True
+            )
+            if cmds.referenceQuery(active_node, isLoaded=True):
+                new_nodes = cmds.referenceQuery(active_node, nodes=True)
+            else:
+                new_nodes = cmds.file(loadReference=active_node, returnNewNodes=True)
+
+            loaded_assets.append(
+                (get_category_from_published_path(reference_file), new_nodes)
+            )
+
+        if deferred_locators:
+            cmds.delete(deferred_locators)
+
         if organize:
-            organize_loaded_asset(asset_category, new_nodes)
+            organize_loaded_assets(loaded_assets)
 
-    return True
+    LOG.info(
+        "Loaded %s reference(s) and switched %s proxies to high-res.",
+        len(loaded_assets),
+        switched_count,
+    )
 
+    return len(loaded_assets)
 
-def organize_loaded_asset(imported_asset_category: str, imported_nodes: list) -> None:
-    """Parent top node of imported Asset into Asset Category group node.
 
-    Important: For this function to work, the imported/referenced Asset must be a
-    published asset from the Asset Manager tool. It is expecting that there is a single
-    top node for all nodes within the imported file that is either named "asset" or
-    "rig".
+def get_loaded_asset_top_node(imported_asset_category: str, imported_nodes: list):
+    """Get the top node of a loaded published asset.
+
+    Args:
+        imported_asset_category (str): Long category name of the loaded asset.
+        imported_nodes (list): Nodes returned by the load.
+
+    Returns:
+        str: Top node name if found. Otherwise, None.
     """
+    category = acat.get_category(imported_asset_category)
+    if category is None or not imported_nodes:
+        return None
+
     # Get namespace that maya assigned to new asset
     assigned_namespace = imported_nodes[0].split(":")[0].upper()
-    top_node = f"{assigned_namespace}:rig"
-    asset_node = f"{assigned_namespace}:asset"
-    if cmds.objExists(asset_node):
-        if cmds.listRelatives(asset_node, parent=True) is None:
-            top_node = asset_node
+    for top_node_name in category.top_node_names:
+        candidate_node = f"{assigned_namespace}:{top_node_name}"
+        if not cmds.objExists(candidate_node):
+            continue
+        if cmds.listRelatives(candidate_node, parent=True) is None:
+            return candidate_node
+
+    LOG.warning("No top node found to organize for namespace: %s", assigned_namespace)
+    return None
+
+
+def organize_loaded_assets(loaded_assets: list) -> None:
+    """Parent top nodes of many loaded assets into their category group nodes.
+
+    Args:
+        loaded_assets (list): List of (asset category, loaded nodes) tuples.
+    """
+    registry = acat.get_category_registry()
+    group_top_nodes: Dict[str, List[str]] = {}
+    for asset_category, imported_nodes in loaded_assets:
+        category = registry.get_category(asset_category)
+        if category is None or not category.outliner_group:
+            LOG.warning("No outliner group registered for category: %s", asset_category)
+            continue
+
+        top_node = get_loaded_asset_top_node(asset_category, imported_nodes)
+        if top_node is None:
+            continue
+
+        group_top_nodes.setdefault(category.outliner_group, []).append(top_node)
+
+    if not group_top_nodes:
+        return
 
     # Make sure outliner has top organizational group nodes
-    outliner_utils.create_shot_tree()
-
-    match imported_asset_category:
-        case "characters":
-            cmds.parent(top_node, "CHAR")
-        case "creatures":
-            cmds.parent(top_node, "CRE")
-        case "environments":
-            cmds.parent(top_node, "ENV")
-        case "fx":
-            cmds.parent(top_node, "FX")
-        case "gami":
-            cmds.parent(top_node, "GAMI")
-        case "props":
-            cmds.parent(top_node, "PROP")
-        case "vehicles":
-            cmds.parent(top_node, "VEH")
+    outliner_utils.create_shot_tree(registry.get_outliner_groups())
+
+    for outliner_group, top_nodes in group_top_nodes.items():
+        cmds.parent(top_nodes, outliner_group)
+
+
+def organize_loaded_asset(imported_asset_category: str, imported_nodes: list) -> None:
+    """Parent top node of imported Asset into Asset Category group node.
+
+    Important: For this function to work, the imported/referenced Asset must be a
+    published asset from the Asset Manager tool. It is expecting that there is a single
+    top node for all nodes within the imported file matching one of the category's
+    top node names i.e. "asset" or "rig".
+    """
+    organize_loaded_assets([(imported_asset_category, imported_nodes)])
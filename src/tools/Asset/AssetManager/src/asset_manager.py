@@ -5,18 +5,20 @@ file.
 """
 # Can't find PySide6 modules pylint: disable=I1101
 
-__version__ = "1.0.1"
+__version__ = "1.1.0"
 
 from functools import partial
 import logging
 import os
 import re
+import time
 
 from PySide6 import QtCore, QtWidgets
 from PySide6.QtUiTools import QUiLoader
 
 from Core import core_paths as cpath
 from Core import maya_start as ms
+from Core.database import publish_log
 from Core.ui.UIUtilTools.src import maya_ui_util_tools as mui
 from Core.ui.UIUtilTools.src import pyside_util_tools as put
 from Core.ui.UIUtilTools.src import snipping_widget as snip
@@ -25,11 +27,16 @@ from Core.util import maya_file_util_tools as mfut
 from Core.util import project_util_tools as prj
 from Core.util import string_util_tools as sut
 
+from Perforce.util.src import p4_session as p4s
+from Perforce.util.src import p4_status_cache as p4sc
+
 from Util.UtilTools.src import util_tools as utt
 
 from .gui import asset_gui_utils as agu
 from .gui import asset_list_utils as alu
+from .gui import whats_new_utils as wnu
 from .util import asset_manager_utils as amu
+from .util import publish_vcs as pvcs
 from .util import validation_utils as vu
 
 # Import maya modules
@@ -59,6 +66,11 @@ LOG = logging.getLogger(os.path.basename(__file__))
 class AssetManager(QtWidgets.QMainWindow):
     """Asset Manager tool for navigating to asset files and creating new files."""
 
+    # Emitted from the background Perforce status refresh with the refreshed path
+    vcs_status_refreshed = QtCore.Signal(str)
+    # Emitted from the background What's New catalog scan with its result
+    whats_new_scanned = QtCore.Signal(object)
+
     def __init__(self, parent=None):
         """Initialize instance of tool.
 
@@ -82,6 +94,7 @@ class AssetManager(QtWidgets.QMainWindow):
         }
         self.publish_preview_widget = None
         self.current_variation_preview: str = ""
+        self.vcs_status_cache = None
 
         # Set up default UI settings
         self.ui_settings = {
@@ -146,6 +159,13 @@ class AssetManager(QtWidgets.QMainWindow):
         self.current_project = self.project_configs["project_name"]
         self.current_cg_project_path = MAIN_PATHS["cg_path"]
 
+        # Perforce lock/out of date badges on file widgets
+        if (
+            self.project_configs.get("asset_manager_vcs_status", True) is True
+            and p4s.P4 is not None
+        ):
+            self.vcs_status_cache = p4sc.get_status_cache()
+
         return True
 
     def setup_ui(self):
@@ -211,6 +231,17 @@ class AssetManager(QtWidgets.QMainWindow):
         # Publish section
         self.root.btn_publish.clicked.connect(self.publish_asset)
 
+        # What's New review section
+        self.root.btn_compare_snapshot.clicked.connect(
+            partial(wnu.compare_to_last_review, self)
+        )
+        self.root.btn_save_snapshot.clicked.connect(
+            partial(wnu.save_review_snapshot, self)
+        )
+
+        self.vcs_status_refreshed.connect(partial(alu.update_file_status_badges, self))
+        self.whats_new_scanned.connect(partial(wnu.show_scan_result, self))
+
     def refresh_ui(self):
         self.root.list_asset_previews.clear()
         self.root.list_published_files.clear()
@@ -218,6 +249,17 @@ class AssetManager(QtWidgets.QMainWindow):
         self.root.cbo_variations.clear()
 
         alu.update_asset_list(self)
+        self.refresh_vcs_status()
+
+    def refresh_vcs_status(self):
+        """Refresh Perforce status of the current category in the background."""
+        if self.vcs_status_cache is None:
+            return
+
+        self.vcs_status_cache.refresh_async(
+            f"{self.asset_root_directory}/{self.root.cbo_categories.currentText()}",
+            self.vcs_status_refreshed.emit,
+        )
 
     def build_apb_asset(self):
         """Build APB (wip) asset from user choices."""
@@ -279,6 +321,7 @@ class AssetManager(QtWidgets.QMainWindow):
     def publish_asset(self):
         """Publish the current maya scene."""
         LOG.info("Publishing scene...")
+        publish_start_time = time.perf_counter()
         asset_details = amu.get_asset_creation_details(self, True)
 
         if vu.validate_asset_details(asset_details, self) is False:
@@ -297,43 +340,46 @@ class AssetManager(QtWidgets.QMainWindow):
             LOG.warning("User cancelled operation.")
             return
 
-        # Checking if current scene is locked
-        has_write_access = True
-        if os.access(cmds.file(query=True, sceneName=True), os.W_OK) is False:
+        # Check every publish output can be written before writing anything
+        vcs_stage, output_problems = self.check_publish_outputs(publish_file_details)
+        if output_problems:
             mui.display_confirm_dialog(
                 "Access Denied",
                 (
-                    "Current open file is read only. Please unlock file via "
-                    "version control system or in file properties. File path:\n\n"
-                    f"{cmds.file(query=True, sceneName=True)}"
+                    "Publish files can't be written. Please resolve via version "
+                    "control system or in file properties:\n\n"
+                    + "\n".join(output_problems)
                 ),
             )
-            has_write_access = False
-
-        if (
-            os.path.exists(publish_file_details["main_asset_preview_path"]) is True
-            and os.access(publish_file_details["main_asset_preview_path"], os.W_OK)
-            is False
-        ):
-            mui.display_confirm_dialog(
-                "Access Denied",
-                (
-                    "Main Asset Preview image is read-only. Please unlock file via "
-                    "version control system or in file properties. File path:\n\n"
-                    f"{publish_file_details['main_asset_preview_path']}"
-                ),
-            )
-            has_write_access = False
-
-        if has_write_access is False:
             return
 
+        if vcs_stage is not None:
+            try:
+                vcs_stage.checkout_existing_outputs(
+                    f"Publish {asset_details['asset_category']}/"
+                    f"{asset_details['asset_name']}/{asset_details['asset_variant']} "
+                    f"{publish_file_details['version']}"
+                )
+            except p4s.P4Exception as p4_error:
+                LOG.error("Couldn't check out publish outputs: %s", p4_error)
+                mui.display_confirm_dialog(
+                    "Perforce Error",
+                    (
+                        "Publish outputs couldn't be checked out, nothing was "
+                        f"published:\n\n{p4_error}"
+                    ),
+                )
+                return
+
         LOG.info("Passed validations. Creating publish...")
         # Save scene into new location with new name
         mfut.create_from_current_scene(publish_file_details["file_path"])
 
-        # Copy and repath textures to new APB location
-        mfut.repath_textures(publish_file_details["textures_directory"], self)
+        # Copy and repath textures to new publish location
+        # Perforce opens the copies, so they're only made writable without it
+        mfut.repath_textures(
+            publish_file_details["textures_directory"], self, vcs_stage is None
+        )
 
         # Save preview image to publish directory
         agu.save_qlabel_pixmap_to_disk(
@@ -355,6 +401,28 @@ class AssetManager(QtWidgets.QMainWindow):
         # Final save of file to save texture repathing changes
         cmds.file(force=True, save=True, options="v=0;", type="mayaBinary")
 
+        # Lightweight GPU cache representation for layout and background loading
+        if self.project_configs.get("asset_publish_gpu_cache", True) is True:
+            mfut.export_gpu_cache(publish_file_details["gpu_cache_path"])
+
+        # Open all new publish outputs for add in the publish changelist
+        # Publish files are written, so a Perforce failure only leaves them unadded
+        vcs_error = None
+        if vcs_stage is not None:
+            try:
+                vcs_stage.add_new_outputs()
+                LOG.info("Publish opened in changelist %s.", vcs_stage.changelist_num)
+            except p4s.P4Exception as p4_error:
+                vcs_error = p4_error
+                LOG.error("Couldn't open new publish outputs for add: %s", p4_error)
+
+        # Record publish event for incremental catalog refreshes
+        self.log_publish_event(
+            asset_details,
+            publish_file_details,
+            time.perf_counter() - publish_start_time,
+        )
+
         # Refresh UI
         self.refresh_ui()
 
@@ -368,8 +436,82 @@ class AssetManager(QtWidgets.QMainWindow):
 
         agu.publish_ui_reset(self)
 
+        if vcs_error is not None:
+            mui.display_confirm_dialog(
+                "Partial Publish",
+                (
+                    "Publish files were written but couldn't be opened for add in "
+                    f"changelist {vcs_stage.changelist_num}. Please add them in "
+                    f"Perforce:\n\n{vcs_error}"
+                ),
+            )
+            LOG.warning("Asset published without adding new files to Perforce.")
+            return
+
         LOG.info("Asset Successfully Published!")
 
+    def check_publish_outputs(self, publish_details: dict):
+        """Check publish outputs can be written, through Perforce when available.
+
+        Args:
+            publish_details (dict): Publish file details.
+
+        Returns:
+            tuple: (PublishVcsStage or None if Perforce isn't used, list of problem
+                descriptions)
+        """
+        if (
+            self.project_configs.get("asset_publish_perforce", True) is True
+            and p4s.P4 is not None
+        ):
+            vcs_stage = pvcs.PublishVcsStage(publish_details)
+            try:
+                return vcs_stage, vcs_stage.check_outputs()
+            except p4s.P4Exception as p4_error:
+                LOG.warning("Perforce unavailable, publishing without it: %s", p4_error)
+
+        output_problems = [
+            f"Read-only: {output_path}"
+            for output_path in pvcs.get_publish_output_paths(publish_details)
+            if os.path.exists(output_path) and not os.access(output_path, os.W_OK)
+        ]
+
+        return None, output_problems
+
+    def log_publish_event(
+        self, asset_details: dict, publish_details: dict, duration_seconds: float
+    ):
+        """Append the finished publish to the publish log.
+
+        Args:
+            asset_details (dict): Published asset details.
+            publish_details (dict): Published file details.
+            duration_seconds (float): How long the publish took.
+        """
+        published_files = [
+            publish_details["file_path"],
+            publish_details["variant_preview_path"],
+            publish_details["gpu_cache_path"],
+        ]
+        # The publish files are already written, so a log failure mustn't stop it
+        try:
+            published_files.extend(
+                fut.get_files_or_folders(
+                    publish_details["textures_directory"], True, True
+                )
+            )
+            publish_log.append_event(
+                publish_log.build_publish_event(
+                    asset_details, publish_details, published_files, duration_seconds
+                )
+            )
+        except OSError as log_error:
+            LOG.error("Couldn't record publish in the publish log: %s", log_error)
+            return
+
+        # Compacting waits on the database, so keep it off the publish
+        publish_log.compact_in_background()
+
     def build_asset_folders(self, asset_details: dict):
         """Create all asset folders if they don't exist.
 
@@ -480,7 +622,8 @@ class AssetManager(QtWidgets.QMainWindow):
                 "version": Version string i.e. "v001",
                 "file_path": Final maya file path name,
                 "textures_directory": Publish textures version directory
-                i.e. Publish/v001/Textures
+                i.e. Publish/v001/Textures,
+                "gpu_cache_path": GPU cache (.abc) path next to the maya file
         """
         asset_structure = "MDL"
         if utt.check_scene_for_joints() is True:
@@ -506,6 +649,12 @@ class AssetManager(QtWidgets.QMainWindow):
                     f"{asset_details['asset_variant']}_v001.mb"
                 ),
                 "textures_directory": f"{publish_root_directory}/v001/Textures",
+                "gpu_cache_path": (
+                    f"{publish_root_directory}/v001/{asset_structure}_"
+                    f"{shortened_asset_type}_"
+                    f"{asset_details['asset_name']}_"
+                    f"{asset_details['asset_variant']}_v001.abc"
+                ),
                 "variant_preview_path": (
                     f"{publish_root_directory}/v001/"
                     f"{asset_structure}_"
@@ -548,6 +697,12 @@ class AssetManager(QtWidgets.QMainWindow):
             "textures_directory": (
                 f"{publish_root_directory}/{new_version_string}/" "Textures"
             ),
+            "gpu_cache_path": (
+                f"{publish_root_directory}/{new_version_string}/{asset_structure}_"
+                f"{shortened_asset_type}_"
+                f"{asset_details['asset_name']}_"
+                f"{asset_details['asset_variant']}_{new_version_string}.abc"
+            ),
             "variant_preview_path": (
                 f"{publish_root_directory}/{new_version_string}/"
                 f"{asset_structure}_"
@@ -17,6 +17,8 @@ from Core import core_paths as cpath
 from Core.ui.UIUtilTools.src import pyside_util_tools as put
 from Core.util import file_util_tools as fut
 
+from Perforce.util.src import p4_status_cache as p4sc
+
 from Asset.AssetManager.src.util import asset_manager_utils as amu
 from Asset.AssetManager.src.util import valkyrie_asset as val
 
@@ -35,6 +37,15 @@ MODULE_PATH = f"{cpath.get_parent_directory(__file__, 2)}"
 RSRC_PATH = f"{MODULE_PATH}/resources"
 NO_PREVIEW_IMAGE_PATH = f"{RSRC_PATH}/images/No_preview.png"
 
+# Badge text colors per version control status
+VCS_STATUS_COLORS = {
+    p4sc.FileStatus.LOCKED: "#e05050",
+    p4sc.FileStatus.OPENED_BY_OTHER: "#e05050",
+    p4sc.FileStatus.OUT_OF_DATE: "#e0a030",
+    p4sc.FileStatus.READ_ONLY: "#e0a030",
+    p4sc.FileStatus.OPENED: "#50b050",
+}
+
 LOG = logging.getLogger(os.path.basename(__file__))
 
 
@@ -164,6 +175,7 @@ def add_file_widget(
 
     # Set asset name
     file_main_widget.lbl_file_name.setText(maya_filename)
+    update_file_status_badge(new_asset_item, file_main_widget)
 
     # Set up signals for file widget
     file_main_widget.btn_open.clicked.connect(partial(new_asset_item.open_file))
@@ -172,6 +184,54 @@ def add_file_widget(
     )
 
 
+def update_file_status_badge(file_item: fwi.FileWidgetItem, file_widget):
+    """Show cached Perforce status of a file widget's maya file.
+
+    Args:
+        file_item (fwi.FileWidgetItem): File widget item.
+        file_widget (QtWidgets.QWidget): Loaded file widget UI of item.
+    """
+    status_cache = file_item.tool_object.vcs_status_cache
+    if status_cache is None:
+        return
+
+    file_status = status_cache.get_status(file_item.maya_file)
+    if file_status == p4sc.FileStatus.NOT_IN_DEPOT:
+        file_widget.lbl_vcs_status.setText("")
+        return
+
+    fstat_record = status_cache.get_fstat_record(file_item.maya_file) or {}
+    file_widget.lbl_vcs_status.setText(file_status.value)
+    status_color = VCS_STATUS_COLORS.get(file_status)
+    file_widget.lbl_vcs_status.setStyleSheet(
+        f"color: {status_color};" if status_color else ""
+    )
+    file_widget.lbl_vcs_status.setToolTip(
+        "\n".join(
+            f"{key}: {fstat_record[key]}"
+            for key in ["depotFile", "haveRev", "headRev", "otherOpen", "otherLock"]
+            if key in fstat_record
+        )
+    )
+
+
+def update_file_status_badges(tool_object: QMainWindow, refreshed_path: str = ""):
+    """Update Perforce status badges of all Published and APB file widgets.
+
+    Args:
+        tool_object (QMainWindow): Asset Manager tool object.
+        refreshed_path (str, optional): Directory that was refreshed.
+    """
+    LOG.debug("Updating Perforce status badges for: %s", refreshed_path)
+    for file_list in [
+        tool_object.root.list_published_files,
+        tool_object.root.list_apb_files,
+    ]:
+        for row in range(file_list.count()):
+            file_item = file_list.item(row)
+            update_file_status_badge(file_item, file_list.itemWidget(file_item))
+
+
 def update_variation_preview(selected_item: fwi.FileWidgetItem):
     """Update variation preview image.
 
@@ -82,6 +82,7 @@ class AssetWidgetItem(QtWidgets.QListWidgetItem):
                     "<version>":{
                         "maya_file": "../Path/to/published_maya_file.mb"
                         "version_preview": "../Path/to/published_preview.jpg"
+                        "gpu_cache": "../Path/to/published_gpu_cache.abc"
                     }
                 }
         """
@@ -100,6 +101,7 @@ class AssetWidgetItem(QtWidgets.QListWidgetItem):
             maya_file_details[version] = {
                 "maya_file": version_details["maya_file"],
                 "version_preview": version_details["version_preview"],
+                "gpu_cache": version_details.get("gpu_cache", ""),
             }
 
         return maya_file_details
@@ -0,0 +1,164 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Asset Manager "What's New" review panel functions.
+
+Scanning the catalog walks every publish folder and hashes new files, so it runs on
+a background thread. The result is sent back to the UI thread through the tool's
+whats_new_scanned signal and shown by show_scan_result().
+"""
+
+# Can't find PySide2 modules pylint: disable=I1101
+
+from __future__ import annotations
+import logging
+import os
+import threading
+from typing import Callable
+
+from PySide6 import QtWidgets
+from PySide6.QtWidgets import QMainWindow
+
+from Core.database import catalog_snapshot as csnap
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+
+def get_last_review_snapshot():
+    """Get the latest saved review snapshot.
+
+    Returns:
+        tuple: (snapshot path, snapshot data). (None, None) if none saved yet.
+    """
+    snapshot_path = csnap.get_latest_snapshot_path()
+    if snapshot_path is None:
+        return None, None
+
+    return snapshot_path, csnap.load_snapshot(snapshot_path)
+
+
+def start_catalog_scan(
+    tool_object: QMainWindow, command: str, scan_function: Callable[[], dict]
+) -> threading.Thread:
+    """Run a catalog scan on a background thread.
+
+    Args:
+        tool_object (QMainWindow): Asset Manager tool object.
+        command (str): Scan command name passed on to show_scan_result().
+        scan_function (Callable[[], dict]): Scan returning result data.
+
+    Returns:
+        threading.Thread: Started scan thread. None if a scan is already running.
+    """
+    if not tool_object.root.btn_compare_snapshot.isEnabled():
+        return None
+
+    tool_object.root.btn_compare_snapshot.setEnabled(False)
+    tool_object.root.btn_save_snapshot.setEnabled(False)
+    tool_object.root.lbl_whats_new_summary.setText("Scanning published versions...")
+
+    def run_scan():
+        try:
+            scan_result = scan_function()
+        except (OSError, ValueError) as scan_error:
+            LOG.error("Catalog scan failed: %s", scan_error)
+            scan_result = {"error": str(scan_error)}
+        scan_result["command"] = command
+        tool_object.whats_new_scanned.emit(scan_result)
+
+    scan_thread = threading.Thread(target=run_scan, daemon=True)
+    scan_thread.start()
+
+    return scan_thread
+
+
+def compare_to_last_review(tool_object: QMainWindow):
+    """List versions added, updated or removed since the last review snapshot.
+
+    Args:
+        tool_object (QMainWindow): Asset Manager tool object.
+    """
+    asset_root_directory = tool_object.asset_root_directory
+
+    def scan_changes() -> dict:
+        snapshot_path, last_snapshot = get_last_review_snapshot()
+        if last_snapshot is None:
+            return {"snapshot_path": None}
+
+        current_snapshot = csnap.take_snapshot(asset_root_directory, last_snapshot)
+
+        return {
+            "snapshot_path": snapshot_path,
+            "created_at": last_snapshot["created_at"],
+            "diff": csnap.diff_snapshots(last_snapshot, current_snapshot),
+        }
+
+    start_catalog_scan(tool_object, "compare", scan_changes)
+
+
+def save_review_snapshot(tool_object: QMainWindow):
+    """Save the current asset catalog as the new review snapshot.
+
+    Args:
+        tool_object (QMainWindow): Asset Manager tool object.
+    """
+    asset_root_directory = tool_object.asset_root_directory
+
+    def scan_snapshot() -> dict:
+        _, last_snapshot = get_last_review_snapshot()
+        current_snapshot = csnap.take_snapshot(asset_root_directory, last_snapshot)
+        csnap.save_snapshot(current_snapshot)
+
+        return {"snapshot": current_snapshot}
+
+    start_catalog_scan(tool_object, "save", scan_snapshot)
+
+
+def show_scan_result(tool_object: QMainWindow, scan_result: dict):
+    """Show a finished catalog scan in the What's New panel.
+
+    Args:
+        tool_object (QMainWindow): Asset Manager tool object.
+        scan_result (dict): Result data of start_catalog_scan().
+    """
+    tool_object.root.btn_compare_snapshot.setEnabled(True)
+    tool_object.root.btn_save_snapshot.setEnabled(True)
+
+    tree_whats_new = tool_object.root.tree_whats_new
+    tree_whats_new.clear()
+
+    if "error" in scan_result:
+        tool_object.root.lbl_whats_new_summary.setText(
+            f"Catalog scan failed: {scan_result['error']}"
+        )
+        return
+
+    if scan_result["command"] == "save":
+        current_snapshot = scan_result["snapshot"]
+        tool_object.root.lbl_whats_new_summary.setText(
+            f"Review snapshot saved at {current_snapshot['created_at']} "
+            f"({len(current_snapshot['entries'])} published versions)."
+        )
+        return
+
+    if scan_result["snapshot_path"] is None:
+        tool_object.root.lbl_whats_new_summary.setText(
+            "No review snapshot saved yet. Save one to start tracking changes."
+        )
+        return
+
+    snapshot_diff = scan_result["diff"]
+    tree_whats_new.setSortingEnabled(False)
+    for change_type, catalog_entries in snapshot_diff.items():
+        for catalog_entry in catalog_entries:
+            QtWidgets.QTreeWidgetItem(
+                tree_whats_new, [change_type.capitalize(), *catalog_entry.key]
+            )
+    tree_whats_new.setSortingEnabled(True)
+    tree_whats_new.sortByColumn(1, tree_whats_new.header().sortIndicatorOrder())
+
+    tool_object.root.lbl_whats_new_summary.setText(
+        f"Since {scan_result['created_at']}: "
+        f"{len(snapshot_diff['added'])} added, "
+        f"{len(snapshot_diff['updated'])} updated, "
+        f"{len(snapshot_diff['removed'])} removed"
+    )
+    LOG.info("Compared catalog to review snapshot: %s", scan_result["snapshot_path"])
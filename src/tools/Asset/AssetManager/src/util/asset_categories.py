@@ -0,0 +1,188 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Asset category registry shared by the Asset Manager and Asset Loader.
+
+Categories are defined once here as project defaults and can be extended or
+overridden per project through the ProjectConfig.json "asset_categories" key, e.g.
+
+    "asset_categories": {
+        "props": {"short_name": "prp", "outliner_group": "PROP"},
+        "foliage": {
+            "short_name": "fol",
+            "outliner_group": "FOL",
+            "top_node_names": ["asset", "rig"]
+        }
+    }
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+import logging
+import os
+from typing import Dict, List
+
+from Core.util import project_util_tools as prj
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+# Top node names searched for, in order, when organizing a loaded published asset.
+DEFAULT_TOP_NODE_NAMES = ["asset", "rig"]
+
+DEFAULT_CATEGORIES = {
+    "assembled": {"short_name": "asb", "outliner_group": ""},
+    "characters": {"short_name": "chr", "outliner_group": "CHAR"},
+    "creatures": {"short_name": "cre", "outliner_group": "CRE"},
+    "environments": {"short_name": "env", "outliner_group": "ENV"},
+    "fx": {"short_name": "fx", "outliner_group": "FX"},
+    "gami": {"short_name": "gam", "outliner_group": "GAMI"},
+    "props": {"short_name": "prp", "outliner_group": "PROP"},
+    "vehicles": {"short_name": "veh", "outliner_group": "VEH"},
+}
+
+_REGISTRY = None
+
+
+@dataclass(frozen=True)
+class AssetCategory:
+    """Single asset category definition."""
+
+    name: str
+    short_name: str
+    outliner_group: str = ""
+    top_node_names: List[str] = field(
+        default_factory=lambda: list(DEFAULT_TOP_NODE_NAMES)
+    )
+
+
+class AssetCategoryRegistry:
+    """Lookup table of asset categories by long and short name."""
+
+    def __init__(self, category_data: Dict[str, dict] = None):
+        """Initialize registry.
+
+        Args:
+            category_data (dict, optional): Category definitions keyed by long
+                category name. Defaults to the DEFAULT_CATEGORIES table.
+        """
+        self._categories: Dict[str, AssetCategory] = {}
+        self._short_names: Dict[str, AssetCategory] = {}
+
+        if category_data is None:
+            category_data = DEFAULT_CATEGORIES
+
+        for category_name, category_details in category_data.items():
+            self.add_category(category_name, category_details)
+
+    def add_category(self, category_name: str, category_details: dict):
+        """Add or replace a category definition.
+
+        Args:
+            category_name (str): Long category name i.e. "characters".
+            category_details (dict): Category details with "short_name" and optional
+                "outliner_group" and "top_node_names" keys.
+
+        Returns:
+            AssetCategory: Newly registered category. None if details are invalid.
+        """
+        if "short_name" not in category_details:
+            LOG.error("Asset category '%s' is missing a short_name.", category_name)
+            return None
+
+        new_category = AssetCategory(
+            category_name,
+            category_details["short_name"],
+            category_details.get("outliner_group", ""),
+            list(category_details.get("top_node_names", DEFAULT_TOP_NODE_NAMES)),
+        )
+
+        existing_category = self._categories.get(category_name)
+        if existing_category is not None:
+            self._short_names.pop(existing_category.short_name, None)
+
+        self._categories[category_name] = new_category
+        self._short_names[new_category.short_name] = new_category
+
+        return new_category
+
+    def get_category(self, category_name: str):
+        """Get category by its long name.
+
+        Args:
+            category_name (str): Long category name.
+
+        Returns:
+            AssetCategory: Category if registered. Otherwise, None.
+        """
+        return self._categories.get(category_name)
+
+    def get_category_from_short_name(self, short_name: str):
+        """Get category by its short name.
+
+        Args:
+            short_name (str): Short category name i.e. "chr".
+
+        Returns:
+            AssetCategory: Category if registered. Otherwise, None.
+        """
+        return self._short_names.get(short_name)
+
+    def get_category_names(self) -> List[str]:
+        """Get all registered long category names."""
+        return list(self._categories.keys())
+
+    def get_outliner_groups(self) -> List[str]:
+        """Get all unique outliner group names used by registered categories."""
+        outliner_groups = []
+        for category in self._categories.values():
+            if not category.outliner_group:
+                continue
+            if category.outliner_group in outliner_groups:
+                continue
+            outliner_groups.append(category.outliner_group)
+
+        return outliner_groups
+
+
+def get_category_registry(reload_configs: bool = False) -> AssetCategoryRegistry:
+    """Get the project asset category registry.
+
+    Defaults are merged with the "asset_categories" entry of the project configs.
+    The registry is built once per session unless a reload is requested.
+
+    Args:
+        reload_configs (bool, optional): Rebuild registry from ProjectConfig.json.
+            Defaults to False.
+
+    Returns:
+        AssetCategoryRegistry: Project category registry.
+    """
+    global _REGISTRY  # pylint: disable=global-statement
+    if _REGISTRY is not None and reload_configs is False:
+        return _REGISTRY
+
+    registry = AssetCategoryRegistry()
+
+    project_configs = prj.get_project_configs() or {}
+    for category_name, category_details in project_configs.get(
+        "asset_categories", {}
+    ).items():
+        registry.add_category(category_name, category_details)
+
+    _REGISTRY = registry
+
+    return _REGISTRY
+
+
+def get_category(category_name: str):
+    """Get category by long name from the project registry.
+
+    Args:
+        category_name (str): Long category name.
+
+    Returns:
+        AssetCategory: Category if registered. Otherwise, None.
+    """
+    category = get_category_registry().get_category(category_name)
+    if category is None:
+        LOG.error("Unknown asset category: %s", category_name)
+
+    return category
@@ -15,6 +15,7 @@ from Core.util import project_util_tools as prj
 from Asset.AssetManager.src.gui import asset_list_utils as alu
 from Asset.AssetManager.src.gui import asset_widget_item as awi
 from Asset.AssetManager.src.gui import file_widget_item as fwi
+from Asset.AssetManager.src.util import asset_categories as acat
 from Asset.AssetManager.src.util import valkyrie_asset as val
 
 LOADER = QUiLoader()
@@ -193,22 +194,12 @@ def shorten_category_name(long_name: str):
         long_name (str): Long category name.
 
     Returns:
-        str: Shortened category name i.e. characters -> chr
+        str: Shortened category name i.e. characters -> chr. None if the category
+            isn't registered.
     """
     LOG.debug("Shortening category name for: %s", long_name)
-    if long_name == "assembled":
-        short_name = "asb"
-    if long_name == "characters":
-        short_name = "chr"
-    if long_name == "creatures":
-        short_name = "cre"
-    if long_name == "environments":
-        short_name = "env"
-    if long_name == "gami":
-        short_name = "gam"
-    if long_name == "props":
-        short_name = "prp"
-    if long_name == "vehicles":
-        short_name = "veh"
-
-    return short_name
+    category = acat.get_category(long_name)
+    if category is None:
+        return None
+
+    return category.short_name
@@ -0,0 +1,122 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Version control stage of an asset publish.
+
+All publish outputs are checked with one bulk fstat before anything is written, files
+already in the depot are opened for edit so they are writable, and once the publish
+is written every new output is opened for add in the same numbered changelist.
+"""
+
+from __future__ import annotations
+import logging
+import os
+from typing import List
+
+from Core.util import file_util_tools as fut
+
+from Perforce.util.src import p4_session as p4s
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+
+def get_publish_output_paths(publish_details: dict) -> List[str]:
+    """Get every file a publish writes.
+
+    Args:
+        publish_details (dict): Asset Manager publish file details.
+
+    Returns:
+        List[str]: Publish output paths. Textures are only included once copied.
+    """
+    output_paths = [
+        publish_details["file_path"],
+        publish_details["variant_preview_path"],
+        publish_details["main_asset_preview_path"],
+        publish_details.get("gpu_cache_path", ""),
+    ]
+    if os.path.isdir(publish_details["textures_directory"]):
+        output_paths.extend(
+            fut.get_files_or_folders(publish_details["textures_directory"], True, True)
+        )
+
+    return [output_path for output_path in output_paths if output_path]
+
+
+class PublishVcsStage:
+    """Perforce checkout/add of one publish's outputs in a single changelist."""
+
+    def __init__(self, publish_details: dict, session_pool=None):
+        """Initialize stage.
+
+        Args:
+            publish_details (dict): Asset Manager publish file details.
+            session_pool (p4s.P4SessionPool, optional): Pool to use. Defaults to the
+                shared session pool.
+        """
+        self.publish_details = publish_details
+        self.session_pool = session_pool
+        self.changelist_num = None
+        self.file_statuses = {}
+
+    def check_outputs(self) -> List[str]:
+        """Check publish outputs can be written before publishing.
+
+        Returns:
+            List[str]: Problem descriptions. Empty if the publish can go ahead.
+        """
+        output_paths = get_publish_output_paths(self.publish_details)
+        self.file_statuses = p4s.fstat_files(output_paths, self.session_pool)
+
+        output_problems = []
+        for output_path in output_paths:
+            fstat_record = self.file_statuses.get(p4s.normalize_path(output_path))
+            if fstat_record is None:
+                if os.path.exists(output_path) and not os.access(output_path, os.W_OK):
+                    output_problems.append(f"Read-only, not in depot: {output_path}")
+                continue
+
+            out_of_date = fstat_record.get("haveRev") != fstat_record.get("headRev")
+            if "otherLock" in fstat_record:
+                output_problems.append(f"Locked by another user: {output_path}")
+            elif "otherOpen" in fstat_record and p4s.is_exclusive_open(fstat_record):
+                output_problems.append(
+                    f"Exclusively opened by another user: {output_path}"
+                )
+            elif out_of_date and p4s.is_in_depot(fstat_record):
+                output_problems.append(f"Not at latest revision: {output_path}")
+
+        return output_problems
+
+    def checkout_existing_outputs(self, description: str) -> int:
+        """Create the publish changelist and open existing depot files for edit.
+
+        Args:
+            description (str): Changelist description.
+
+        Returns:
+            int: Publish changelist number.
+        """
+        self.changelist_num = p4s.create_changelist(description, self.session_pool)
+
+        existing_paths = [
+            output_path
+            for output_path in get_publish_output_paths(self.publish_details)
+            if self._is_tracked(output_path)
+        ]
+        p4s.open_files_in_changelist(
+            existing_paths, self.changelist_num, self.file_statuses, self.session_pool
+        )
+
+        return self.changelist_num
+
+    def add_new_outputs(self):
+        """Open every written publish output not yet in the changelist for add."""
+        new_paths = [
+            output_path
+            for output_path in get_publish_output_paths(self.publish_details)
+            if os.path.isfile(output_path) and not self._is_tracked(output_path)
+        ]
+        p4s.run_add(new_paths, self.changelist_num, self.session_pool)
+
+    def _is_tracked(self, output_path: str) -> bool:
+        fstat_record = self.file_statuses.get(p4s.normalize_path(output_path), {})
+        return bool(fstat_record.get("action")) or p4s.is_in_depot(fstat_record)
@@ -11,6 +11,8 @@ from PySide6.QtWidgets import QMainWindow
 from Core.util import project_util_tools as prj
 from Core.ui.UIUtilTools.src import maya_ui_util_tools as mui
 
+from Asset.AssetManager.src.util import asset_categories as acat
+
 from maya import cmds
 
 # from PySide2.QtWidgets import QMainWindow
@@ -38,6 +40,9 @@ def validate_asset_details(asset_details: dict, tool_object: QMainWindow = None)
     """
     is_valid = True
 
+    if validate_category(asset_details["asset_category"]) is False:
+        is_valid = False
+
     if validate_valid_file(asset_details) is False:
         is_valid = False
 
@@ -83,6 +88,26 @@ def validate_name(name: str, name_part: str = "Asset Name"):
     return True
 
 
+def validate_category(category_name: str):
+    """Validate asset category is registered for the project.
+
+    Args:
+        category_name (str): Long category name i.e. "characters".
+
+    Returns:
+        bool: Return True if category is registered. Otherwise, False.
+    """
+    if acat.get_category(category_name) is None:
+        LOG.warning(
+            "%s isn't a registered asset category. Add it to the project's "
+            "asset_categories config.",
+            category_name,
+        )
+        return False
+
+    return True
+
+
 def validate_valid_file(asset_details: dict):
     """Verify that file to be created from exists.
 
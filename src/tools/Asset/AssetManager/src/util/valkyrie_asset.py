@@ -84,7 +84,11 @@ class ValkyrieAssetVariant:
         return self._published_versions
 
     def add_published_version(
-        self, version_to_add: str, maya_file_path: str, variant_preview_path: str
+        self,
+        version_to_add: str,
+        maya_file_path: str,
+        variant_preview_path: str,
+        gpu_cache_path: str = "",
     ):
         """Add new Published version to variant.
 
@@ -93,6 +97,7 @@ class ValkyrieAssetVariant:
                 naming convention e.g. 'v###'.
             maya_file_path (str): Version's maya file path.
             variant_preview_path (str): Version's preview file path.
+            gpu_cache_path (str, optional): Version's GPU cache file path.
         """
         if version_to_add in self._published_versions:
             LOG.error("Variant Version '%s' already exists!", version_to_add)
@@ -101,6 +106,7 @@ class ValkyrieAssetVariant:
         self._published_versions[version_to_add] = {
             "maya_file": maya_file_path,
             "version_preview": variant_preview_path,
+            "gpu_cache": gpu_cache_path,
         }
 
     def remove_published_version(self, version_to_remove: str):
@@ -184,6 +190,7 @@ class ValkyrieAssetVariant:
             self._published_versions[version] = {
                 "maya_file": str,
                 "version_preview": str,
+                "gpu_cache": "",
             }
             for item in os.listdir(version_path):
                 item_path = f"{version_path}/{item}"
@@ -195,6 +202,9 @@ class ValkyrieAssetVariant:
                 if re.match(PROJECT_CONFIGS["asset_published_regex"], item):
                     self._published_versions[version]["maya_file"] = item_path
 
+                if item.endswith(".abc"):
+                    self._published_versions[version]["gpu_cache"] = item_path
+
     def _populate_apb_versions(self):
         """Get APB/wip maya file paths.
 
@@ -38,6 +38,10 @@ def core_paths():
         "task": f"{src_path}/database/DB_TASKS.json",
         "user": f"{src_path}/database/DB_USERS.json",
         "note": f"{src_path}/database/DB_NOTES.json",
+        "sqlite": f"{src_path}/database/valkyrie.db",
+        "publish_log": f"{src_path}/database/publish_log.jsonl",
+        "sharded": f"{src_path}/database/sharded",
+        "catalog_snapshots": f"{src_path}/database/catalog_snapshots",
     }
     repo_resources = f"{repo_path}/resources"
     project_maya_banner = f"{repo_resources}/Banners/project_maya_banner.png"
@@ -0,0 +1,357 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Asset catalog snapshots and "what's new" diffs.
+
+A snapshot is a compact record of every published asset version (category, asset,
+variant, version, maya file modification time, size and hash). Comparing two
+snapshots lists the versions added, updated or removed between them in linear time,
+so supervisors can review what was published since their last review without
+browsing folders.
+
+Unchanged files keep the hash stored in the previous snapshot, so taking a new
+snapshot only hashes files that were added or modified since.
+
+Command line usage (from the src/tools directory):
+
+    python -m Core.database.catalog_snapshot snapshot [--output PATH]
+    python -m Core.database.catalog_snapshot diff OLD_SNAPSHOT [NEW_SNAPSHOT]
+"""
+
+from __future__ import annotations
+import argparse
+from dataclasses import astuple, dataclass
+import json
+import logging
+import os
+import re
+from typing import Dict, Iterator, List, Tuple
+
+from Core import core_paths as cpath
+from Core.util import file_util_tools as fut
+
+from . import pipeline_database as pdb
+from .publish_log import hash_file
+
+# Main paths
+MAIN_PATHS = cpath.core_paths()
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+VERSION_DIRECTORY_REGEX = re.compile(r"^v[0-9]{3,4}$")
+
+
+@dataclass
+class CatalogEntry:
+    category: str
+    asset: str
+    variant: str
+    version: str
+    maya_file: str
+    mtime: float
+    size: int
+    hash: str
+
+    @property
+    def key(self) -> Tuple[str, str, str, str]:
+        return (self.category, self.asset, self.variant, self.version)
+
+
+def get_assets_root() -> str:
+    """Get the project assets root directory."""
+    return f"{MAIN_PATHS['cg_path']}/assets"
+
+
+def get_snapshots_directory() -> str:
+    """Get the directory review snapshots are saved to."""
+    return MAIN_PATHS["database_paths"]["catalog_snapshots"]
+
+
+def _iter_directories(directory_path: str) -> Iterator[os.DirEntry]:
+    try:
+        with os.scandir(directory_path) as directory_entries:
+            for directory_entry in directory_entries:
+                if directory_entry.is_dir():
+                    yield directory_entry
+    except FileNotFoundError:
+        return
+
+
+def scan_catalog(
+    assets_root: str = None, previous_entries: Dict[tuple, CatalogEntry] = None
+) -> List[CatalogEntry]:
+    """Scan published asset versions.
+
+    Args:
+        assets_root (str, optional): Assets root directory laid out as
+            <category>/<asset>/<variant>/Publish/<version>/*.mb.
+            Defaults to the project assets root.
+        previous_entries (dict, optional): Entries of a previous snapshot by key.
+            Their hashes are reused for files with the same time and size.
+
+    Returns:
+        List[CatalogEntry]: Every published version found.
+    """
+    assets_root = assets_root or get_assets_root()
+    previous_entries = previous_entries or {}
+
+    catalog_entries = []
+    for category_entry in _iter_directories(assets_root):
+        for asset_entry in _iter_directories(category_entry.path):
+            for variant_entry in _iter_directories(asset_entry.path):
+                for version_entry in _iter_directories(f"{variant_entry.path}/Publish"):
+                    if not VERSION_DIRECTORY_REGEX.match(version_entry.name):
+                        continue
+
+                    catalog_entry = _build_catalog_entry(
+                        (
+                            category_entry.name,
+                            asset_entry.name,
+                            variant_entry.name,
+                            version_entry.name,
+                        ),
+                        version_entry.path,
+                        previous_entries,
+                    )
+                    if catalog_entry is not None:
+                        catalog_entries.append(catalog_entry)
+
+    return catalog_entries
+
+
+def _build_catalog_entry(
+    entry_key: tuple, version_directory: str, previous_entries: dict
+):
+    with os.scandir(version_directory) as version_files:
+        maya_files = sorted(
+            (
+                version_file
+                for version_file in version_files
+                if version_file.is_file() and version_file.name.endswith(".mb")
+            ),
+            key=lambda version_file: version_file.name,
+        )
+    if not maya_files:
+        return None
+
+    maya_file = maya_files[0]
+    file_stat = maya_file.stat()
+    file_mtime = round(file_stat.st_mtime, 3)
+
+    previous_entry = previous_entries.get(entry_key)
+    if (
+        previous_entry is not None
+        and previous_entry.maya_file == maya_file.name
+        and previous_entry.mtime == file_mtime
+        and previous_entry.size == file_stat.st_size
+    ):
+        file_hash = previous_entry.hash
+    else:
+        file_hash = hash_file(maya_file.path)
+
+    return CatalogEntry(
+        *entry_key, maya_file.name, file_mtime, file_stat.st_size, file_hash
+    )
+
+
+def take_snapshot(assets_root: str = None, previous_snapshot: dict = None) -> dict:
+    """Take a snapshot of the asset catalog.
+
+    Args:
+        assets_root (str, optional): Assets root directory.
+            Defaults to the project assets root.
+        previous_snapshot (dict, optional): Earlier snapshot to reuse hashes from.
+
+    Returns:
+        dict: Snapshot data.
+    """
+    previous_entries = {}
+    if previous_snapshot is not None:
+        previous_entries = get_snapshot_entries(previous_snapshot)
+
+    catalog_entries = scan_catalog(assets_root, previous_entries)
+
+    return {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "created_at": pdb.get_timestamp(),
+        "entries": [list(astuple(catalog_entry)) for catalog_entry in catalog_entries],
+    }
+
+
+def get_snapshot_entries(snapshot: dict) -> Dict[tuple, CatalogEntry]:
+    """Get catalog entries of a snapshot keyed by (category, asset, variant, version).
+
+    Args:
+        snapshot (dict): Snapshot data.
+
+    Returns:
+        dict: Catalog entries by key.
+    """
+    if snapshot.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported catalog snapshot format: {snapshot.get('format_version')}"
+        )
+
+    snapshot_entries = {}
+    for entry_values in snapshot["entries"]:
+        catalog_entry = CatalogEntry(*entry_values)
+        snapshot_entries[catalog_entry.key] = catalog_entry
+
+    return snapshot_entries
+
+
+def diff_snapshots(old_snapshot: dict, new_snapshot: dict) -> dict:
+    """List versions added, updated or removed between two snapshots.
+
+    Args:
+        old_snapshot (dict): Earlier snapshot data.
+        new_snapshot (dict): Later snapshot data.
+
+    Returns:
+        dict: Lists of CatalogEntry keyed by "added", "updated" and "removed".
+    """
+    old_entries = get_snapshot_entries(old_snapshot)
+    new_entries = get_snapshot_entries(new_snapshot)
+
+    snapshot_diff = {"added": [], "updated": [], "removed": []}
+    for entry_key, new_entry in new_entries.items():
+        old_entry = old_entries.get(entry_key)
+        if old_entry is None:
+            snapshot_diff["added"].append(new_entry)
+        elif old_entry.hash != new_entry.hash:
+            snapshot_diff["updated"].append(new_entry)
+
+    for entry_key, old_entry in old_entries.items():
+        if entry_key not in new_entries:
+            snapshot_diff["removed"].append(old_entry)
+
+    return snapshot_diff
+
+
+def save_snapshot(snapshot: dict, snapshot_path: str = None) -> str:
+    """Save a snapshot as compact JSON.
+
+    Args:
+        snapshot (dict): Snapshot data.
+        snapshot_path (str, optional): Path to save to. Defaults to a timestamped
+            file in the snapshots directory.
+
+    Returns:
+        str: Saved snapshot path.
+    """
+    if snapshot_path is None:
+        snapshot_path = (
+            f"{get_snapshots_directory()}/"
+            f"catalog_{snapshot['created_at'].replace(':', '-')}.json"
+        )
+
+    fut.create_directory(cpath.get_parent_directory(snapshot_path, 0))
+    fut.write_json_data(snapshot, snapshot_path, compact=True)
+    LOG.info("Saved catalog snapshot: %s", snapshot_path)
+
+    return snapshot_path
+
+
+def load_snapshot(snapshot_path: str) -> dict:
+    """Load a saved snapshot."""
+    return fut.get_json_data(snapshot_path)
+
+
+def get_latest_snapshot_path(snapshots_directory: str = None):
+    """Get path of the most recently saved snapshot.
+
+    Args:
+        snapshots_directory (str, optional): Directory to search. Defaults to the
+            snapshots directory.
+
+    Returns:
+        str: Latest snapshot path. None if no snapshot was saved yet.
+    """
+    snapshots_directory = snapshots_directory or get_snapshots_directory()
+    if not os.path.isdir(snapshots_directory):
+        return None
+
+    snapshot_files = sorted(
+        file_name
+        for file_name in os.listdir(snapshots_directory)
+        if file_name.startswith("catalog_") and file_name.endswith(".json")
+    )
+    if not snapshot_files:
+        return None
+
+    return f"{snapshots_directory}/{snapshot_files[-1]}"
+
+
+def format_diff(snapshot_diff: dict) -> str:
+    """Format a snapshot diff as readable text, one version per line."""
+    diff_lines = []
+    for change_type in ["added", "updated", "removed"]:
+        for catalog_entry in sorted(
+            snapshot_diff[change_type], key=lambda entry: entry.key
+        ):
+            diff_lines.append(f"{change_type:<8} {'/'.join(catalog_entry.key)}")
+
+    diff_lines.append(
+        f"{len(snapshot_diff['added'])} added, {len(snapshot_diff['updated'])} "
+        f"updated, {len(snapshot_diff['removed'])} removed"
+    )
+
+    return "\n".join(diff_lines)
+
+
+def main(arguments: List[str] = None) -> int:
+    """Run the catalog snapshot command line interface."""
+    parser = argparse.ArgumentParser(description="Asset catalog snapshots.")
+    parser.add_argument("--assets-root", default=None, help="Assets root directory.")
+    sub_parsers = parser.add_subparsers(dest="command", required=True)
+
+    snapshot_parser = sub_parsers.add_parser(
+        "snapshot", help="Save a snapshot of the current catalog."
+    )
+    snapshot_parser.add_argument("--output", default=None, help="Snapshot path.")
+
+    diff_parser = sub_parsers.add_parser(
+        "diff", help="List versions added, updated or removed between snapshots."
+    )
+    diff_parser.add_argument("old_snapshot", help="Earlier snapshot path.")
+    diff_parser.add_argument(
+        "new_snapshot", nargs="?", help="Later snapshot path. Defaults to a new scan."
+    )
+    diff_parser.add_argument("--json", action="store_true", help="Print JSON.")
+
+    parsed_arguments = parser.parse_args(arguments)
+
+    if parsed_arguments.command == "snapshot":
+        previous_snapshot_path = get_latest_snapshot_path()
+        previous_snapshot = None
+        if previous_snapshot_path is not None:
+            previous_snapshot = load_snapshot(previous_snapshot_path)
+        snapshot = take_snapshot(parsed_arguments.assets_root, previous_snapshot)
+        print(save_snapshot(snapshot, parsed_arguments.output))
+        return 0
+
+    old_snapshot = load_snapshot(parsed_arguments.old_snapshot)
+    if parsed_arguments.new_snapshot:
+        new_snapshot = load_snapshot(parsed_arguments.new_snapshot)
+    else:
+        new_snapshot = take_snapshot(parsed_arguments.assets_root, old_snapshot)
+
+    snapshot_diff = diff_snapshots(old_snapshot, new_snapshot)
+    if parsed_arguments.json:
+        print(
+            json.dumps(
+                {
+                    change_type: [astuple(entry) for entry in catalog_entries]
+                    for change_type, catalog_entries in snapshot_diff.items()
+                },
+                indent=4,
+            )
+        )
+    else:
+        print(format_diff(snapshot_diff))
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,632 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""SQLite storage layer for the pipeline database entities.
+
+Replaces whole-file reads/writes of the DB_*.json files declared in
+core_paths()["database_paths"] with a single SQLite database in WAL mode so
+multiple artists can read while one writes and single record updates don't rewrite
+everything.
+"""
+
+from __future__ import annotations
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, Type, TypeVar
+
+from Core import core_paths as cpath
+from Core.util import file_util_tools as fut
+
+# Main paths
+MAIN_PATHS = cpath.core_paths()
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+# Seconds to wait on a locked database before giving up
+BUSY_TIMEOUT = 30.0
+
+
+def get_timestamp() -> str:
+    """Get current time as an ISO formatted string."""
+    return datetime.now().isoformat(timespec="seconds")
+
+
+@dataclass
+class AssetRecord:
+    category: str = ""
+    name: str = ""
+    path: str = ""
+    created_at: str = ""
+    id: Optional[int] = None
+
+
+@dataclass
+class AssetVariantRecord:
+    asset_id: int = 0
+    name: str = ""
+    path: str = ""
+    created_at: str = ""
+    id: Optional[int] = None
+
+
+@dataclass
+class PublishRecord:
+    variant_id: int = 0
+    version: str = ""
+    maya_file: str = ""
+    version_preview: str = ""
+    gpu_cache: str = ""
+    user: str = ""
+    published_at: str = ""
+    id: Optional[int] = None
+
+
+@dataclass
+class TaskRecord:
+    title: str = ""
+    user: str = ""
+    status: str = "open"
+    asset_id: Optional[int] = None
+    variant_id: Optional[int] = None
+    description: str = ""
+    created_at: str = ""
+    updated_at: str = ""
+    id: Optional[int] = None
+
+
+@dataclass
+class UserRecord:
+    username: str = ""
+    full_name: str = ""
+    email: str = ""
+    id: Optional[int] = None
+
+
+@dataclass
+class NoteRecord:
+    body: str = ""
+    user: str = ""
+    asset_id: Optional[int] = None
+    variant_id: Optional[int] = None
+    publish_id: Optional[int] = None
+    created_at: str = ""
+    id: Optional[int] = None
+
+
+# Ordered schema migrations. Index + 1 is the schema version stored in the
+# database's user_version pragma. Only ever append to this list.
+SCHEMA_MIGRATIONS = [
+    """
+    CREATE TABLE assets (
+        id INTEGER PRIMARY KEY,
+        category TEXT NOT NULL,
+        name TEXT NOT NULL,
+        path TEXT NOT NULL DEFAULT '',
+        created_at TEXT NOT NULL DEFAULT '',
+        UNIQUE (category, name)
+    );
+    CREATE INDEX idx_assets_name ON assets (name);
+
+    CREATE TABLE asset_variants (
+        id INTEGER PRIMARY KEY,
+        asset_id INTEGER NOT NULL REFERENCES assets (id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        path TEXT NOT NULL DEFAULT '',
+        created_at TEXT NOT NULL DEFAULT '',
+        UNIQUE (asset_id, name)
+    );
+    CREATE INDEX idx_asset_variants_name ON asset_variants (name);
+
+    CREATE TABLE publishes (
+        id INTEGER PRIMARY KEY,
+        variant_id INTEGER NOT NULL REFERENCES asset_variants (id)
+            ON DELETE CASCADE,
+        version TEXT NOT NULL,
+        maya_file TEXT NOT NULL DEFAULT '',
+        version_preview TEXT NOT NULL DEFAULT '',
+        gpu_cache TEXT NOT NULL DEFAULT '',
+        user TEXT NOT NULL DEFAULT '',
+        published_at TEXT NOT NULL DEFAULT '',
+        UNIQUE (variant_id, version)
+    );
+    CREATE INDEX idx_publishes_version ON publishes (version);
+    CREATE INDEX idx_publishes_user ON publishes (user);
+
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY,
+        username TEXT NOT NULL UNIQUE,
+        full_name TEXT NOT NULL DEFAULT '',
+        email TEXT NOT NULL DEFAULT ''
+    );
+
+    CREATE TABLE tasks (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        user TEXT NOT NULL DEFAULT '',
+        status TEXT NOT NULL DEFAULT 'open',
+        asset_id INTEGER REFERENCES assets (id) ON DELETE SET NULL,
+        variant_id INTEGER REFERENCES asset_variants (id) ON DELETE SET NULL,
+        description TEXT NOT NULL DEFAULT '',
+        created_at TEXT NOT NULL DEFAULT '',
+        updated_at TEXT NOT NULL DEFAULT ''
+    );
+    CREATE INDEX idx_tasks_user ON tasks (user);
+    CREATE INDEX idx_tasks_asset ON tasks (asset_id);
+    CREATE INDEX idx_tasks_variant ON tasks (variant_id);
+
+    CREATE TABLE notes (
+        id INTEGER PRIMARY KEY,
+        body TEXT NOT NULL,
+        user TEXT NOT NULL DEFAULT '',
+        asset_id INTEGER REFERENCES assets (id) ON DELETE CASCADE,
+        variant_id INTEGER REFERENCES asset_variants (id) ON DELETE CASCADE,
+        publish_id INTEGER REFERENCES publishes (id) ON DELETE CASCADE,
+        created_at TEXT NOT NULL DEFAULT ''
+    );
+    CREATE INDEX idx_notes_user ON notes (user);
+    CREATE INDEX idx_notes_asset ON notes (asset_id);
+    CREATE INDEX idx_notes_variant ON notes (variant_id);
+    CREATE INDEX idx_notes_publish ON notes (publish_id);
+    """,
+]
+
+# Entity referenced by each foreign key column
+FOREIGN_KEY_ENTITIES = {
+    "asset_id": "asset",
+    "variant_id": "asset_variant",
+    "publish_id": "publish",
+}
+
+RecordType = TypeVar("RecordType")
+
+
+class RecordDAO(Generic[RecordType]):
+    """Typed data access object for a single database table."""
+
+    table_name = ""
+    record_type: Type[RecordType] = None
+    # Columns identifying the same record across imports, besides its id
+    natural_key: Tuple[str, ...] = ()
+
+    def __init__(self, database: PipelineDatabase):
+        self._database = database
+        self._columns = [
+            record_field.name
+            for record_field in fields(self.record_type)
+            if record_field.name != "id"
+        ]
+
+    def _to_record(self, row: sqlite3.Row) -> RecordType:
+        return self.record_type(**dict(row))
+
+    def get(self, record_id: int) -> Optional[RecordType]:
+        """Get a single record by id.
+
+        Args:
+            record_id (int): Record's id.
+
+        Returns:
+            RecordType: Found record. Otherwise, None.
+        """
+        row = self._database.execute(
+            f"SELECT * FROM {self.table_name} WHERE id = ?", (record_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        return self._to_record(row)
+
+    def find(self, **filters) -> List[RecordType]:
+        """Get all records matching every column filter.
+
+        Args:
+            **filters: Column name and value pairs to match.
+
+        Returns:
+            list: Matching records ordered by id.
+        """
+        query = f"SELECT * FROM {self.table_name}"
+        if filters:
+            for column in filters:
+                self._validate_column(column)
+            query += " WHERE " + " AND ".join(f"{column} = ?" for column in filters)
+
+        rows = self._database.execute(
+            f"{query} ORDER BY id", tuple(filters.values())
+        ).fetchall()
+
+        return [self._to_record(row) for row in rows]
+
+    def find_one(self, **filters) -> Optional[RecordType]:
+        """Get first record matching every column filter.
+
+        Returns:
+            RecordType: First matching record. Otherwise, None.
+        """
+        records = self.find(**filters)
+        if not records:
+            return None
+
+        return records[0]
+
+    def insert(self, record: RecordType) -> RecordType:
+        """Insert a new record.
+
+        Args:
+            record (RecordType): Record to insert. Its id is set after inserting.
+
+        Returns:
+            RecordType: Inserted record.
+        """
+        record_data = asdict(record)
+        columns = list(self._columns)
+        if record.id is not None:
+            columns.append("id")
+
+        cursor = self._database.execute(
+            f"INSERT INTO {self.table_name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})",
+            tuple(record_data[column] for column in columns),
+        )
+        record.id = cursor.lastrowid
+
+        return record
+
+    def insert_many(self, records: Iterable[RecordType]) -> List[RecordType]:
+        """Insert many records in a single transaction.
+
+        Args:
+            records (Iterable[RecordType]): Records to insert.
+
+        Returns:
+            list: Inserted records with their ids set.
+        """
+        with self._database.transaction():
+            return [self.insert(record) for record in records]
+
+    def update(self, record: RecordType) -> RecordType:
+        """Write every column of an existing record.
+
+        Args:
+            record (RecordType): Record with id to update.
+
+        Returns:
+            RecordType: Updated record.
+        """
+        if record.id is None:
+            raise ValueError(f"Can't update {self.table_name} record without an id.")
+
+        record_data = asdict(record)
+        self._database.execute(
+            f"UPDATE {self.table_name} SET "
+            f"{', '.join(f'{column} = ?' for column in self._columns)} WHERE id = ?",
+            tuple(record_data[column] for column in self._columns) + (record.id,),
+        )
+
+        return record
+
+    def delete(self, record_id: int) -> None:
+        """Delete a record by id.
+
+        Args:
+            record_id (int): Record's id.
+        """
+        self._database.execute(
+            f"DELETE FROM {self.table_name} WHERE id = ?", (record_id,)
+        )
+
+    def upsert(self, record: RecordType) -> RecordType:
+        """Update the record with the same natural key, or insert it.
+
+        An id the record brings along is kept when inserting, unless another record
+        already uses it.
+
+        Args:
+            record (RecordType): Record to write. Its id is set to the written row.
+
+        Returns:
+            RecordType: Written record.
+        """
+        existing_record = None
+        if self.natural_key:
+            record_data = asdict(record)
+            existing_record = self.find_one(
+                **{column: record_data[column] for column in self.natural_key}
+            )
+        if existing_record is not None:
+            record.id = existing_record.id
+            return self.update(record)
+
+        if record.id is not None and self.get(record.id) is not None:
+            record.id = None
+
+        return self.insert(record)
+
+    def count(self) -> int:
+        """Get number of records in the table."""
+        return self._database.execute(
+            f"SELECT COUNT(*) FROM {self.table_name}"
+        ).fetchone()[0]
+
+    def _validate_column(self, column: str) -> None:
+        if column != "id" and column not in self._columns:
+            raise ValueError(f"Unknown {self.table_name} column: {column}")
+
+
+class AssetDAO(RecordDAO[AssetRecord]):
+    table_name = "assets"
+    record_type = AssetRecord
+    natural_key = ("category", "name")
+
+    def get_by_name(self, category: str, name: str) -> Optional[AssetRecord]:
+        return self.find_one(category=category, name=name)
+
+    def get_or_create(self, category: str, name: str, path: str = "") -> AssetRecord:
+        existing_asset = self.get_by_name(category, name)
+        if existing_asset is not None:
+            return existing_asset
+
+        return self.insert(AssetRecord(category, name, path, get_timestamp()))
+
+
+class AssetVariantDAO(RecordDAO[AssetVariantRecord]):
+    table_name = "asset_variants"
+    record_type = AssetVariantRecord
+    natural_key = ("asset_id", "name")
+
+    def get_by_name(self, asset_id: int, name: str) -> Optional[AssetVariantRecord]:
+        return self.find_one(asset_id=asset_id, name=name)
+
+    def get_or_create(
+        self, asset_id: int, name: str, path: str = ""
+    ) -> AssetVariantRecord:
+        existing_variant = self.get_by_name(asset_id, name)
+        if existing_variant is not None:
+            return existing_variant
+
+        return self.insert(AssetVariantRecord(asset_id, name, path, get_timestamp()))
+
+
+class PublishDAO(RecordDAO[PublishRecord]):
+    table_name = "publishes"
+    record_type = PublishRecord
+    natural_key = ("variant_id", "version")
+
+    def get_version(self, variant_id: int, version: str) -> Optional[PublishRecord]:
+        return self.find_one(variant_id=variant_id, version=version)
+
+    def get_latest(self, variant_id: int) -> Optional[PublishRecord]:
+        row = self._database.execute(
+            "SELECT * FROM publishes WHERE variant_id = ? "
+            "ORDER BY version DESC LIMIT 1",
+            (variant_id,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        return self._to_record(row)
+
+
+class TaskDAO(RecordDAO[TaskRecord]):
+    table_name = "tasks"
+    record_type = TaskRecord
+    natural_key = ("title", "user", "created_at")
+
+
+class UserDAO(RecordDAO[UserRecord]):
+    table_name = "users"
+    record_type = UserRecord
+    natural_key = ("username",)
+
+    def get_by_username(self, username: str) -> Optional[UserRecord]:
+        return self.find_one(username=username)
+
+
+class NoteDAO(RecordDAO[NoteRecord]):
+    table_name = "notes"
+    record_type = NoteRecord
+    natural_key = ("body", "user", "created_at")
+
+
+class PipelineDatabase:
+    """SQLite pipeline database connection with typed access to every entity."""
+
+    def __init__(self, database_path: str = None):
+        """Open (and create or migrate if needed) the pipeline database.
+
+        Args:
+            database_path (str, optional): Path to the SQLite file. Defaults to the
+                repository's core_paths()["database_paths"]["sqlite"] path.
+        """
+        if database_path is None:
+            database_path = MAIN_PATHS["database_paths"]["sqlite"]
+
+        if database_path != ":memory:":
+            fut.create_directory(cpath.get_parent_directory(database_path, 0))
+
+        self.database_path = database_path
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+        self._connection = sqlite3.connect(
+            database_path,
+            timeout=BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+
+        self.migrate()
+
+        self.assets = AssetDAO(self)
+        self.asset_variants = AssetVariantDAO(self)
+        self.publishes = PublishDAO(self)
+        self.tasks = TaskDAO(self)
+        self.users = UserDAO(self)
+        self.notes = NoteDAO(self)
+
+    def execute(self, query: str, parameters: tuple = ()) -> sqlite3.Cursor:
+        """Execute a single SQL statement.
+
+        Args:
+            query (str): SQL statement.
+            parameters (tuple, optional): Statement parameters.
+
+        Returns:
+            sqlite3.Cursor: Statement cursor.
+        """
+        with self._lock:
+            return self._connection.execute(query, parameters)
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one atomic transaction.
+
+        Nested transactions join the outermost one. Everything is rolled back if an
+        exception is raised inside the outermost block.
+        """
+        with self._lock:
+            if self._transaction_depth == 0:
+                self._connection.execute("BEGIN IMMEDIATE")
+            self._transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._connection.execute("ROLLBACK")
+                raise
+
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._connection.execute("COMMIT")
+
+    def get_schema_version(self) -> int:
+        """Get schema version stored in the database."""
+        return self._connection.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self) -> None:
+        """Apply any schema migrations newer than the database's schema version."""
+        current_version = self.get_schema_version()
+        for version, migration in enumerate(SCHEMA_MIGRATIONS, start=1):
+            if version <= current_version:
+                continue
+
+            LOG.info("Migrating pipeline database to schema version %s...", version)
+            with self.transaction():
+                for statement in migration.split(";"):
+                    if statement.strip():
+                        self._connection.execute(statement)
+                self._connection.execute(f"PRAGMA user_version = {version}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def import_json_databases(self, json_database_paths: Dict[str, str] = None) -> dict:
+        """Import records from the legacy DB_*.json database files.
+
+        Each JSON file is expected to map record keys to record dictionaries. Keys
+        that aren't columns of the entity are ignored. Records matching an existing
+        record's natural key i.e. an asset's category and name update that record,
+        so importing again is safe. New records keep their "id" when it's free.
+        References to ids of other imported records are remapped to the ids they
+        were written with. Files are streamed so large databases never need to be
+        fully loaded, and everything is imported in one transaction.
+
+        Args:
+            json_database_paths (dict, optional): JSON paths keyed by entity name
+                i.e. "asset", "publish". Defaults to core_paths()["database_paths"].
+
+        Returns:
+            dict: Number of imported records keyed by entity name.
+        """
+        if json_database_paths is None:
+            json_database_paths = MAIN_PATHS["database_paths"]
+
+        entity_daos = {
+            "asset": self.assets,
+            "asset_variant": self.asset_variants,
+            "publish": self.publishes,
+            "user": self.users,
+            "task": self.tasks,
+            "note": self.notes,
+        }
+        # Database id by JSON id, by entity name
+        imported_ids: Dict[str, Dict[int, int]] = {
+            entity_name: {} for entity_name in entity_daos
+        }
+        imported_counts = {}
+        with self.transaction():
+            for entity_name, entity_dao in entity_daos.items():
+                json_path = json_database_paths.get(entity_name)
+                if json_path is None or not os.path.exists(json_path):
+                    continue
+
+                valid_columns = {
+                    record_field.name for record_field in fields(entity_dao.record_type)
+                }
+                imported_counts[entity_name] = 0
+                for _, record_data in fut.iter_json_items(json_path):
+                    if not isinstance(record_data, dict):
+                        continue
+
+                    record = entity_dao.record_type(
+                        **{
+                            key: value
+                            for key, value in record_data.items()
+                            if key in valid_columns
+                        }
+                    )
+                    for column, referenced_entity in FOREIGN_KEY_ENTITIES.items():
+                        referenced_id = getattr(record, column, None)
+                        if referenced_id is not None:
+                            setattr(
+                                record,
+                                column,
+                                imported_ids[referenced_entity].get(
+                                    referenced_id, referenced_id
+                                ),
+                            )
+
+                    json_id = record.id
+                    entity_dao.upsert(record)
+                    if json_id is not None:
+                        imported_ids[entity_name][json_id] = record.id
+                    imported_counts[entity_name] += 1
+
+                LOG.info(
+                    "Imported %s %s record(s).",
+                    imported_counts[entity_name],
+                    entity_name,
+                )
+
+        return imported_counts
+
+
+_DATABASES: Dict[str, PipelineDatabase] = {}
+
+
+def get_database(database_path: str = None) -> PipelineDatabase:
+    """Get shared database connection for a database path.
+
+    Args:
+        database_path (str, optional): Path to the SQLite file. Defaults to the
+            repository's pipeline database.
+
+    Returns:
+        PipelineDatabase: Open pipeline database.
+    """
+    if database_path is None:
+        database_path = MAIN_PATHS["database_paths"]["sqlite"]
+
+    if database_path not in _DATABASES:
+        _DATABASES[database_path] = PipelineDatabase(database_path)
+
+    return _DATABASES[database_path]
@@ -0,0 +1,353 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Append-only publish event log.
+
+Every publish appends one JSON line to the log. Tools keep the byte offset they last
+read to so refreshing only reads events published since then, and the log is
+periodically compacted into the pipeline database.
+"""
+
+from __future__ import annotations
+import getpass
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import List, Tuple
+
+from Core import core_paths as cpath
+from Core.util import file_util_tools as fut
+
+from . import pipeline_database as pdb
+
+# Main paths
+MAIN_PATHS = cpath.core_paths()
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+# Compact once this many bytes of events haven't been written to the database
+COMPACTION_THRESHOLD_BYTES = 256 * 1024
+
+# Rotate the log once it is fully compacted and larger than this
+ROTATION_THRESHOLD_BYTES = 16 * 1024 * 1024
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Held while a background compaction runs so only one runs at a time
+_COMPACTION_LOCK = threading.Lock()
+
+
+def get_log_path() -> str:
+    """Get the project publish log path."""
+    return MAIN_PATHS["database_paths"]["publish_log"]
+
+
+def get_checkpoint_path(log_path: str) -> str:
+    """Get path of the compaction checkpoint for a publish log."""
+    return f"{log_path}.checkpoint"
+
+
+def hash_file(file_path: str) -> str:
+    """Get sha256 hex digest of a file.
+
+    Args:
+        file_path (str): Path to file.
+
+    Returns:
+        str: Hex digest of file contents.
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as in_file:
+        for chunk in iter(lambda: in_file.read(HASH_CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+
+def build_publish_event(
+    asset_details: dict,
+    publish_details: dict,
+    published_files: List[str],
+    duration_seconds: float,
+) -> dict:
+    """Build a publish event record.
+
+    Args:
+        asset_details (dict): Asset Manager asset details with "asset_category",
+            "asset_name" and "asset_variant" keys.
+        publish_details (dict): Asset Manager publish file details with "version",
+            "file_path" and optionally "variant_preview_path" and "gpu_cache_path".
+        published_files (List[str]): Every file written by the publish.
+        duration_seconds (float): How long the publish took.
+
+    Returns:
+        dict: Publish event record.
+    """
+    existing_files = [
+        file_path for file_path in published_files if os.path.isfile(file_path)
+    ]
+
+    return {
+        "timestamp": pdb.get_timestamp(),
+        "asset_category": asset_details["asset_category"],
+        "asset_name": asset_details["asset_name"],
+        "asset_variant": asset_details["asset_variant"],
+        "version": publish_details["version"],
+        "maya_file": publish_details["file_path"],
+        "version_preview": publish_details.get("variant_preview_path", ""),
+        "gpu_cache": publish_details.get("gpu_cache_path", ""),
+        "files": existing_files,
+        "hashes": {file_path: hash_file(file_path) for file_path in existing_files},
+        "user": getpass.getuser(),
+        "duration_seconds": round(duration_seconds, 3),
+    }
+
+
+def append_event(event: dict, log_path: str = None) -> None:
+    """Append one event to the log as a single atomic write.
+
+    Args:
+        event (dict): JSON serializable event record.
+        log_path (str, optional): Publish log path. Defaults to the project log.
+    """
+    if log_path is None:
+        log_path = get_log_path()
+
+    fut.create_directory(cpath.get_parent_directory(log_path, 0))
+
+    event_line = (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8")
+    log_descriptor = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(log_descriptor, event_line)
+        os.fsync(log_descriptor)
+    finally:
+        os.close(log_descriptor)
+
+
+def read_events(log_path: str = None, since_offset: int = 0) -> Tuple[list, int]:
+    """Read events appended after a byte offset.
+
+    Only complete lines are read so a publish being written while reading is picked
+    up on the next read. If the log was rotated since the offset was stored, reading
+    starts over from the beginning of the new log.
+
+    Args:
+        log_path (str, optional): Publish log path. Defaults to the project log.
+        since_offset (int, optional): Byte offset returned by a previous read.
+            Defaults to 0.
+
+    Returns:
+        tuple: (list of events, byte offset to pass to the next read)
+    """
+    if log_path is None:
+        log_path = get_log_path()
+
+    if not os.path.exists(log_path):
+        return [], 0
+
+    if since_offset > os.path.getsize(log_path):
+        LOG.info("Publish log was rotated. Reading from the start.")
+        since_offset = 0
+
+    with open(log_path, "rb") as log_file:
+        log_file.seek(since_offset)
+        new_data = log_file.read()
+
+    complete_length = new_data.rfind(b"\n") + 1
+    events = []
+    for line in new_data[:complete_length].splitlines():
+        if not line.strip():
+            continue
+        try:
+            events.append(json.loads(line))
+        except json.JSONDecodeError:
+            LOG.error("Skipping corrupt publish log line: %s", line[:200])
+
+    return events, since_offset + complete_length
+
+
+def get_checkpoint(log_path: str) -> int:
+    """Get byte offset of the log already compacted into the database."""
+    checkpoint_path = get_checkpoint_path(log_path)
+    if not os.path.exists(checkpoint_path):
+        return 0
+
+    return (fut.get_json_data(checkpoint_path) or {}).get("offset", 0)
+
+
+def apply_events_to_database(events: list, database: pdb.PipelineDatabase) -> int:
+    """Write publish events into the pipeline database.
+
+    Args:
+        events (list): Publish events to write.
+        database (pdb.PipelineDatabase): Database to write to.
+
+    Returns:
+        int: Number of new publish records written.
+    """
+    new_publishes = 0
+    with database.transaction():
+        for event in events:
+            asset = database.assets.get_or_create(
+                event["asset_category"], event["asset_name"]
+            )
+            variant = database.asset_variants.get_or_create(
+                asset.id, event["asset_variant"]
+            )
+            if database.publishes.get_version(variant.id, event["version"]):
+                continue
+
+            database.publishes.insert(
+                pdb.PublishRecord(
+                    variant.id,
+                    event["version"],
+                    event.get("maya_file", ""),
+                    event.get("version_preview", ""),
+                    event.get("gpu_cache", ""),
+                    event.get("user", ""),
+                    event.get("timestamp", ""),
+                )
+            )
+            new_publishes += 1
+
+    return new_publishes
+
+
+def compact(
+    log_path: str = None,
+    database: pdb.PipelineDatabase = None,
+    force: bool = False,
+) -> int:
+    """Compact events since the last checkpoint into the pipeline database.
+
+    Args:
+        log_path (str, optional): Publish log path. Defaults to the project log.
+        database (pdb.PipelineDatabase, optional): Database to compact into.
+            Defaults to the project pipeline database.
+        force (bool, optional): Compact even if below the size threshold.
+            Defaults to False.
+
+    Returns:
+        int: Number of events compacted.
+    """
+    if log_path is None:
+        log_path = get_log_path()
+
+    if not os.path.exists(log_path):
+        return 0
+
+    checkpoint = get_checkpoint(log_path)
+    pending_bytes = os.path.getsize(log_path) - checkpoint
+    if not force and 0 <= pending_bytes < COMPACTION_THRESHOLD_BYTES:
+        return 0
+
+    if database is None:
+        database = pdb.get_database()
+
+    events, new_offset = read_events(log_path, checkpoint)
+    new_publishes = apply_events_to_database(events, database)
+    fut.write_json_data({"offset": new_offset}, get_checkpoint_path(log_path))
+    LOG.info(
+        "Compacted %s publish event(s), %s new publish(es).",
+        len(events),
+        new_publishes,
+    )
+
+    # Only rotate when nothing was appended since reading so no event is archived
+    # without being compacted
+    if (
+        new_offset >= ROTATION_THRESHOLD_BYTES
+        and os.path.getsize(log_path) == new_offset
+    ):
+        rotate(log_path, new_offset)
+
+    return len(events)
+
+
+def compact_in_background(log_path: str = None) -> threading.Thread:
+    """Compact the publish log on a background thread.
+
+    Compaction errors, i.e. a locked database on a busy share, are logged instead
+    of raised. Nothing is started if a background compaction is still running.
+
+    Args:
+        log_path (str, optional): Publish log path. Defaults to the project log.
+
+    Returns:
+        threading.Thread: Started compaction thread. None if one is already running.
+    """
+    if not _COMPACTION_LOCK.acquire(blocking=False):
+        return None
+
+    def run_compaction():
+        try:
+            compact(log_path)
+        except (OSError, sqlite3.Error, ValueError) as compaction_error:
+            LOG.error("Publish log compaction failed: %s", compaction_error)
+        finally:
+            _COMPACTION_LOCK.release()
+
+    compaction_thread = threading.Thread(
+        target=run_compaction, name="PublishLogCompaction", daemon=True
+    )
+    compaction_thread.start()
+
+    return compaction_thread
+
+
+def rotate(log_path: str, compacted_offset: int = None) -> str:
+    """Archive a fully compacted log and start a new one.
+
+    Events appended between the caller's size check and the archive move end up
+    in the archive past compacted_offset. They're appended again to the new log so
+    they're still compacted and read by tools.
+
+    Args:
+        log_path (str): Publish log path.
+        compacted_offset (int, optional): Byte offset compacted into the database.
+            Defaults to the checkpoint.
+
+    Returns:
+        str: Path of the archived log.
+    """
+    if compacted_offset is None:
+        compacted_offset = get_checkpoint(log_path)
+
+    archive_path = (
+        f"{os.path.splitext(log_path)[0]}_"
+        f"{pdb.get_timestamp().replace(':', '-')}.jsonl"
+    )
+    os.replace(log_path, archive_path)
+    fut.write_json_data({"offset": 0}, get_checkpoint_path(log_path))
+
+    late_events, _ = read_events(archive_path, compacted_offset)
+    for late_event in late_events:
+        append_event(late_event, log_path)
+    if late_events:
+        LOG.info("Moved %s late publish event(s) to the new log.", len(late_events))
+    LOG.info("Archived publish log to: %s", archive_path)
+
+    return archive_path
+
+
+class PublishLogTail:
+    """Incremental reader of the publish log for cheap tool refreshes."""
+
+    def __init__(self, log_path: str = None, start_at_end: bool = False):
+        """Initialize tail reader.
+
+        Args:
+            log_path (str, optional): Publish log path. Defaults to the project log.
+            start_at_end (bool, optional): Only report events published after the
+                reader was created. Defaults to False.
+        """
+        self.log_path = log_path or get_log_path()
+        self.offset = 0
+        if start_at_end and os.path.exists(self.log_path):
+            self.offset = os.path.getsize(self.log_path)
+
+    def read_new_events(self) -> list:
+        """Get events published since the last read."""
+        events, self.offset = read_events(self.log_path, self.offset)
+        return events
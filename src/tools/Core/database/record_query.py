@@ -0,0 +1,411 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Indexed query layer for the task, note and user JSON databases.
+
+Records are held in memory with secondary indexes per field (user, asset, status,
+...) plus sorted date indexes, all updated incrementally as records are written, so
+queries like "my open tasks" or "notes on this asset" are dictionary lookups
+instead of scans of the whole database.
+
+Records can be loaded from the DB_*.json files or from the sharded JSON database,
+in which case writes also go through to the record's shard.
+
+Benchmark lookups at up to 100k records against a linear scan, from the src/tools
+directory:
+
+    python -m Core.database.record_query
+"""
+
+from __future__ import annotations
+import bisect
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from Core import core_paths as cpath
+from Core.util import file_util_tools as fut
+
+from . import sharded_json_database as sdb
+
+# Main paths
+MAIN_PATHS = cpath.core_paths()
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+TASK_INDEX_FIELDS = ["user", "status", "asset_id", "variant_id"]
+NOTE_INDEX_FIELDS = ["user", "asset_id", "variant_id", "publish_id"]
+USER_INDEX_FIELDS = ["username"]
+
+TASK_DATE_FIELDS = ["created_at", "updated_at"]
+NOTE_DATE_FIELDS = ["created_at"]
+
+
+class IndexedRecordCollection:
+    """In-memory records with incrementally maintained secondary indexes."""
+
+    def __init__(
+        self,
+        index_fields: List[str],
+        date_fields: List[str] = None,
+        store: sdb.ShardedJsonStore = None,
+    ):
+        """Initialize collection.
+
+        Args:
+            index_fields (List[str]): Fields with an exact match index.
+            date_fields (List[str], optional): ISO timestamp fields with a sorted
+                index for range queries. Defaults to none.
+            store (sdb.ShardedJsonStore, optional): Store written through to on
+                put and delete. Defaults to in-memory only.
+        """
+        self.index_fields = list(index_fields)
+        self.date_fields = list(date_fields or [])
+        self.store = store
+
+        self._records: Dict[str, dict] = {}
+        self._indexes: Dict[str, Dict[object, Set[str]]] = {
+            field_name: {} for field_name in self.index_fields
+        }
+        self._date_indexes: Dict[str, List[Tuple[str, str]]] = {
+            field_name: [] for field_name in self.date_fields
+        }
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def load(self, records: Iterable[Tuple[str, dict]]) -> int:
+        """Add records without writing them to the store.
+
+        Args:
+            records (Iterable[Tuple[str, dict]]): (key, record) pairs.
+
+        Returns:
+            int: Number of records loaded.
+        """
+        loaded_count = 0
+        for record_key, record_data in records:
+            if not isinstance(record_data, dict):
+                continue
+            self._set_record(str(record_key), record_data)
+            loaded_count += 1
+
+        return loaded_count
+
+    def get(self, record_key: str) -> Optional[dict]:
+        """Get a record by key. None if it doesn't exist."""
+        record_data = self._records.get(record_key)
+        return dict(record_data) if record_data is not None else None
+
+    def put(self, record_key: str, record_data: dict) -> None:
+        """Create or replace a record and update its index entries.
+
+        Args:
+            record_key (str): Record key.
+            record_data (dict): Record data.
+        """
+        if self.store is not None:
+            self.store.put(record_key, record_data)
+        self._set_record(record_key, record_data)
+
+    def delete(self, record_key: str) -> None:
+        """Delete a record and its index entries.
+
+        Args:
+            record_key (str): Record key.
+        """
+        if self.store is not None:
+            self.store.delete(record_key)
+        self._remove_record(record_key)
+
+    def find_keys(self, **field_filters) -> List[str]:
+        """Get keys of records matching every indexed field filter.
+
+        Args:
+            **field_filters: Indexed field values to match i.e. user="bob".
+
+        Returns:
+            List[str]: Matching record keys.
+        """
+        if not field_filters:
+            return list(self._records.keys())
+
+        matching_sets = []
+        for field_name, field_value in field_filters.items():
+            if field_name not in self._indexes:
+                raise ValueError(f"Field '{field_name}' is not indexed.")
+            matching_keys = self._indexes[field_name].get(field_value)
+            if not matching_keys:
+                return []
+            matching_sets.append(matching_keys)
+
+        # Intersect starting from the smallest set
+        matching_sets.sort(key=len)
+        return list(matching_sets[0].intersection(*matching_sets[1:]))
+
+    def find(self, **field_filters) -> List[dict]:
+        """Get records matching every indexed field filter.
+
+        Args:
+            **field_filters: Indexed field values to match i.e. user="bob".
+
+        Returns:
+            List[dict]: Matching records.
+        """
+        return [
+            dict(self._records[record_key])
+            for record_key in self.find_keys(**field_filters)
+        ]
+
+    def find_between(
+        self, date_field: str, start: str = "", end: str = None
+    ) -> List[dict]:
+        """Get records whose date field is within a range, oldest first.
+
+        Args:
+            date_field (str): Date indexed field i.e. "created_at".
+            start (str, optional): Inclusive ISO timestamp. Defaults to no start.
+            end (str, optional): Exclusive ISO timestamp. Defaults to no end.
+
+        Returns:
+            List[dict]: Matching records.
+        """
+        if date_field not in self._date_indexes:
+            raise ValueError(f"Field '{date_field}' is not date indexed.")
+
+        date_index = self._date_indexes[date_field]
+        start_position = bisect.bisect_left(date_index, (start, ""))
+        end_position = len(date_index)
+        if end is not None:
+            end_position = bisect.bisect_left(date_index, (end, ""))
+
+        return [
+            dict(self._records[record_key])
+            for _, record_key in date_index[start_position:end_position]
+        ]
+
+    def _set_record(self, record_key: str, record_data: dict) -> None:
+        self._remove_record(record_key)
+        self._records[record_key] = dict(record_data)
+
+        for field_name, field_index in self._indexes.items():
+            field_value = record_data.get(field_name)
+            if field_value is None:
+                continue
+            field_index.setdefault(field_value, set()).add(record_key)
+
+        for field_name, date_index in self._date_indexes.items():
+            field_value = record_data.get(field_name)
+            if field_value:
+                bisect.insort(date_index, (field_value, record_key))
+
+    def _remove_record(self, record_key: str) -> None:
+        old_record = self._records.pop(record_key, None)
+        if old_record is None:
+            return
+
+        for field_name, field_index in self._indexes.items():
+            field_value = old_record.get(field_name)
+            matching_keys = field_index.get(field_value)
+            if matching_keys is None:
+                continue
+            matching_keys.discard(record_key)
+            if not matching_keys:
+                del field_index[field_value]
+
+        for field_name, date_index in self._date_indexes.items():
+            field_value = old_record.get(field_name)
+            if not field_value:
+                continue
+            position = bisect.bisect_left(date_index, (field_value, record_key))
+            if position < len(date_index) and date_index[position] == (
+                field_value,
+                record_key,
+            ):
+                del date_index[position]
+
+
+class PipelineQueries:
+    """Queries over pipeline tasks, notes and users."""
+
+    def __init__(self, sharded_database: sdb.ShardedJsonDatabase = None):
+        """Initialize empty collections.
+
+        Args:
+            sharded_database (sdb.ShardedJsonDatabase, optional): Database written
+                through to on changes. Defaults to in-memory only.
+        """
+        self.tasks = IndexedRecordCollection(
+            TASK_INDEX_FIELDS,
+            TASK_DATE_FIELDS,
+            sharded_database.tasks if sharded_database else None,
+        )
+        self.notes = IndexedRecordCollection(
+            NOTE_INDEX_FIELDS,
+            NOTE_DATE_FIELDS,
+            sharded_database.notes if sharded_database else None,
+        )
+        self.users = IndexedRecordCollection(
+            USER_INDEX_FIELDS,
+            store=sharded_database.users if sharded_database else None,
+        )
+
+    @classmethod
+    def from_json_databases(cls, json_database_paths: Dict[str, str] = None):
+        """Load queries from the DB_*.json database files.
+
+        Args:
+            json_database_paths (dict, optional): JSON paths keyed by entity name.
+                Defaults to core_paths()["database_paths"].
+
+        Returns:
+            PipelineQueries: Loaded queries.
+        """
+        if json_database_paths is None:
+            json_database_paths = MAIN_PATHS["database_paths"]
+
+        pipeline_queries = cls()
+        for entity_name, collection in [
+            ("task", pipeline_queries.tasks),
+            ("note", pipeline_queries.notes),
+            ("user", pipeline_queries.users),
+        ]:
+            json_path = json_database_paths.get(entity_name)
+            if json_path is None or not os.path.exists(json_path):
+                continue
+            collection.load(fut.iter_json_items(json_path))
+
+        return pipeline_queries
+
+    @classmethod
+    def from_sharded_database(cls, sharded_database: sdb.ShardedJsonDatabase = None):
+        """Load queries from the sharded JSON database and write through to it.
+
+        Args:
+            sharded_database (sdb.ShardedJsonDatabase, optional): Database to load.
+                Defaults to the project sharded database.
+
+        Returns:
+            PipelineQueries: Loaded queries.
+        """
+        sharded_database = sharded_database or sdb.ShardedJsonDatabase()
+
+        pipeline_queries = cls(sharded_database)
+        pipeline_queries.tasks.load(sharded_database.tasks.find())
+        pipeline_queries.notes.load(sharded_database.notes.find())
+        pipeline_queries.users.load(sharded_database.users.find())
+
+        return pipeline_queries
+
+    # Tasks
+    def get_user_tasks(self, username: str, status: str = None) -> List[dict]:
+        """Get tasks assigned to a user, optionally only with a status."""
+        if status is None:
+            return self.tasks.find(user=username)
+        return self.tasks.find(user=username, status=status)
+
+    def get_asset_tasks(self, asset_id: int, status: str = None) -> List[dict]:
+        """Get tasks of an asset, optionally only with a status."""
+        if status is None:
+            return self.tasks.find(asset_id=asset_id)
+        return self.tasks.find(asset_id=asset_id, status=status)
+
+    def get_tasks_by_status(self, status: str) -> List[dict]:
+        """Get all tasks with a status i.e. "open"."""
+        return self.tasks.find(status=status)
+
+    def get_tasks_updated_between(self, start: str, end: str) -> List[dict]:
+        """Get tasks last updated within an ISO timestamp range, oldest first."""
+        return self.tasks.find_between("updated_at", start, end)
+
+    # Notes
+    def get_asset_notes(self, asset_id: int) -> List[dict]:
+        """Get notes on an asset."""
+        return self.notes.find(asset_id=asset_id)
+
+    def get_variant_notes(self, variant_id: int) -> List[dict]:
+        """Get notes on an asset variant."""
+        return self.notes.find(variant_id=variant_id)
+
+    def get_publish_notes(self, publish_id: int) -> List[dict]:
+        """Get notes on a published version."""
+        return self.notes.find(publish_id=publish_id)
+
+    def get_user_notes(self, username: str) -> List[dict]:
+        """Get notes written by a user."""
+        return self.notes.find(user=username)
+
+    def get_notes_between(self, start: str, end: str) -> List[dict]:
+        """Get notes created within an ISO timestamp range, oldest first."""
+        return self.notes.find_between("created_at", start, end)
+
+    # Users
+    def get_user(self, username: str) -> Optional[dict]:
+        """Get user record by username. None if not found."""
+        matching_users = self.users.find(username=username)
+        return matching_users[0] if matching_users else None
+
+
+def benchmark_queries(record_counts: List[int] = None, lookup_count: int = 1000):
+    """Time indexed lookups against a linear scan at growing record counts.
+
+    Args:
+        record_counts (List[int], optional): Number of tasks to generate per run.
+            Defaults to [1000, 10000, 100000].
+        lookup_count (int, optional): Lookups timed per run. Defaults to 1000.
+
+    Returns:
+        list: (record count, indexed lookup µs, linear scan µs) per run.
+    """
+    record_counts = record_counts or [1_000, 10_000, 100_000]
+    statuses = ["open", "in_progress", "review", "done"]
+
+    benchmark_results = []
+    for record_count in record_counts:
+        user_count = max(record_count // 20, 1)
+        task_collection = IndexedRecordCollection(TASK_INDEX_FIELDS, TASK_DATE_FIELDS)
+        task_collection.load(
+            (
+                str(task_num),
+                {
+                    "title": f"Task {task_num}",
+                    "user": f"user{task_num % user_count}",
+                    "status": statuses[task_num % len(statuses)],
+                    "asset_id": task_num % (record_count // 10 or 1),
+                    "created_at": f"2024-01-01T00:00:{task_num % 60:02d}",
+                    "updated_at": f"2024-01-01T00:00:{task_num % 60:02d}",
+                },
+            )
+            for task_num in range(record_count)
+        )
+
+        start_time = time.perf_counter()
+        for lookup_num in range(lookup_count):
+            task_collection.find(user=f"user{lookup_num % user_count}", status="open")
+        indexed_time = (time.perf_counter() - start_time) / lookup_count
+
+        scan_records = task_collection.find()
+        scan_lookups = max(lookup_count // 100, 1)
+        start_time = time.perf_counter()
+        for lookup_num in range(scan_lookups):
+            username = f"user{lookup_num % user_count}"
+            [
+                task
+                for task in scan_records
+                if task["user"] == username and task["status"] == "open"
+            ]
+        scan_time = (time.perf_counter() - start_time) / scan_lookups
+
+        benchmark_results.append(
+            (record_count, indexed_time * 1_000_000, scan_time * 1_000_000)
+        )
+        LOG.info(
+            "%7d tasks: indexed %8.2f µs/lookup, linear scan %10.2f µs/lookup",
+            *benchmark_results[-1],
+        )
+
+    return benchmark_results
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    benchmark_queries()
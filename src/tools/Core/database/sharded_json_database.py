@@ -0,0 +1,459 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Sharded JSON storage layer for the pipeline database entities.
+
+File based alternative to the SQLite pipeline database for shares where SQLite
+locking isn't reliable. Instead of one DB_*.json file per entity, every record is
+its own small JSON file under a hashed subdirectory:
+
+    <root>/<entity>/<2 hex chars>/<record key>.json
+
+Each entity also has a compact index of a few fields per record so listings and
+lookups don't need to open every shard. Index changes are appended to a small log
+and periodically folded into the index snapshot, so updating one record writes a
+few hundred bytes instead of the whole entity database. The index can always be
+rebuilt from the shards, which stay the source of truth.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from Core import core_paths as cpath
+from Core.util import file_util_tools as fut
+
+# Main paths
+MAIN_PATHS = cpath.core_paths()
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+# Fields kept in each entity's index, in addition to the record key
+ENTITY_INDEX_FIELDS = {
+    "asset": ["category", "name"],
+    "asset_variant": ["asset_id", "name"],
+    "publish": ["variant_id", "version", "published_at"],
+    "task": ["user", "status", "asset_id", "variant_id"],
+    "user": ["username"],
+    "note": ["user", "asset_id", "variant_id", "publish_id"],
+}
+
+# Fold the index log into the snapshot once it grows past this many bytes
+INDEX_LOG_COMPACTION_BYTES = 256 * 1024
+
+# Number of parsed records kept in memory per entity
+DEFAULT_CACHE_SIZE = 2048
+
+INDEX_SNAPSHOT_NAME = "_index.json"
+INDEX_LOG_NAME = "_index.log"
+
+INVALID_KEY_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def get_file_signature(file_path: str) -> tuple:
+    """Get (modification time, size) of a file to detect changes cheaply."""
+    file_stat = os.stat(file_path)
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def get_shard_name(record_key: str) -> str:
+    """Get hashed shard subdirectory name of a record key."""
+    return hashlib.sha1(record_key.encode("utf-8")).hexdigest()[:2]
+
+
+class ShardedJsonStore:
+    """Records of one entity stored as one JSON file each."""
+
+    def __init__(
+        self,
+        entity_directory: str,
+        index_fields: List[str] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        """Initialize store.
+
+        Args:
+            entity_directory (str): Root directory of the entity's shards.
+            index_fields (List[str], optional): Record fields kept in the index.
+                Defaults to no fields.
+            cache_size (int, optional): Max number of parsed records cached.
+                Defaults to DEFAULT_CACHE_SIZE.
+        """
+        self.entity_directory = entity_directory
+        self.index_fields = index_fields or []
+        self.cache_size = cache_size
+
+        self._lock = threading.RLock()
+        self._record_cache: OrderedDict = OrderedDict()
+        self._index: Dict[str, dict] = {}
+        self._index_snapshot_signature = None
+        self._index_log_offset = 0
+
+        fut.create_directory(entity_directory)
+
+    @property
+    def index_snapshot_path(self) -> str:
+        return f"{self.entity_directory}/{INDEX_SNAPSHOT_NAME}"
+
+    @property
+    def index_log_path(self) -> str:
+        return f"{self.entity_directory}/{INDEX_LOG_NAME}"
+
+    def get_record_path(self, record_key: str) -> str:
+        """Get shard file path of a record.
+
+        Args:
+            record_key (str): Record key. Only letters, numbers, "_", "." and "-".
+
+        Returns:
+            str: Record JSON file path.
+        """
+        if not record_key or INVALID_KEY_CHARACTERS.search(record_key):
+            raise ValueError(f"Invalid record key: '{record_key}'")
+
+        return f"{self.entity_directory}/{get_shard_name(record_key)}/{record_key}.json"
+
+    # Records
+    def get(self, record_key: str) -> Optional[dict]:
+        """Get a record, read through the in-memory cache.
+
+        The shard is only parsed again if its modification time or size changed
+        since it was cached.
+
+        Args:
+            record_key (str): Record key.
+
+        Returns:
+            dict: Record data. None if the record doesn't exist.
+        """
+        record_path = self.get_record_path(record_key)
+        try:
+            record_signature = get_file_signature(record_path)
+        except FileNotFoundError:
+            with self._lock:
+                self._record_cache.pop(record_key, None)
+            return None
+
+        with self._lock:
+            cached_record = self._record_cache.get(record_key)
+            if cached_record is not None and cached_record[0] == record_signature:
+                self._record_cache.move_to_end(record_key)
+                return dict(cached_record[1])
+
+        record_data = fut.get_json_data(record_path)
+        self._cache_record(record_key, record_signature, record_data)
+
+        return dict(record_data)
+
+    def put(self, record_key: str, record_data: dict) -> None:
+        """Create or replace a record.
+
+        Only the record's shard is rewritten. The index is updated with one
+        appended log line if an indexed field changed.
+
+        Args:
+            record_key (str): Record key.
+            record_data (dict): JSON serializable record data.
+        """
+        record_path = self.get_record_path(record_key)
+        fut.create_directory(cpath.get_parent_directory(record_path, 0))
+        fut.write_json_data(record_data, record_path, compact=True)
+        self._cache_record(record_key, get_file_signature(record_path), record_data)
+
+        index_entry = self._build_index_entry(record_data)
+        with self._lock:
+            self._load_index()
+            if self._index.get(record_key) == index_entry:
+                return
+            self._append_index_change({"key": record_key, "fields": index_entry})
+
+    def update(self, record_key: str, **changed_fields) -> dict:
+        """Change some fields of an existing record.
+
+        Args:
+            record_key (str): Record key.
+            **changed_fields: Field values to set.
+
+        Returns:
+            dict: Updated record data.
+        """
+        record_data = self.get(record_key)
+        if record_data is None:
+            raise KeyError(f"No record with key: '{record_key}'")
+
+        record_data.update(changed_fields)
+        self.put(record_key, record_data)
+
+        return record_data
+
+    def delete(self, record_key: str) -> None:
+        """Delete a record.
+
+        Args:
+            record_key (str): Record key.
+        """
+        record_path = self.get_record_path(record_key)
+        if os.path.exists(record_path):
+            os.remove(record_path)
+
+        with self._lock:
+            self._record_cache.pop(record_key, None)
+            self._load_index()
+            if record_key in self._index:
+                self._append_index_change({"key": record_key, "deleted": True})
+
+    def _cache_record(self, record_key: str, record_signature: tuple, record_data):
+        with self._lock:
+            self._record_cache[record_key] = (record_signature, dict(record_data))
+            self._record_cache.move_to_end(record_key)
+            while len(self._record_cache) > self.cache_size:
+                self._record_cache.popitem(last=False)
+
+    # Index
+    def keys(self) -> List[str]:
+        """Get every record key."""
+        with self._lock:
+            self._load_index()
+            return list(self._index.keys())
+
+    def get_index_entry(self, record_key: str) -> Optional[dict]:
+        """Get indexed fields of a record without opening its shard."""
+        with self._lock:
+            self._load_index()
+            index_entry = self._index.get(record_key)
+
+        return dict(index_entry) if index_entry is not None else None
+
+    def find_keys(self, **field_filters) -> List[str]:
+        """Get keys of records whose indexed fields match every filter.
+
+        Args:
+            **field_filters: Indexed field values to match i.e. status="open".
+
+        Returns:
+            List[str]: Matching record keys.
+        """
+        for field_name in field_filters:
+            if field_name not in self.index_fields:
+                raise ValueError(f"Field '{field_name}' is not indexed.")
+
+        with self._lock:
+            self._load_index()
+            return [
+                record_key
+                for record_key, index_entry in self._index.items()
+                if all(
+                    index_entry.get(field_name) == field_value
+                    for field_name, field_value in field_filters.items()
+                )
+            ]
+
+    def find(self, **field_filters) -> Iterator[Tuple[str, dict]]:
+        """Yield (key, record) pairs of records whose indexed fields match."""
+        for record_key in self.find_keys(**field_filters):
+            record_data = self.get(record_key)
+            if record_data is not None:
+                yield record_key, record_data
+
+    def _build_index_entry(self, record_data: dict) -> dict:
+        return {
+            field_name: record_data.get(field_name) for field_name in self.index_fields
+        }
+
+    def _append_index_change(self, index_change: dict) -> None:
+        change_line = (json.dumps(index_change, separators=(",", ":")) + "\n").encode(
+            "utf-8"
+        )
+        log_descriptor = os.open(
+            self.index_log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+        )
+        try:
+            os.write(log_descriptor, change_line)
+        finally:
+            os.close(log_descriptor)
+
+        self._load_index()
+        if self._index_log_offset >= INDEX_LOG_COMPACTION_BYTES:
+            self.compact_index()
+
+    def _load_index(self) -> None:
+        """Bring the in-memory index up to date with the snapshot and log."""
+        snapshot_signature = None
+        if os.path.exists(self.index_snapshot_path):
+            snapshot_signature = get_file_signature(self.index_snapshot_path)
+
+        log_size = 0
+        if os.path.exists(self.index_log_path):
+            log_size = os.path.getsize(self.index_log_path)
+
+        # Reload the snapshot if it changed or the log was restarted by another
+        # process's compaction
+        if (
+            snapshot_signature != self._index_snapshot_signature
+            or self._index_log_offset > log_size
+        ):
+            snapshot_data = {}
+            if snapshot_signature is not None:
+                snapshot_data = fut.get_json_data(self.index_snapshot_path) or {}
+            self._index = snapshot_data.get("entries", {})
+            self._index_log_offset = snapshot_data.get("log_offset", 0)
+            self._index_snapshot_signature = snapshot_signature
+
+        # Replaying changes already in the snapshot is harmless, they are in order
+        if self._index_log_offset > log_size:
+            self._index_log_offset = 0
+
+        if log_size == self._index_log_offset:
+            return
+
+        with open(self.index_log_path, "rb") as index_log:
+            index_log.seek(self._index_log_offset)
+            new_data = index_log.read()
+
+        complete_length = new_data.rfind(b"\n") + 1
+        for change_line in new_data[:complete_length].splitlines():
+            if not change_line.strip():
+                continue
+            index_change = json.loads(change_line)
+            if index_change.get("deleted"):
+                self._index.pop(index_change["key"], None)
+            else:
+                self._index[index_change["key"]] = index_change["fields"]
+        self._index_log_offset += complete_length
+
+    def compact_index(self) -> None:
+        """Fold the index log into the index snapshot.
+
+        The log is restarted if nothing was appended to it while compacting. A
+        change appended by another process in that instant is only lost from the
+        index, not the shards, and is recovered by rebuild_index().
+        """
+        with self._lock:
+            self._load_index()
+            log_size = 0
+            if os.path.exists(self.index_log_path):
+                log_size = os.path.getsize(self.index_log_path)
+            restart_log = log_size == self._index_log_offset
+
+            fut.write_json_data(
+                {
+                    "log_offset": 0 if restart_log else self._index_log_offset,
+                    "entries": self._index,
+                },
+                self.index_snapshot_path,
+                compact=True,
+            )
+            if restart_log and log_size:
+                os.truncate(self.index_log_path, 0)
+                self._index_log_offset = 0
+
+            self._index_snapshot_signature = get_file_signature(
+                self.index_snapshot_path
+            )
+
+    def rebuild_index(self) -> int:
+        """Rebuild the index by reading every shard.
+
+        Returns:
+            int: Number of indexed records.
+        """
+        rebuilt_index = {}
+        for shard_name in os.listdir(self.entity_directory):
+            shard_directory = f"{self.entity_directory}/{shard_name}"
+            if not os.path.isdir(shard_directory):
+                continue
+            for record_file in os.listdir(shard_directory):
+                if not record_file.endswith(".json"):
+                    continue
+                record_data = fut.get_json_data(f"{shard_directory}/{record_file}")
+                rebuilt_index[record_file[: -len(".json")]] = self._build_index_entry(
+                    record_data
+                )
+
+        with self._lock:
+            fut.write_json_data(
+                {"log_offset": 0, "entries": rebuilt_index},
+                self.index_snapshot_path,
+                compact=True,
+            )
+            if os.path.exists(self.index_log_path):
+                os.truncate(self.index_log_path, 0)
+            self._index = rebuilt_index
+            self._index_log_offset = 0
+            self._index_snapshot_signature = get_file_signature(
+                self.index_snapshot_path
+            )
+
+        LOG.info(
+            "Rebuilt index of %s record(s) in: %s",
+            len(rebuilt_index),
+            self.entity_directory,
+        )
+
+        return len(rebuilt_index)
+
+
+class ShardedJsonDatabase:
+    """Sharded JSON stores of every pipeline database entity."""
+
+    def __init__(self, root_directory: str = None):
+        """Initialize database.
+
+        Args:
+            root_directory (str, optional): Root directory of all entity stores.
+                Defaults to core_paths()["database_paths"]["sharded"].
+        """
+        if root_directory is None:
+            root_directory = MAIN_PATHS["database_paths"]["sharded"]
+
+        self.root_directory = root_directory
+        self.stores = {
+            entity_name: ShardedJsonStore(f"{root_directory}/{entity_name}", fields)
+            for entity_name, fields in ENTITY_INDEX_FIELDS.items()
+        }
+
+        self.assets = self.stores["asset"]
+        self.asset_variants = self.stores["asset_variant"]
+        self.publishes = self.stores["publish"]
+        self.tasks = self.stores["task"]
+        self.users = self.stores["user"]
+        self.notes = self.stores["note"]
+
+    def import_json_databases(self, json_database_paths: Dict[str, str] = None) -> dict:
+        """Split the monolithic DB_*.json database files into shards.
+
+        Args:
+            json_database_paths (dict, optional): JSON paths keyed by entity name
+                i.e. "asset", "publish". Defaults to core_paths()["database_paths"].
+
+        Returns:
+            dict: Number of imported records keyed by entity name.
+        """
+        if json_database_paths is None:
+            json_database_paths = MAIN_PATHS["database_paths"]
+
+        imported_counts = {}
+        for entity_name, entity_store in self.stores.items():
+            json_path = json_database_paths.get(entity_name)
+            if json_path is None or not os.path.exists(json_path):
+                continue
+
+            imported_counts[entity_name] = 0
+            for record_key, record_data in fut.iter_json_items(json_path):
+                if not isinstance(record_data, dict):
+                    continue
+                entity_store.put(
+                    INVALID_KEY_CHARACTERS.sub("_", str(record_key)), record_data
+                )
+                imported_counts[entity_name] += 1
+
+            entity_store.compact_index()
+            LOG.info(
+                "Imported %s %s record(s).", imported_counts[entity_name], entity_name
+            )
+
+        return imported_counts
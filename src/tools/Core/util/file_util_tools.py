@@ -6,9 +6,33 @@ import logging
 import os
 from pathlib import Path
 import re
+import shutil
+import tempfile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 LOG = logging.getLogger(os.path.basename(__file__))
 
+# Bytes read at a time when streaming large JSON files
+JSON_STREAM_CHUNK_SIZE = 64 * 1024
+
+_JSON_WHITESPACE = " \t\n\r"
+
+
+def _get_new_file_mode() -> int:
+    """Get the permissions open() gives new files under the process umask."""
+    process_umask = os.umask(0)
+    os.umask(process_umask)
+
+    return 0o666 & ~process_umask
+
+
+# Permissions of new files written atomically. Temporary files are private (0600)
+NEW_FILE_MODE = _get_new_file_mode()
+
 
 def get_files_or_folders(
     starting_directory: str,
@@ -84,8 +108,12 @@ def get_json_data(json_path: str):
         Json data.
     """
     json_data = None
-    with open(json_path, encoding="utf-8") as json_data:
-        json_data = json.load(json_data)
+    if orjson is not None:
+        with open(json_path, "rb") as json_file:
+            json_data = orjson.loads(json_file.read())
+    else:
+        with open(json_path, encoding="utf-8") as json_file:
+            json_data = json.load(json_file)
 
     if isinstance(json_data, dict) is False:
         LOG.error("Failed to load JSON data. Check file at: %s", json_path)
@@ -94,15 +122,168 @@ def get_json_data(json_path: str):
     return json_data
 
 
-def write_json_data(data: dict, json_path: str):
-    """Write data to JSON file on disk.
+def write_json_data(data: dict, json_path: str, compact: bool = False):
+    """Write data to JSON file on disk atomically.
+
+    Data is written to a temporary file in the same directory, flushed to disk and
+    then swapped into place so a crash never leaves a truncated file behind.
 
     Args:
         data (dict): Data to be written.
         json_path (str): Path to JSON data to.
+        compact (bool, optional): Write without indentation or extra whitespace.
+            Uses orjson when installed. Defaults to False.
+    """
+    if compact and orjson is not None:
+        json_bytes = orjson.dumps(data)
+    elif compact:
+        json_bytes = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    else:
+        json_bytes = json.dumps(data, indent=4).encode("utf-8")
+
+    write_file_atomic(json_bytes, json_path)
+
+
+def write_file_atomic(file_bytes: bytes, file_path: str):
+    """Replace a file's contents in a single atomic step.
+
+    The file keeps its existing permissions, and new files get the umask default
+    like open() would give them.
+
+    Args:
+        file_bytes (bytes): New file contents.
+        file_path (str): Path of file to write.
     """
-    with open(json_path, "w", encoding="utf-8") as out_file:
-        json.dump(data, out_file, indent=4)
+    parent_directory = os.path.dirname(os.path.abspath(file_path))
+    temp_descriptor, temp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=parent_directory
+    )
+    try:
+        with os.fdopen(temp_descriptor, "wb") as temp_file:
+            temp_file.write(file_bytes)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        else:
+            os.chmod(temp_path, NEW_FILE_MODE)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class _JsonStreamReader:
+    """Chunked reader that decodes one JSON value at a time from a text file."""
+
+    def __init__(self, json_file):
+        self._json_file = json_file
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._is_eof = False
+
+    def _read_more(self) -> bool:
+        if self._is_eof:
+            return False
+
+        new_data = self._json_file.read(JSON_STREAM_CHUNK_SIZE)
+        if not new_data:
+            self._is_eof = True
+            return False
+
+        self._buffer = self._buffer[self._position :] + new_data
+        self._position = 0
+        return True
+
+    def next_character(self) -> str:
+        """Consume whitespace and return the next character without consuming it."""
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in _JSON_WHITESPACE
+            ):
+                self._position += 1
+
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+
+            if not self._read_more():
+                return ""
+
+    def expect(self, character: str) -> None:
+        """Consume an expected structural character."""
+        if self.next_character() != character:
+            raise ValueError(
+                f"Expected '{character}' while streaming JSON, found "
+                f"'{self.next_character()}'."
+            )
+        self._position += 1
+
+    def decode_value(self):
+        """Decode the next complete JSON value."""
+        self.next_character()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._read_more():
+                    raise
+                continue
+
+            # A value ending exactly at the buffer end may be a truncated number
+            if end == len(self._buffer) and self._read_more():
+                continue
+
+            self._position = end
+            return value
+
+
+def iter_json_array(json_path: str):
+    """Stream items of a top level JSON array one at a time.
+
+    Args:
+        json_path (str): Path of json file containing an array.
+
+    Yields:
+        Each item of the array.
+    """
+    with open(json_path, encoding="utf-8") as json_file:
+        stream = _JsonStreamReader(json_file)
+        stream.expect("[")
+        if stream.next_character() == "]":
+            return
+
+        while True:
+            yield stream.decode_value()
+            if stream.next_character() == "]":
+                return
+            stream.expect(",")
+
+
+def iter_json_items(json_path: str):
+    """Stream key/value pairs of a top level JSON object one at a time.
+
+    Args:
+        json_path (str): Path of json file containing an object.
+
+    Yields:
+        tuple: (key, value) of each object member.
+    """
+    with open(json_path, encoding="utf-8") as json_file:
+        stream = _JsonStreamReader(json_file)
+        stream.expect("{")
+        if stream.next_character() == "}":
+            return
+
+        while True:
+            item_key = stream.decode_value()
+            stream.expect(":")
+            yield item_key, stream.decode_value()
+            if stream.next_character() == "}":
+                return
+            stream.expect(",")
 
 
 def create_directory(directory_path: str):
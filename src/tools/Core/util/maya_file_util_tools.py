@@ -33,6 +33,57 @@ def create_from_current_scene(save_file_path):
     cmds.file(force=True, save=True, options="v=0;", type="mayaBinary")
 
 
+def export_gpu_cache(gpu_cache_path: str, root_nodes: list = None):
+    """Export a static GPU cache (Alembic) of the current scene.
+
+    Args:
+        gpu_cache_path (str): Full path of the .abc file to write.
+        root_nodes (list, optional): DAG nodes to export. Defaults to all top level
+            nodes except cameras.
+
+    Returns:
+        str: Path to the GPU cache file if exported. Otherwise, None.
+    """
+    if root_nodes is None:
+        camera_shapes = cmds.ls(cameras=True) or []
+        camera_transforms = cmds.listRelatives(camera_shapes, parent=True) or []
+        root_nodes = [
+            node for node in cmds.ls(assemblies=True) if node not in camera_transforms
+        ]
+
+    if not root_nodes:
+        LOG.warning("No nodes found to export GPU cache.")
+        return None
+
+    cmds.loadPlugin("gpuCache", quiet=True)
+
+    cache_directory = cpath.get_parent_directory(gpu_cache_path, 0)
+    if os.path.exists(cache_directory) is False:
+        fut.create_directory(cache_directory)
+
+    LOG.debug("EXPORTING GPU CACHE: %s", gpu_cache_path)
+    cmds.gpuCache(
+        root_nodes,
+        startTime=1,
+        endTime=1,
+        optimize=True,
+        optimizationThreshold=40000,
+        writeMaterials=True,
+        dataFormat="ogawa",
+        allDagObjects=False,
+        # Otherwise fileName is a prefix and each root node gets its own file
+        saveMultipleFiles=False,
+        directory=cache_directory,
+        fileName=os.path.splitext(os.path.basename(gpu_cache_path))[0],
+    )
+
+    if not os.path.isfile(gpu_cache_path):
+        LOG.error("GPU cache was not written: %s", gpu_cache_path)
+        return None
+
+    return gpu_cache_path
+
+
 def create_from_file(source_path: str, destination_path: str):
     """Create wip binary file from file path in UI.
 
@@ -106,7 +157,11 @@ def open_maya_file(maya_file_path):
     cmds.file(maya_file_path, open=True, force=True)
 
 
-def repath_textures(save_directory_path: str, parent_ui_object: QtWidgets.QWidget):
+def repath_textures(
+    save_directory_path: str,
+    parent_ui_object: QtWidgets.QWidget,
+    make_writable: bool = True,
+):
     """Copy and repath the current scenes texture files.
 
     Copy the current scenes texture files to the destination directory textures
@@ -115,6 +170,8 @@ def repath_textures(save_directory_path: str, parent_ui_object: QtWidgets.QWidge
     Args:
         save_directory_path (str): Path to directory where textures will be copied to.
         parent_ui_object (QtWidgets.QWidget): Parent widget object.
+        make_writable (bool, optional): Make the copies writable. Pass False when
+            version control opens them, like a Perforce publish. Defaults to True.
     """
     if os.path.exists(save_directory_path) is False:
         fut.create_directory(save_directory_path)
@@ -152,6 +209,7 @@ def repath_textures(save_directory_path: str, parent_ui_object: QtWidgets.QWidge
                 texture_progress_bar,
                 texture_node,
                 texture_progress_bar,
+                make_writable,
             )
 
         # If not copying UDIM files...
@@ -167,8 +225,9 @@ def repath_textures(save_directory_path: str, parent_ui_object: QtWidgets.QWidge
         LOG.debug("Copying %s to:\n%s", current_texture_path, new_file_path)
         shutil.copy2(current_texture_path, new_file_path)
 
-        # Make file writable if it's controlled by version control
-        os.chmod(new_file_path, stat.S_IWRITE)
+        # Make file writable if it's read-only and not opened by version control
+        if make_writable:
+            os.chmod(new_file_path, stat.S_IWRITE)
 
         # Repath texture on file node
         cmds.setAttr(texture_node + ".fileTextureName", new_file_path, type="string")
@@ -203,6 +262,7 @@ def copy_udim_textures(
     texture_progress_bar: QtWidgets.QProgressDialog,
     texture_node: str,
     parent_ui_object: QtWidgets.QWidget,
+    make_writable: bool = True,
 ):
     """Copy all udim textures to textures folder.
 
@@ -213,6 +273,8 @@ def copy_udim_textures(
             bar widget texture copying progress.
         texture_node (str): File node.
         parent_ui_object (QtWidgets.QWidget): Parent widget object.
+        make_writable (bool, optional): Make the copies writable. Pass False when
+            version control opens them, like a Perforce publish. Defaults to True.
     """
     logging.info("Found UDIM textures...")
     all_udim_paths = get_all_udim_texture_paths(current_texture_path)
@@ -250,8 +312,9 @@ def copy_udim_textures(
         new_file_path = f"{save_directory_path}/{udim_path.split('/')[-1]}"
         # Copy file to new file path
         shutil.copy2(udim_path, new_file_path)
-        # Make file writable if it's controlled by version control
-        os.chmod(new_file_path, stat.S_IWRITE)
+        # Make file writable if it's read-only and not opened by version control
+        if make_writable:
+            os.chmod(new_file_path, stat.S_IWRITE)
 
         udim_num += 1
 
@@ -27,11 +27,10 @@ global login/connection in p4 is set to the project's server location.
 from datetime import datetime
 import logging
 import os
-import subprocess as sp
-
-from P4 import P4, P4Exception
 
 from Core import core_paths as cpath
+from Perforce.DatabaseTasks.src import task_queue as tq
+from Perforce.util.src import p4_session as p4s
 
 from src.tools.Core.util import file_util_tools as fut
 
@@ -43,78 +42,77 @@ TASKS_DIRECTORY = f"{MODULE_PATH}/tasks"
 
 
 def create_db_task():
-    p4 = P4()
-    p4.connect()
+    with p4s.get_session_pool().session() as p4:
+        p4_client = p4.client
 
-    LOG.info("client: %s", p4.client)
+    LOG.info("client: %s", p4_client)
 
     changed_files = [
         (
-            f"//{p4.client}/DCC/Pipe/src/tools/Perforce/DatabaseTasks/tasks/"
+            f"//{p4_client}/DCC/Pipe/src/tools/Perforce/DatabaseTasks/tasks/"
             "test_data.json"
         )
     ]
-    change_msg = p4.save_change({"Change": "new", "Description": "test description"})[0]
-    changelist_num = int(change_msg.split(" ")[1])
+    changelist_num = create_new_changelist("test description")
 
     add_perforce_files(changed_files, changelist_num)
 
     LOG.info("changelist_num: %s", changelist_num)
 
-    fetched_change = p4.fetch_change(changelist_num)
+    p4s.submit_changelist(changelist_num)
 
-    p4.run_submit(fetched_change)
 
-    # p4_set_cmd = "p4 set"
-    # sp_process = sp.Popen(
-    #     p4_set_cmd, shell=True, stdout=sp.PIPE, stderr=sp.PIPE, text=True
-    # )
+def add_perforce_files(files_to_add: list, changelist_num: int):
+    """Mark files for add in a changelist with a single server call.
 
-    # p4_set_output = ""
-    # with sp_process as process:
-    #     stdout, stderr = process.communicate()
-    #     LOG.debug("P4 Set Errors: %s", stderr)
-    #     p4_set_output = stdout.split("\n")
+    Args:
+        files_to_add (list): Local or depot file paths.
+        changelist_num (int): Changelist to open files in.
 
-    # username = get_p4_user(p4_set_output)
-    # print(f"output:\n{p4_set_output}")
-    # print(f"username: {username}")
+    Returns:
+        list: Server results.
+    """
+    try:
+        return p4s.run_add(files_to_add, changelist_num)
+    except p4s.P4Exception as p4_error:
+        LOG.error("P4 Add Errors: %s", p4_error)
+        return []
 
-    # test_data = {"username": username}
 
-    # send_db_task(test_data)
+def send_db_task(task_data: dict):
+    """Queue a database task to be submitted with the next batch.
 
+    Only stores the task, so it never waits on the server. Batches are submitted
+    by the queue's background flush thread, which is started if needed.
 
-def add_perforce_files(files_to_add: list, changelist_num: int):
-    for new_file in files_to_add:
-        p4_add_cmd = f"p4 add -c {changelist_num} {new_file}"
+    Args:
+        task_data (dict): JSON serializable task record.
 
-        sp_process = sp.Popen(
-            p4_add_cmd, shell=True, stdout=sp.PIPE, stderr=sp.PIPE, text=True
-        )
-        with sp_process as process:
-            stdout, stderr = process.communicate()
-            LOG.debug("P4 Add Errors: %s", stderr)
+    Returns:
+        int: Queued task id.
+    """
+    LOG.info("Sending Database task...")
+    task_queue = tq.get_task_queue()
+    task_id = task_queue.enqueue(task_data)
+    task_queue.start_background_flush()
 
+    return task_id
 
-def send_db_task(task_data: dict):
-    LOG.info("Sending Database task...")
-    create_new_changelist()
 
+def create_new_changelist(description: str = "Database task") -> int:
+    """Create a numbered pending changelist.
 
-def create_new_changelist():
-    p4_create_changelist_cmd = "p4 change -i"
+    Args:
+        description (str, optional): Changelist description.
+            Defaults to "Database task".
 
-    sp_process = sp.Popen(
-        p4_create_changelist_cmd, shell=True, stdout=sp.PIPE, stderr=sp.PIPE, text=True
-    )
-    change_output = ""
-    with sp_process as process:
-        stdout, stderr = process.communicate()
-        LOG.debug("P4 Change Errors: %s", stderr)
-        change_output = stdout
+    Returns:
+        int: New changelist number.
+    """
+    changelist_num = p4s.create_changelist(description)
+    LOG.debug("Created changelist: %s", changelist_num)
 
-    print(change_output)
+    return changelist_num
 
 
 def get_p4_user(p4_set_output: list):
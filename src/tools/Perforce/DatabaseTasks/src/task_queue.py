@@ -0,0 +1,367 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Durable offline queue of database tasks.
+
+Tasks are stored in a local SQLite file as soon as they are sent, so nothing is lost
+if the server is down or the artist is offline. Pending tasks are flushed in
+batches, written to one task file and submitted in a single changelist, once enough
+tasks are waiting or the oldest one has waited long enough. Failed submits are
+retried with exponential backoff, during which the whole queue waits since every
+batch goes to the same server.
+
+The server side is a backend object with a submit_batch(file_paths, description)
+method that raises P4Exception or OSError when the server can't be reached, so the
+queue can be run against a fake backend without a Perforce server.
+"""
+
+from __future__ import annotations
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Callable, List
+
+from Core import core_paths as cpath
+from Core.util import file_util_tools as fut
+
+from Perforce.util.src import p4_session as p4s
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+MODULE_PATH = f"{cpath.get_parent_directory(__file__, 1)}"
+
+TASKS_DIRECTORY = f"{MODULE_PATH}/tasks"
+
+DEFAULT_QUEUE_PATH = f"{TASKS_DIRECTORY}/task_queue.db"
+
+# Flush once this many tasks are pending...
+DEFAULT_BATCH_SIZE = 50
+# ...or the oldest pending task has waited this many seconds
+DEFAULT_FLUSH_INTERVAL = 60.0
+
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 15 * 60.0
+
+BUSY_TIMEOUT = 30.0
+
+_TASK_QUEUE = None
+_TASK_QUEUE_LOCK = threading.Lock()
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_data TEXT NOT NULL,
+    created_time REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_time REAL NOT NULL DEFAULT 0,
+    last_error TEXT NOT NULL DEFAULT '',
+    changelist INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_pending
+    ON tasks (changelist, next_attempt_time);
+"""
+
+
+class P4TaskBackend:
+    """Submits task batch files to Perforce, one changelist per batch."""
+
+    def __init__(self, session_pool: p4s.P4SessionPool = None):
+        """Initialize backend.
+
+        Args:
+            session_pool (p4s.P4SessionPool, optional): Pool to use. Defaults to the
+                shared session pool.
+        """
+        self.session_pool = session_pool
+
+    def submit_batch(self, file_paths: List[str], description: str) -> int:
+        """Add and submit task files in one changelist.
+
+        Args:
+            file_paths (List[str]): Local task file paths.
+            description (str): Changelist description.
+
+        Returns:
+            int: Submitted changelist number.
+        """
+        changelist_num = p4s.create_changelist(description, self.session_pool)
+        try:
+            p4s.run_add(file_paths, changelist_num, self.session_pool)
+            p4s.submit_changelist(changelist_num, self.session_pool)
+        except p4s.P4Exception:
+            self._discard_changelist(changelist_num)
+            raise
+
+        return changelist_num
+
+    def _discard_changelist(self, changelist_num: int) -> None:
+        session_pool = self.session_pool or p4s.get_session_pool()
+        try:
+            with session_pool.session() as p4:
+                p4.run("revert", "-k", "-c", str(changelist_num), "//...")
+                p4.run("change", "-d", str(changelist_num))
+        except p4s.P4Exception as p4_error:
+            LOG.warning(
+                "Could not clean up changelist %s: %s", changelist_num, p4_error
+            )
+
+
+class DbTaskQueue:
+    """Local durable queue of database tasks with batched submits."""
+
+    def __init__(
+        self,
+        queue_path: str = DEFAULT_QUEUE_PATH,
+        backend=None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Open (and create if needed) a task queue.
+
+        Args:
+            queue_path (str, optional): Path to the queue's SQLite file.
+                Defaults to DEFAULT_QUEUE_PATH.
+            backend (optional): Object with a submit_batch(file_paths, description)
+                method returning a changelist number. Defaults to P4TaskBackend.
+            batch_size (int, optional): Max tasks per submit and pending count that
+                triggers a flush. Defaults to DEFAULT_BATCH_SIZE.
+            flush_interval (float, optional): Seconds the oldest pending task waits
+                before triggering a flush. Defaults to DEFAULT_FLUSH_INTERVAL.
+            clock (Callable, optional): Returns current epoch time.
+                Defaults to time.time.
+        """
+        if queue_path != ":memory:":
+            fut.create_directory(cpath.get_parent_directory(queue_path, 0))
+
+        self.queue_path = queue_path
+        self.backend = backend or P4TaskBackend()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flush_thread = None
+
+        self._connection = sqlite3.connect(
+            queue_path,
+            timeout=BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(QUEUE_SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def enqueue(self, task_data: dict) -> int:
+        """Store a task until it is submitted.
+
+        Args:
+            task_data (dict): JSON serializable task record.
+
+        Returns:
+            int: Queued task id.
+        """
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "INSERT INTO tasks (task_data, created_time) VALUES (?, ?)",
+                (json.dumps(task_data), self.clock()),
+            )
+
+        return cursor.lastrowid
+
+    def get_pending_count(self) -> int:
+        """Get number of tasks not yet submitted."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM tasks WHERE changelist IS NULL"
+            ).fetchone()[0]
+
+    def get_retry_time(self) -> float:
+        """Get epoch time the queue may submit again after a failed submit."""
+        with self._lock:
+            return (
+                self._connection.execute(
+                    "SELECT MAX(next_attempt_time) FROM tasks WHERE changelist IS NULL"
+                ).fetchone()[0]
+                or 0.0
+            )
+
+    def is_flush_due(self) -> bool:
+        """Check if the batch size or flush interval has been reached."""
+        with self._lock:
+            pending_count, oldest_time = self._connection.execute(
+                "SELECT COUNT(*), MIN(created_time) FROM tasks WHERE changelist IS NULL"
+            ).fetchone()
+
+        if pending_count == 0 or self.get_retry_time() > self.clock():
+            return False
+
+        return (
+            pending_count >= self.batch_size
+            or self.clock() - oldest_time >= self.flush_interval
+        )
+
+    def flush_if_due(self) -> int:
+        """Flush pending tasks if the batch size or flush interval has been reached.
+
+        Returns:
+            int: Number of tasks submitted.
+        """
+        if not self.is_flush_due():
+            return 0
+
+        return self.flush()
+
+    def flush(self) -> int:
+        """Submit all pending tasks, one batch at a time, unless backing off.
+
+        Returns:
+            int: Number of tasks submitted.
+        """
+        submitted_count = 0
+        if self.get_retry_time() > self.clock():
+            return submitted_count
+
+        with self._flush_lock:
+            while True:
+                batch_rows = self._get_due_batch()
+                if not batch_rows:
+                    break
+
+                if not self._submit_batch(batch_rows):
+                    break
+                submitted_count += len(batch_rows)
+
+        return submitted_count
+
+    def _get_due_batch(self) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT * FROM tasks WHERE changelist IS NULL ORDER BY id LIMIT ?",
+                (self.batch_size,),
+            ).fetchall()
+
+    def _submit_batch(self, batch_rows: List[sqlite3.Row]) -> bool:
+        task_ids = [task_row["id"] for task_row in batch_rows]
+        batch_file_path = (
+            f"{TASKS_DIRECTORY}/batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_"
+            f"{task_ids[0]}-{task_ids[-1]}.json"
+        )
+        fut.write_json_data(
+            [json.loads(task_row["task_data"]) for task_row in batch_rows],
+            batch_file_path,
+        )
+
+        try:
+            changelist_num = self.backend.submit_batch(
+                [batch_file_path], f"Database tasks {task_ids[0]}-{task_ids[-1]}"
+            )
+        except (p4s.P4Exception, ImportError, OSError) as submit_error:
+            LOG.warning(
+                "Could not submit %s database task(s), retrying later: %s",
+                len(task_ids),
+                submit_error,
+            )
+            self._schedule_retry(batch_rows, str(submit_error))
+            os.remove(batch_file_path)
+            return False
+
+        with self._transaction() as connection:
+            connection.executemany(
+                "UPDATE tasks SET changelist = ? WHERE id = ?",
+                [(changelist_num, task_id) for task_id in task_ids],
+            )
+        LOG.info(
+            "Submitted %s database task(s) in changelist %s.",
+            len(task_ids),
+            changelist_num,
+        )
+
+        return True
+
+    def _schedule_retry(self, batch_rows: List[sqlite3.Row], error_message: str):
+        attempts = max(task_row["attempts"] for task_row in batch_rows) + 1
+        retry_delay = min(
+            RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS
+        ) * random.uniform(0.5, 1.0)
+
+        task_ids = [task_row["id"] for task_row in batch_rows]
+        with self._transaction() as connection:
+            connection.executemany(
+                "UPDATE tasks SET attempts = ?, next_attempt_time = ?, "
+                "last_error = ? WHERE id = ?",
+                [
+                    (attempts, self.clock() + retry_delay, error_message, task_id)
+                    for task_id in task_ids
+                ],
+            )
+
+    def start_background_flush(self, poll_interval: float = 5.0) -> threading.Thread:
+        """Flush due tasks from a background thread until stopped.
+
+        Args:
+            poll_interval (float, optional): Seconds between checks. Defaults to 5.
+
+        Returns:
+            threading.Thread: Started flush thread.
+        """
+        if self._flush_thread is not None and self._flush_thread.is_alive():
+            return self._flush_thread
+
+        self._stop_event.clear()
+
+        def run_flush_loop():
+            while not self._stop_event.wait(poll_interval):
+                # Keep flushing later batches if one check fails unexpectedly
+                try:
+                    self.flush_if_due()
+                except Exception:  # pylint: disable=broad-except
+                    LOG.exception("Database task flush failed.")
+
+        self._flush_thread = threading.Thread(
+            target=run_flush_loop, name="DbTaskFlush", daemon=True
+        )
+        self._flush_thread.start()
+
+        return self._flush_thread
+
+    def stop_background_flush(self) -> None:
+        """Stop the background flush thread."""
+        self._stop_event.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+            self._flush_thread = None
+
+    def close(self) -> None:
+        """Stop flushing and close the queue file."""
+        self.stop_background_flush()
+        with self._lock:
+            self._connection.close()
+
+
+def get_task_queue() -> DbTaskQueue:
+    """Get the shared database task queue."""
+    global _TASK_QUEUE  # pylint: disable=global-statement
+    with _TASK_QUEUE_LOCK:
+        if _TASK_QUEUE is None:
+            _TASK_QUEUE = DbTaskQueue()
+
+    return _TASK_QUEUE
@@ -0,0 +1,394 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Perforce session manager.
+
+Keeps a thread-safe pool of connected P4 objects so tools don't pay for a new
+connection (or a p4 subprocess) on every call, and batches file operations into a
+single server command per file list.
+
+The P4 class used to create connections can be swapped for a stub with the same
+interface i.e. P4SessionPool(p4_factory=FakeP4) to run without a server.
+"""
+
+from __future__ import annotations
+from contextlib import contextmanager
+import logging
+import os
+import queue
+import threading
+from typing import Callable, List
+
+try:
+    from P4 import P4, P4Exception
+except ImportError:
+    P4 = None
+    P4Exception = Exception
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+DEFAULT_POOL_SIZE = 4
+
+_SESSION_POOL = None
+_SESSION_POOL_LOCK = threading.Lock()
+
+
+class P4SessionPool:
+    """Reusable pool of connected P4 objects."""
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        p4_factory: Callable = None,
+        **connection_settings,
+    ):
+        """Initialize pool. Connections are created lazily.
+
+        Args:
+            pool_size (int, optional): Maximum number of connections.
+                Defaults to DEFAULT_POOL_SIZE.
+            p4_factory (Callable, optional): Creates unconnected P4 objects.
+                Defaults to P4.P4.
+            **connection_settings: P4 attributes set before connecting i.e. port,
+                user, client. Unset values come from the user's p4 set environment.
+        """
+        if p4_factory is None:
+            if P4 is None:
+                raise ImportError("p4python is required to create Perforce sessions.")
+            p4_factory = P4
+
+        self.pool_size = pool_size
+        self._p4_factory = p4_factory
+        self._connection_settings = connection_settings
+        self._idle_sessions = queue.LifoQueue()
+        self._created_sessions = []
+        self._lock = threading.Lock()
+
+    def _create_session(self):
+        p4 = self._p4_factory()
+        for setting_name, setting_value in self._connection_settings.items():
+            setattr(p4, setting_name, setting_value)
+        p4.exception_level = 1  # Raise on errors only, not warnings
+        p4.connect()
+        LOG.debug("Connected new Perforce session for client: %s", p4.client)
+
+        return p4
+
+    def acquire(self, timeout: float = None):
+        """Get a connected P4 object from the pool.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a free session when the
+                pool is exhausted. Defaults to waiting forever.
+
+        Returns:
+            P4: Connected P4 object. Must be given back with release().
+        """
+        p4 = None
+        try:
+            p4 = self._idle_sessions.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if len(self._created_sessions) < self.pool_size:
+                    p4 = self._create_session()
+                    self._created_sessions.append(p4)
+
+        if p4 is None:
+            p4 = self._idle_sessions.get(timeout=timeout)
+
+        if not p4.connected():
+            LOG.info("Reconnecting dropped Perforce session...")
+            try:
+                p4.connect()
+            except BaseException:
+                # Free the slot so a new session can be created once the server is
+                # back, instead of the pool shrinking with every failure
+                self._discard_session(p4)
+                raise
+
+        return p4
+
+    def _discard_session(self, p4) -> None:
+        with self._lock:
+            if p4 in self._created_sessions:
+                self._created_sessions.remove(p4)
+
+    def release(self, p4) -> None:
+        """Return a P4 object to the pool.
+
+        Args:
+            p4 (P4): P4 object from acquire().
+        """
+        self._idle_sessions.put(p4)
+
+    @contextmanager
+    def session(self, timeout: float = None):
+        """Borrow a connected P4 object for the duration of a with block."""
+        p4 = self.acquire(timeout)
+        try:
+            yield p4
+        finally:
+            self.release(p4)
+
+    def close_all(self) -> None:
+        """Disconnect every session created by the pool."""
+        with self._lock:
+            for p4 in self._created_sessions:
+                if p4.connected():
+                    p4.disconnect()
+            self._created_sessions = []
+            self._idle_sessions = queue.LifoQueue()
+
+
+def get_session_pool() -> P4SessionPool:
+    """Get the shared session pool using the user's p4 set environment."""
+    global _SESSION_POOL  # pylint: disable=global-statement
+    with _SESSION_POOL_LOCK:
+        if _SESSION_POOL is None:
+            _SESSION_POOL = P4SessionPool()
+
+    return _SESSION_POOL
+
+
+def create_changelist(description: str, session_pool: P4SessionPool = None) -> int:
+    """Create a new numbered pending changelist.
+
+    Args:
+        description (str): Changelist description.
+        session_pool (P4SessionPool, optional): Pool to use. Defaults to the shared
+            session pool.
+
+    Returns:
+        int: New changelist number.
+    """
+    session_pool = session_pool or get_session_pool()
+    with session_pool.session() as p4:
+        change_spec = p4.fetch_change()
+        change_spec["Description"] = description
+        change_spec["Files"] = []
+        change_msg = p4.save_change(change_spec)[0]
+
+    # i.e. "Change 123 created."
+    return int(change_msg.split(" ")[1])
+
+
+def run_add(
+    files_to_add: List[str],
+    changelist_num: int = None,
+    session_pool: P4SessionPool = None,
+) -> list:
+    """Mark many files for add in a single server call.
+
+    Args:
+        files_to_add (List[str]): Local or depot file paths.
+        changelist_num (int, optional): Changelist to open files in. Defaults to the
+            default changelist.
+        session_pool (P4SessionPool, optional): Pool to use. Defaults to the shared
+            session pool.
+
+    Returns:
+        list: Server results.
+    """
+    return _run_file_command("add", files_to_add, changelist_num, session_pool)
+
+
+def run_edit(
+    files_to_edit: List[str],
+    changelist_num: int = None,
+    session_pool: P4SessionPool = None,
+) -> list:
+    """Open many files for edit in a single server call.
+
+    Args:
+        files_to_edit (List[str]): Local or depot file paths.
+        changelist_num (int, optional): Changelist to open files in. Defaults to the
+            default changelist.
+        session_pool (P4SessionPool, optional): Pool to use. Defaults to the shared
+            session pool.
+
+    Returns:
+        list: Server results.
+    """
+    return _run_file_command("edit", files_to_edit, changelist_num, session_pool)
+
+
+def _run_file_command(
+    command: str,
+    file_paths: List[str],
+    changelist_num: int = None,
+    session_pool: P4SessionPool = None,
+) -> list:
+    if not file_paths:
+        return []
+
+    command_args = [command]
+    if changelist_num is not None:
+        command_args.extend(["-c", str(changelist_num)])
+    command_args.extend(file_paths)
+
+    session_pool = session_pool or get_session_pool()
+    with session_pool.session() as p4:
+        LOG.info("Running p4 %s on %s file(s)...", command, len(file_paths))
+        results = p4.run(*command_args)
+        for warning in p4.warnings:
+            LOG.warning("P4 %s: %s", command, warning)
+
+    return results
+
+
+def fstat_files(file_paths: List[str], session_pool: P4SessionPool = None) -> dict:
+    """Get Perforce status of many files with a single fstat call.
+
+    Files that aren't in the depot or are outside the client are left out of the
+    results rather than raising.
+
+    Args:
+        file_paths (List[str]): Local file paths.
+        session_pool (P4SessionPool, optional): Pool to use. Defaults to the shared
+            session pool.
+
+    Returns:
+        dict: fstat record per normalized local path i.e.
+            {"C:/proj/file.mb": {"depotFile": ..., "headRev": ..., "action": ...}}
+    """
+    if not file_paths:
+        return {}
+
+    session_pool = session_pool or get_session_pool()
+    with session_pool.session() as p4:
+        fstat_records = p4.run("fstat", *file_paths)
+
+    file_statuses = {}
+    for fstat_record in fstat_records:
+        if not isinstance(fstat_record, dict) or "clientFile" not in fstat_record:
+            continue
+        file_statuses[normalize_path(fstat_record["clientFile"])] = fstat_record
+
+    return file_statuses
+
+
+def fstat_directory(directory_path: str, session_pool: P4SessionPool = None) -> dict:
+    """Get Perforce status of every file under a directory with one fstat call.
+
+    Args:
+        directory_path (str): Local directory path.
+        session_pool (P4SessionPool, optional): Pool to use. Defaults to the shared
+            session pool.
+
+    Returns:
+        dict: fstat record per normalized local path.
+    """
+    return fstat_files([f"{directory_path.rstrip('/')}/..."], session_pool)
+
+
+def is_in_depot(fstat_record: dict) -> bool:
+    """Check if an fstat record is a file with a live head revision."""
+    if not fstat_record or "headRev" not in fstat_record:
+        return False
+
+    return "delete" not in fstat_record.get("headAction", "")
+
+
+def is_exclusive_open(fstat_record: dict) -> bool:
+    """Check if an fstat record's file type only allows one user to open it (+l)."""
+    file_type = fstat_record.get("headType", "")
+    if "+" not in file_type:
+        return False
+
+    return "l" in file_type.split("+", 1)[1]
+
+
+def normalize_path(file_path: str) -> str:
+    """Normalize a local path so fstat results can be matched to input paths."""
+    return os.path.normcase(os.path.normpath(file_path)).replace("\\", "/")
+
+
+def open_files_for_change(
+    file_paths: List[str],
+    description: str,
+    session_pool: P4SessionPool = None,
+) -> int:
+    """Open files for edit or add in one new changelist.
+
+    Args:
+        file_paths (List[str]): Local file paths.
+        description (str): Changelist description.
+        session_pool (P4SessionPool, optional): Pool to use. Defaults to the shared
+            session pool.
+
+    Returns:
+        int: Changelist number the files were opened in. None if no files given.
+    """
+    if not file_paths:
+        return None
+
+    file_statuses = fstat_files(file_paths, session_pool)
+    changelist_num = create_changelist(description, session_pool)
+    open_files_in_changelist(file_paths, changelist_num, file_statuses, session_pool)
+
+    return changelist_num
+
+
+def open_files_in_changelist(
+    file_paths: List[str],
+    changelist_num: int,
+    file_statuses: dict = None,
+    session_pool: P4SessionPool = None,
+):
+    """Open files for edit or add in an existing changelist.
+
+    Status is checked with one bulk fstat so files already in the depot are opened
+    for edit, files already opened are moved into the changelist and everything
+    else is opened for add, each in a single server call.
+
+    Args:
+        file_paths (List[str]): Local file paths.
+        changelist_num (int): Changelist to open files in.
+        file_statuses (dict, optional): Results of fstat_files() for the files.
+            Defaults to running a new fstat.
+        session_pool (P4SessionPool, optional): Pool to use. Defaults to the shared
+            session pool.
+    """
+    if not file_paths:
+        return
+
+    if file_statuses is None:
+        file_statuses = fstat_files(file_paths, session_pool)
+
+    files_to_reopen = []
+    files_to_edit = []
+    files_to_add = []
+    for file_path in file_paths:
+        fstat_record = file_statuses.get(normalize_path(file_path), {})
+        if fstat_record.get("action"):
+            # Already opened by this client, just move it into the changelist
+            files_to_reopen.append(file_path)
+        elif is_in_depot(fstat_record):
+            files_to_edit.append(file_path)
+        else:
+            files_to_add.append(file_path)
+
+    _run_file_command("reopen", files_to_reopen, changelist_num, session_pool)
+    run_edit(files_to_edit, changelist_num, session_pool)
+    run_add(files_to_add, changelist_num, session_pool)
+    LOG.info(
+        "Opened %s file(s) for edit and %s for add in changelist %s.",
+        len(files_to_edit) + len(files_to_reopen),
+        len(files_to_add),
+        changelist_num,
+    )
+
+
+def submit_changelist(changelist_num: int, session_pool: P4SessionPool = None) -> list:
+    """Submit a pending changelist.
+
+    Args:
+        changelist_num (int): Changelist to submit.
+        session_pool (P4SessionPool, optional): Pool to use. Defaults to the shared
+            session pool.
+
+    Returns:
+        list: Server results.
+    """
+    session_pool = session_pool or get_session_pool()
+    with session_pool.session() as p4:
+        LOG.info("Submitting changelist %s...", changelist_num)
+        return p4.run_submit("-c", str(changelist_num))
@@ -0,0 +1,171 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Cached Perforce file status for tool browsers.
+
+Each refresh runs a single fstat over a whole directory tree, i.e. one asset
+category, so browsers can show lock and out of date badges without a server round
+trip per file. Refreshes can run on a background thread.
+"""
+
+from __future__ import annotations
+from enum import Enum
+import logging
+import os
+import threading
+import time
+from typing import Callable
+
+from . import p4_session as p4s
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+_STATUS_CACHE = None
+_STATUS_CACHE_LOCK = threading.Lock()
+
+
+class FileStatus(Enum):
+    """Version control status of a local file, most severe first."""
+
+    LOCKED = "Locked"
+    OPENED_BY_OTHER = "Checked out by other"
+    OUT_OF_DATE = "Out of date"
+    READ_ONLY = "Read-only"
+    OPENED = "Checked out"
+    NOT_IN_DEPOT = "Not in depot"
+    UP_TO_DATE = ""
+
+
+def get_file_status(file_path: str, fstat_record: dict = None) -> FileStatus:
+    """Get version control status of a file from its fstat record.
+
+    Args:
+        file_path (str): Local file path.
+        fstat_record (dict, optional): fstat record of file. None if the file isn't
+            in the depot.
+
+    Returns:
+        FileStatus: File status.
+    """
+    if not fstat_record:
+        if os.path.exists(file_path) and not os.access(file_path, os.W_OK):
+            return FileStatus.READ_ONLY
+        return FileStatus.NOT_IN_DEPOT
+
+    if "otherLock" in fstat_record:
+        return FileStatus.LOCKED
+    if "otherOpen" in fstat_record:
+        return FileStatus.OPENED_BY_OTHER
+    if fstat_record.get("action"):
+        return FileStatus.OPENED
+    if not p4s.is_in_depot(fstat_record):
+        return FileStatus.NOT_IN_DEPOT
+    if fstat_record.get("haveRev") != fstat_record.get("headRev"):
+        return FileStatus.OUT_OF_DATE
+
+    return FileStatus.UP_TO_DATE
+
+
+class P4StatusCache:
+    """fstat results of whole directory trees, refreshed one tree at a time."""
+
+    def __init__(self, session_pool: p4s.P4SessionPool = None):
+        """Initialize cache.
+
+        Args:
+            session_pool (p4s.P4SessionPool, optional): Pool to use. Defaults to the
+                shared session pool.
+        """
+        self.session_pool = session_pool
+        self._root_statuses = {}
+        self._refresh_times = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, root_path: str) -> int:
+        """Refresh every file status under a directory with one fstat call.
+
+        Args:
+            root_path (str): Local directory path.
+
+        Returns:
+            int: Number of depot files found.
+        """
+        try:
+            root_statuses = p4s.fstat_directory(root_path, self.session_pool)
+        except p4s.P4Exception as p4_error:
+            LOG.warning("Could not refresh Perforce status: %s", p4_error)
+            return 0
+
+        with self._lock:
+            self._root_statuses[p4s.normalize_path(root_path)] = root_statuses
+            self._refresh_times[p4s.normalize_path(root_path)] = time.time()
+
+        LOG.debug(
+            "Refreshed %s Perforce status(es) in: %s", len(root_statuses), root_path
+        )
+
+        return len(root_statuses)
+
+    def refresh_async(self, root_path: str, on_refreshed: Callable = None):
+        """Refresh a directory tree on a background thread.
+
+        Args:
+            root_path (str): Local directory path.
+            on_refreshed (Callable, optional): Called with root_path once refreshed.
+                Runs on the background thread, so UIs should emit a Qt signal here.
+
+        Returns:
+            threading.Thread: Started refresh thread.
+        """
+
+        def run_refresh():
+            self.refresh(root_path)
+            if on_refreshed is not None:
+                on_refreshed(root_path)
+
+        refresh_thread = threading.Thread(target=run_refresh, daemon=True)
+        refresh_thread.start()
+
+        return refresh_thread
+
+    def get_fstat_record(self, file_path: str):
+        """Get cached fstat record of a file.
+
+        Args:
+            file_path (str): Local file path.
+
+        Returns:
+            dict: fstat record. None if not cached or not in the depot.
+        """
+        normalized_path = p4s.normalize_path(file_path)
+        with self._lock:
+            for root_path, root_statuses in self._root_statuses.items():
+                if not normalized_path.startswith(f"{root_path}/"):
+                    continue
+                return root_statuses.get(normalized_path)
+
+        return None
+
+    def get_status(self, file_path: str) -> FileStatus:
+        """Get cached version control status of a file.
+
+        Args:
+            file_path (str): Local file path.
+
+        Returns:
+            FileStatus: File status.
+        """
+        return get_file_status(file_path, self.get_fstat_record(file_path))
+
+    def get_refresh_time(self, root_path: str) -> float:
+        """Get epoch time a directory tree was last refreshed. 0 if never."""
+        with self._lock:
+            return self._refresh_times.get(p4s.normalize_path(root_path), 0.0)
+
+
+def get_status_cache() -> P4StatusCache:
+    """Get the shared Perforce status cache."""
+    global _STATUS_CACHE  # pylint: disable=global-statement
+    with _STATUS_CACHE_LOCK:
+        if _STATUS_CACHE is None:
+            _STATUS_CACHE = P4StatusCache()
+
+    return _STATUS_CACHE
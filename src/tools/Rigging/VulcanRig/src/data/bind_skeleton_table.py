@@ -0,0 +1,468 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Array backed bind skeleton data.
+
+A bind skeleton table holds every joint in four columns: names, parent indices,
+world positions and world orientations (XYZ Euler degrees). Joints are listed
+parents first. Mirroring, moving, scaling and retargeting work on whole columns with
+NumPy instead of per joint Maya commands, and the result is applied to the scene in
+one batch by the bind proxy module.
+
+Rotations use column vectors, so a joint's world rotation is its parent's world
+rotation times its local rotation, and XYZ Euler angles compose as Rz * Ry * Rx.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .bind_modules_positions import BindModulePositions
+from .ue_skeleton_names import EpicBasicSkeleton
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+# Suffix of bind proxy joint names
+PROXY_SUFFIX = "_BPX"
+
+# Parent joint of the first joint of each bind module chain, listed parents first
+BIND_MODULE_PARENTS = {
+    BindModulePositions.SPINE: "",
+    BindModulePositions.LEG_R: EpicBasicSkeleton.PELVIS.value,
+    BindModulePositions.LEG_L: EpicBasicSkeleton.PELVIS.value,
+    BindModulePositions.ARM_R: EpicBasicSkeleton.SPINE_05.value,
+    BindModulePositions.ARM_L: EpicBasicSkeleton.SPINE_05.value,
+    BindModulePositions.THUMB_R: EpicBasicSkeleton.HAND_R.value,
+    BindModulePositions.THUMB_L: EpicBasicSkeleton.HAND_L.value,
+    BindModulePositions.INDEX_R: EpicBasicSkeleton.HAND_R.value,
+    BindModulePositions.INDEX_L: EpicBasicSkeleton.HAND_L.value,
+    BindModulePositions.MIDDLE_R: EpicBasicSkeleton.HAND_R.value,
+    BindModulePositions.MIDDLE_L: EpicBasicSkeleton.HAND_L.value,
+    BindModulePositions.RING_R: EpicBasicSkeleton.HAND_R.value,
+    BindModulePositions.RING_L: EpicBasicSkeleton.HAND_L.value,
+    BindModulePositions.PINKY_R: EpicBasicSkeleton.HAND_R.value,
+    BindModulePositions.PINKY_L: EpicBasicSkeleton.HAND_L.value,
+}
+
+# Mirror plane normal axis index by plane name
+MIRROR_PLANE_AXES = {"YZ": 0, "XZ": 1, "XY": 2}
+
+
+def _check_numpy() -> None:
+    if np is None:
+        raise ImportError("numpy is required for bind skeleton tables.")
+
+
+def euler_to_matrices(orientations) -> np.ndarray:
+    """Convert XYZ Euler degrees to rotation matrices.
+
+    Args:
+        orientations: (n, 3) XYZ Euler angles in degrees.
+
+    Returns:
+        np.ndarray: (n, 3, 3) rotation matrices.
+    """
+    _check_numpy()
+    radians = np.radians(np.asarray(orientations, dtype=np.float64))
+    sin_x, sin_y, sin_z = np.sin(radians).T
+    cos_x, cos_y, cos_z = np.cos(radians).T
+
+    matrices = np.empty((len(radians), 3, 3))
+    matrices[:, 0, 0] = cos_y * cos_z
+    matrices[:, 0, 1] = cos_z * sin_y * sin_x - sin_z * cos_x
+    matrices[:, 0, 2] = cos_z * sin_y * cos_x + sin_z * sin_x
+    matrices[:, 1, 0] = cos_y * sin_z
+    matrices[:, 1, 1] = sin_z * sin_y * sin_x + cos_z * cos_x
+    matrices[:, 1, 2] = sin_z * sin_y * cos_x - cos_z * sin_x
+    matrices[:, 2, 0] = -sin_y
+    matrices[:, 2, 1] = cos_y * sin_x
+    matrices[:, 2, 2] = cos_y * cos_x
+
+    return matrices
+
+
+def matrices_to_euler(matrices) -> np.ndarray:
+    """Convert rotation matrices to XYZ Euler degrees.
+
+    Args:
+        matrices: (n, 3, 3) rotation matrices.
+
+    Returns:
+        np.ndarray: (n, 3) XYZ Euler angles in degrees.
+    """
+    _check_numpy()
+    matrices = np.asarray(matrices, dtype=np.float64)
+    sin_y = np.clip(-matrices[:, 2, 0], -1.0, 1.0)
+    # At +-90 degrees Y, X and Z rotate about the same axis, so Z is set to 0
+    is_gimbal_locked = np.abs(sin_y) > 1.0 - 1e-9
+
+    angle_x = np.where(
+        is_gimbal_locked,
+        np.arctan2(-matrices[:, 1, 2], matrices[:, 1, 1]),
+        np.arctan2(matrices[:, 2, 1], matrices[:, 2, 2]),
+    )
+    angle_z = np.where(
+        is_gimbal_locked, 0.0, np.arctan2(matrices[:, 1, 0], matrices[:, 0, 0])
+    )
+
+    return np.degrees(np.stack([angle_x, np.arcsin(sin_y), angle_z], axis=1))
+
+
+@dataclass
+class BindSkeletonTable:
+    names: List[str]
+    # Parent row of each joint, -1 for roots
+    parents: np.ndarray
+    # (n, 3) world positions
+    positions: np.ndarray
+    # (n, 3) world XYZ Euler orientations in degrees
+    orientations: np.ndarray
+
+    def __post_init__(self):
+        _check_numpy()
+        self.parents = np.asarray(self.parents, dtype=np.int32)
+        self.positions = np.asarray(self.positions, dtype=np.float64).reshape(-1, 3)
+        self.orientations = np.asarray(self.orientations, dtype=np.float64).reshape(
+            -1, 3
+        )
+        self._indices = {name: index for index, name in enumerate(self.names)}
+
+    @classmethod
+    def from_joints(
+        cls,
+        joints: List[Tuple[str, str, List[float]]],
+        orientations: List[List[float]] = None,
+    ) -> BindSkeletonTable:
+        """Create a table from (name, parent name, world position) joints.
+
+        Args:
+            joints (List[Tuple[str, str, List[float]]]): Joints listed parents
+                first. Parent name is empty for roots.
+            orientations (List[List[float]], optional): World XYZ Euler degrees of
+                each joint. Defaults to zero.
+
+        Returns:
+            BindSkeletonTable: Skeleton table.
+        """
+        _check_numpy()
+        names = [joint_name for joint_name, _, _ in joints]
+        indices = {joint_name: index for index, joint_name in enumerate(names)}
+        parents = []
+        for joint_name, parent_name, _ in joints:
+            if (
+                parent_name
+                and indices.get(parent_name, len(names)) >= indices[joint_name]
+            ):
+                raise ValueError(
+                    f"Parent '{parent_name}' of joint '{joint_name}' must be listed "
+                    "before it."
+                )
+            parents.append(indices[parent_name] if parent_name else -1)
+
+        return cls(
+            names,
+            parents,
+            [position for _, _, position in joints],
+            orientations if orientations is not None else np.zeros((len(names), 3)),
+        )
+
+    @classmethod
+    def from_bind_positions(
+        cls, suffix: str = "", bind_modules: Iterable[BindModulePositions] = None
+    ) -> BindSkeletonTable:
+        """Create the table of the default bind proxy positions.
+
+        Args:
+            suffix (str, optional): Suffix added to each joint name, i.e. _BPX for
+                proxy joints. Defaults to the bind skeleton names.
+            bind_modules (Iterable[BindModulePositions], optional): Bind module
+                chains to include. Their parent chains must be included too.
+                Defaults to every chain.
+
+        Returns:
+            BindSkeletonTable: Skeleton table.
+        """
+        bind_modules = set(bind_modules or BIND_MODULE_PARENTS)
+        joints = []
+        for bind_module, parent_name in BIND_MODULE_PARENTS.items():
+            if bind_module not in bind_modules:
+                continue
+            parent_name = f"{parent_name}{suffix}" if parent_name else ""
+            for bind_joint in bind_module.value:
+                joint_name = f"{bind_joint['name'].replace(PROXY_SUFFIX, '')}{suffix}"
+                joints.append((joint_name, parent_name, bind_joint["position"]))
+                parent_name = joint_name
+
+        return cls.from_joints(joints)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, joint_name: str) -> bool:
+        return joint_name in self._indices
+
+    def index(self, joint_name: str) -> int:
+        """Get a joint's row. Raises KeyError if it doesn't exist."""
+        return self._indices[joint_name]
+
+    def get_parent_name(self, joint_name: str) -> str:
+        """Get a joint's parent name. Empty for roots."""
+        parent_index = self.parents[self._indices[joint_name]]
+        return self.names[parent_index] if parent_index >= 0 else ""
+
+    def get_positions(self) -> Dict[str, List[float]]:
+        """Get world positions by joint name."""
+        return dict(zip(self.names, self.positions.tolist()))
+
+    def copy(self) -> BindSkeletonTable:
+        return BindSkeletonTable(
+            list(self.names),
+            self.parents.copy(),
+            self.positions.copy(),
+            self.orientations.copy(),
+        )
+
+    def rename(self, old_text: str, new_text: str) -> BindSkeletonTable:
+        """Get a copy with text replaced in every joint name."""
+        renamed_table = self.copy()
+        renamed_table.names = [
+            joint_name.replace(old_text, new_text) for joint_name in self.names
+        ]
+        renamed_table.__post_init__()
+
+        return renamed_table
+
+    def get_depths(self) -> np.ndarray:
+        """Get each joint's number of ancestors."""
+        depths = np.zeros(len(self), dtype=np.int32)
+        for index, parent_index in enumerate(self.parents):
+            if parent_index >= 0:
+                depths[index] = depths[parent_index] + 1
+
+        return depths
+
+    def get_local_transforms(
+        self, parent_matrices: Dict[str, List[float]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Get each joint's translation and orientation relative to its parent.
+
+        Args:
+            parent_matrices (Dict[str, List[float]], optional): World matrix of the
+                scene parent of root joints that aren't in world, i.e. a group, by
+                joint name. Flat row major values like xform's matrix query.
+                Defaults to every root being in world.
+
+        Returns:
+            tuple: ((n, 3) local translations, (n, 3) local XYZ Euler degrees).
+        """
+        world_rotations = euler_to_matrices(self.orientations)
+        has_parent = self.parents >= 0
+        parent_rows = np.where(has_parent, self.parents, 0)
+        parent_rotations = np.where(
+            has_parent[:, None, None], world_rotations[parent_rows], np.eye(3)
+        )
+        parent_positions = np.where(
+            has_parent[:, None], self.positions[parent_rows], 0.0
+        )
+
+        # Inverse of a rotation matrix is its transpose
+        local_translations = np.einsum(
+            "nji,nj->ni", parent_rotations, self.positions - parent_positions
+        )
+        local_rotations = np.einsum("nji,njk->nik", parent_rotations, world_rotations)
+
+        for joint_name, parent_matrix in (parent_matrices or {}).items():
+            row = self._indices[joint_name]
+            parent_transform = np.asarray(parent_matrix, dtype=np.float64).reshape(4, 4)
+            # Maya matrices multiply row vectors, so transpose to column vector form
+            parent_linear = parent_transform[:3, :3].T
+            local_translations[row] = np.linalg.solve(
+                parent_linear, self.positions[row] - parent_transform[3, :3]
+            )
+            # Joint orient is relative to the parent's rotation without its scale
+            parent_rotation = parent_linear / np.linalg.norm(parent_linear, axis=0)
+            local_rotations[row] = parent_rotation.T @ local_rotations[row]
+
+        return local_translations, matrices_to_euler(local_rotations)
+
+    def move_joints(self, joint_positions: Dict[str, List[float]]) -> BindSkeletonTable:
+        """Get a copy with joints moved to new world positions.
+
+        Joints not given keep their offset from their parent, so they follow it like
+        the children of a joint moved in Maya.
+
+        Args:
+            joint_positions (Dict[str, List[float]]): World position by joint name.
+                Joints not in the table are skipped.
+
+        Returns:
+            BindSkeletonTable: Table with the joints moved.
+        """
+        moved_table = self.copy()
+        is_moved = np.zeros(len(self), dtype=bool)
+        for joint_name, position in joint_positions.items():
+            row = self._indices.get(joint_name)
+            if row is not None:
+                moved_table.positions[row] = position
+                is_moved[row] = True
+
+        moved_table._rebuild_positions(self._get_parent_offsets(), is_moved)
+
+        return moved_table
+
+    def scale(self, scale_factor, pivot=None) -> BindSkeletonTable:
+        """Get a copy with positions scaled about a pivot.
+
+        Args:
+            scale_factor: Uniform factor or per axis (x, y, z) factors.
+            pivot (optional): Point to scale about. Defaults to the origin.
+
+        Returns:
+            BindSkeletonTable: Scaled table.
+        """
+        pivot = np.zeros(3) if pivot is None else np.asarray(pivot, dtype=np.float64)
+        scaled_table = self.copy()
+        scaled_table.positions = (self.positions - pivot) * scale_factor + pivot
+
+        return scaled_table
+
+    def retarget(
+        self, bone_scales: Dict[str, float], default_scale: float = 1.0
+    ) -> BindSkeletonTable:
+        """Get a copy with bones lengthened or shortened to new proportions.
+
+        Each joint's offset from its parent is scaled by its bone scale and the
+        joints below it move with it, so i.e. a 1.1 scale on calf_r and foot_r
+        makes the lower leg 10% longer. Roots keep their position.
+
+        Args:
+            bone_scales (Dict[str, float]): Offset scale by joint name. Joints not
+                in the table are skipped.
+            default_scale (float, optional): Scale of joints not in bone_scales.
+                Defaults to 1.0.
+
+        Returns:
+            BindSkeletonTable: Retargeted table.
+        """
+        offset_scales = np.full(len(self), default_scale, dtype=np.float64)
+        for joint_name, bone_scale in bone_scales.items():
+            row = self._indices.get(joint_name)
+            if row is not None:
+                offset_scales[row] = bone_scale
+
+        retargeted_table = self.copy()
+        retargeted_table._rebuild_positions(
+            self._get_parent_offsets() * offset_scales[:, None], self.parents < 0
+        )
+
+        return retargeted_table
+
+    def _get_parent_offsets(self) -> np.ndarray:
+        # World offset of each joint from its parent, or its position for roots
+        has_parent = self.parents >= 0
+        parent_rows = np.where(has_parent, self.parents, 0)
+        return np.where(
+            has_parent[:, None],
+            self.positions - self.positions[parent_rows],
+            self.positions,
+        )
+
+    def _rebuild_positions(self, offsets: np.ndarray, is_fixed: np.ndarray) -> None:
+        # Place joints that aren't fixed at their parent's position plus their
+        # offset, one hierarchy level at a time so parents are placed first
+        depths = self.get_depths()
+        for depth in range(1, int(depths.max(initial=0)) + 1):
+            level_rows = np.nonzero((depths == depth) & ~is_fixed)[0]
+            self.positions[level_rows] = (
+                self.positions[self.parents[level_rows]] + offsets[level_rows]
+            )
+
+    def mirror(
+        self,
+        search_text: str = "_r",
+        replace_text: str = "_l",
+        mirror_plane: str = "YZ",
+        mirror_behavior: bool = True,
+    ) -> BindSkeletonTable:
+        """Get a copy with side joints mirrored to the other side.
+
+        Joints whose name has search_text as a name part, i.e. the _r in
+        upperarm_r or hand_r_end, are mirrored and added with replace_text instead,
+        like Maya's mirrorJoint. Mirrored joints that already exist are updated.
+
+        Args:
+            search_text (str, optional): Side text of joints to mirror.
+                Defaults to _r.
+            replace_text (str, optional): Side text of mirrored joints.
+                Defaults to _l.
+            mirror_plane (str, optional): YZ, XZ or XY. Defaults to YZ.
+            mirror_behavior (bool, optional): Mirror joint axes so equal rotations
+                move mirrored joints in opposite directions. Otherwise mirror the
+                orientation. Defaults to True.
+
+        Returns:
+            BindSkeletonTable: Table with the mirrored joints.
+        """
+        side_regex = re.compile(f"{re.escape(search_text)}(?=_|$)")
+        source_rows = np.array(
+            [
+                index
+                for index, joint_name in enumerate(self.names)
+                if side_regex.search(joint_name)
+            ],
+            dtype=np.int32,
+        )
+        if not len(source_rows):
+            return self.copy()
+
+        mirror_scale = np.ones(3)
+        mirror_scale[MIRROR_PLANE_AXES[mirror_plane]] = -1.0
+        mirrored_positions = self.positions[source_rows] * mirror_scale
+
+        source_rotations = euler_to_matrices(self.orientations[source_rows])
+        if mirror_behavior:
+            # Reflect then flip every axis, which keeps a proper rotation
+            mirrored_rotations = -mirror_scale[None, :, None] * source_rotations
+        else:
+            mirrored_rotations = (
+                mirror_scale[None, :, None] * source_rotations * mirror_scale
+            )
+        mirrored_orientations = matrices_to_euler(mirrored_rotations)
+
+        # Mirrored joints that don't exist yet are added after the existing rows
+        mirrored_names = [
+            side_regex.sub(replace_text, self.names[source_row])
+            for source_row in source_rows
+        ]
+        names = self.names + [
+            mirrored_name
+            for mirrored_name in dict.fromkeys(mirrored_names)
+            if mirrored_name not in self._indices
+        ]
+        indices = {joint_name: index for index, joint_name in enumerate(names)}
+        mirrored_rows = np.array(
+            [indices[mirrored_name] for mirrored_name in mirrored_names],
+            dtype=np.int32,
+        )
+
+        # Mirrored joints under a mirrored joint are parented to its mirror
+        parent_map = np.arange(-1, len(self), dtype=np.int32)
+        parent_map[source_rows + 1] = mirrored_rows
+        parents = np.full(len(names), -1, dtype=np.int32)
+        parents[: len(self)] = self.parents
+        parents[mirrored_rows] = parent_map[self.parents[source_rows] + 1]
+
+        positions = np.zeros((len(names), 3))
+        positions[: len(self)] = self.positions
+        positions[mirrored_rows] = mirrored_positions
+        orientations = np.zeros((len(names), 3))
+        orientations[: len(self)] = self.orientations
+        orientations[mirrored_rows] = mirrored_orientations
+
+        return BindSkeletonTable(names, parents, positions, orientations)
@@ -0,0 +1,290 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Rig module graph.
+
+Holds every rig module and its parent/child relationships independent of Qt or
+Maya. Modules are indexed by metanode name, module type and side, and children are
+kept in insertion ordered dictionaries, so lookups, reparenting and child checks
+don't scan lists or walk the stack tree widget. The stack tree widget is a view of
+this graph.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+import logging
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from .module_types import ModuleSide
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+
+@dataclass
+class ModuleNode:
+    """One rig module in the graph."""
+
+    metanode: str
+    module_type: str
+    side: str = ModuleSide.CENTER.value
+    parent: str = ""
+    # Child metanode names in order. Values are unused.
+    children: Dict[str, None] = field(default_factory=dict)
+    # Object the editor attached to this module, like its module product
+    module: Any = None
+
+
+class ModuleGraph:
+    """Rig modules and their relationships indexed by name, type and side."""
+
+    def __init__(self):
+        self._nodes: Dict[str, ModuleNode] = {}
+        self._nodes_by_type: Dict[str, Dict[str, None]] = {}
+        self._nodes_by_side: Dict[str, Dict[str, None]] = {}
+
+    def clear(self) -> None:
+        """Remove all modules."""
+        self._nodes = {}
+        self._nodes_by_type = {}
+        self._nodes_by_side = {}
+
+    def add_module(
+        self,
+        metanode: str,
+        module_type: str,
+        side: str = ModuleSide.CENTER.value,
+        parent: str = "",
+        module: Any = None,
+    ) -> ModuleNode:
+        """Add a module, or update its type, side and attached object if it exists.
+
+        Args:
+            metanode (str): Module's metanode name.
+            module_type (str): ModuleType name.
+            side (str, optional): ModuleSide value. Defaults to center.
+            parent (str, optional): Parent metanode name. Defaults to no parent.
+            module (Any, optional): Object to attach to the module.
+
+        Returns:
+            ModuleNode: Added or updated module node.
+        """
+        module_node = self._nodes.get(metanode)
+        if module_node is None:
+            module_node = ModuleNode(metanode, module_type, side)
+            self._nodes[metanode] = module_node
+        else:
+            self._unindex(module_node)
+            module_node.module_type = module_type
+            module_node.side = side
+        self._index(module_node)
+
+        if module is not None:
+            module_node.module = module
+        if parent:
+            self.set_parent(metanode, parent)
+
+        return module_node
+
+    def remove_module(self, metanode: str) -> bool:
+        """Remove a module. Its children move to its parent.
+
+        Args:
+            metanode (str): Module's metanode name.
+
+        Returns:
+            bool: False if the module doesn't exist.
+        """
+        module_node = self._nodes.get(metanode)
+        if module_node is None:
+            return False
+
+        parent_name = module_node.parent
+        for child_name in list(module_node.children):
+            self.set_parent(child_name, parent_name)
+        self.detach(metanode)
+
+        self._unindex(module_node)
+        del self._nodes[metanode]
+
+        return True
+
+    def rename_module(self, old_name: str, new_name: str) -> bool:
+        """Rename a module, keeping its position among its siblings.
+
+        Args:
+            old_name (str): Current metanode name.
+            new_name (str): New metanode name.
+
+        Returns:
+            bool: False if the module doesn't exist or the new name is taken.
+        """
+        if old_name not in self._nodes or new_name in self._nodes:
+            return False
+
+        module_node = self._nodes.pop(old_name)
+        self._unindex(module_node)
+        module_node.metanode = new_name
+        self._nodes[new_name] = module_node
+        self._index(module_node)
+
+        if module_node.parent:
+            parent_node = self._nodes[module_node.parent]
+            parent_node.children = {
+                (new_name if child_name == old_name else child_name): None
+                for child_name in parent_node.children
+            }
+        for child_name in module_node.children:
+            self._nodes[child_name].parent = new_name
+
+        return True
+
+    def set_parent(self, metanode: str, parent: str) -> bool:
+        """Move a module under a new parent.
+
+        Args:
+            metanode (str): Module's metanode name.
+            parent (str): New parent metanode name. Empty for no parent.
+
+        Returns:
+            bool: False if either module doesn't exist or the move would make the
+                module its own ancestor.
+        """
+        module_node = self._nodes.get(metanode)
+        if module_node is None or (parent and parent not in self._nodes):
+            return False
+
+        if module_node.parent == parent:
+            return True
+
+        if parent and (parent == metanode or self.is_ancestor(metanode, parent)):
+            LOG.error("Can't parent '%s' under its own child '%s'.", metanode, parent)
+            return False
+
+        self.detach(metanode)
+        module_node.parent = parent
+        if parent:
+            self._nodes[parent].children[metanode] = None
+
+        return True
+
+    def detach(self, metanode: str) -> None:
+        """Remove a module from its parent's children, making it a top module."""
+        module_node = self._nodes.get(metanode)
+        if module_node is None or not module_node.parent:
+            return
+
+        self._nodes[module_node.parent].children.pop(metanode, None)
+        module_node.parent = ""
+
+    def is_ancestor(self, ancestor: str, metanode: str) -> bool:
+        """Check if a module is above another module in the hierarchy."""
+        parent_name = self._nodes[metanode].parent if metanode in self._nodes else ""
+        while parent_name:
+            if parent_name == ancestor:
+                return True
+            parent_name = self._nodes[parent_name].parent
+
+        return False
+
+    def get_node(self, metanode: str) -> ModuleNode:
+        """Get a module's node. None if it doesn't exist."""
+        return self._nodes.get(metanode)
+
+    def get_module(self, metanode: str) -> Any:
+        """Get the object attached to a module. None if there's none."""
+        module_node = self._nodes.get(metanode)
+        return module_node.module if module_node is not None else None
+
+    def get_parent(self, metanode: str) -> str:
+        """Get a module's parent metanode name. Empty if it has no parent."""
+        module_node = self._nodes.get(metanode)
+        return module_node.parent if module_node is not None else ""
+
+    def get_children(self, metanode: str) -> List[str]:
+        """Get a module's child metanode names in order."""
+        module_node = self._nodes.get(metanode)
+        return list(module_node.children) if module_node is not None else []
+
+    def has_child(self, metanode: str, child: str) -> bool:
+        """Check if a module is a direct child of another module."""
+        module_node = self._nodes.get(child)
+        return module_node is not None and module_node.parent == metanode
+
+    def get_modules_of_type(self, module_type: str) -> List[str]:
+        """Get metanode names of all modules of a ModuleType name."""
+        return list(self._nodes_by_type.get(module_type, {}))
+
+    def get_modules_of_side(self, side: str) -> List[str]:
+        """Get metanode names of all modules on a ModuleSide value."""
+        return list(self._nodes_by_side.get(side, {}))
+
+    def get_top_modules(self) -> List[str]:
+        """Get metanode names of all modules without a parent."""
+        return [
+            metanode
+            for metanode, module_node in self._nodes.items()
+            if not module_node.parent
+        ]
+
+    def iter_depth_first(self, metanode: str = None) -> Iterator[ModuleNode]:
+        """Iterate modules parents first, in child order.
+
+        Args:
+            metanode (str, optional): Module to start from.
+                Defaults to all top modules.
+
+        Yields:
+            ModuleNode: Module nodes.
+        """
+        pending_names = [metanode] if metanode else self.get_top_modules()
+        pending_names.reverse()
+        while pending_names:
+            module_node = self._nodes[pending_names.pop()]
+            yield module_node
+            pending_names.extend(reversed(module_node.children))
+
+    def load_metadata(self, metadata_items: Iterable[Tuple[str, dict]]) -> None:
+        """Rebuild the graph from module metadata.
+
+        Relationships come from each module's child_metanodes, since modules under
+        the Root module don't store it as their parent_metanode.
+
+        Args:
+            metadata_items (Iterable[Tuple[str, dict]]): (metanode, metadata) pairs.
+        """
+        self.clear()
+        metadata_by_node = dict(metadata_items)
+        for metanode, metadata in metadata_by_node.items():
+            self.add_module(
+                metanode,
+                metadata.get("module_type", ""),
+                metadata.get("side", ModuleSide.CENTER.value),
+            )
+
+        for metanode, metadata in metadata_by_node.items():
+            for child_name in metadata.get("child_metanodes", []):
+                if not self.set_parent(child_name, metanode):
+                    LOG.warning(
+                        "Child module '%s' of '%s' couldn't be added.",
+                        child_name,
+                        metanode,
+                    )
+
+    def _index(self, module_node: ModuleNode) -> None:
+        self._nodes_by_type.setdefault(module_node.module_type, {})[
+            module_node.metanode
+        ] = None
+        self._nodes_by_side.setdefault(module_node.side, {})[
+            module_node.metanode
+        ] = None
+
+    def _unindex(self, module_node: ModuleNode) -> None:
+        self._nodes_by_type.get(module_node.module_type, {}).pop(
+            module_node.metanode, None
+        )
+        self._nodes_by_side.get(module_node.side, {}).pop(module_node.metanode, None)
+
+    def __contains__(self, metanode: str) -> bool:
+        return metanode in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
@@ -2,17 +2,19 @@
 """Vulcan Metadata controller class."""
 
 # from __future__ import annotations
-from dataclasses import dataclass, field, fields
+import ast
+from dataclasses import asdict, dataclass, field, fields
 from enum import Enum
+import json
 import logging
 import os
-from typing import Any, List
+from typing import Any, Callable, Dict, List
 
 from maya import cmds
 
 from Core import core_paths as cpath
 
-from .module_types import ModuleType
+from .module_types import ModuleSide, ModuleType
 
 from importlib import reload
 
@@ -45,6 +47,9 @@ class ModuleConfig:
     parent_metanode: str = ""
     child_metanodes: List[str] = field(default_factory=list)
     module_type: str = ""
+    side: str = ModuleSide.CENTER.value
+    # Rig recipe hash of the module as last built
+    build_hash: str = ""
 
 
 @dataclass
@@ -59,6 +64,15 @@ class RootConfig(ModuleConfig):
 @dataclass
 class BipedSpineConfig(ModuleConfig):
     module_name: str = ""
+    start_joint: str = ""
+    end_joint: str = ""
+
+
+# Module config dataclass of each ModuleType name
+MODULE_CONFIG_TYPES = {
+    ModuleType.ROOT.name: RootConfig,
+    ModuleType.BIPED_SPINE.name: BipedSpineConfig,
+}
 
 
 def convert_dict_to_dataclass(
@@ -82,3 +96,121 @@ def convert_dict_to_dataclass(
         return None
 
     return new_dataclass
+
+
+
+# Metadata attribute format version. Bump it and register a migration whenever a
+# config's fields change so older scenes still load.
+METADATA_SCHEMA_VERSION = 2
+
+# Migration hooks by the schema version they upgrade from
+_METADATA_MIGRATIONS: Dict[int, Callable[[dict], dict]] = {}
+
+
+def register_metadata_migration(from_version: int):
+    """Register a function upgrading metadata from one schema version to the next.
+
+    Args:
+        from_version (int): Schema version the function upgrades from.
+
+    Returns:
+        Callable: Decorator registering the migration function. The function takes
+            the metadata dictionary and returns the upgraded dictionary.
+    """
+
+    def register(migration: Callable[[dict], dict]) -> Callable[[dict], dict]:
+        _METADATA_MIGRATIONS[from_version] = migration
+        return migration
+
+    return register
+
+
+@register_metadata_migration(0)
+def _migrate_from_python_literal(metadata: dict) -> dict:
+    # Version 0 was str(asdict(config)) with the same fields as version 1
+    return metadata
+
+
+@register_metadata_migration(1)
+def _migrate_add_module_side(metadata: dict) -> dict:
+    metadata.setdefault("side", ModuleSide.CENTER.value)
+    return metadata
+
+
+def migrate_metadata(metadata: dict, schema_version: int) -> dict:
+    """Upgrade metadata to the current schema version.
+
+    Args:
+        metadata (dict): Metadata dictionary.
+        schema_version (int): Schema version the metadata was saved with.
+
+    Returns:
+        dict: Upgraded metadata. None if no migration path exists.
+    """
+    while schema_version < METADATA_SCHEMA_VERSION:
+        migration = _METADATA_MIGRATIONS.get(schema_version)
+        if migration is None:
+            LOG.error("No metadata migration from schema version %s.", schema_version)
+            return None
+        metadata = migration(metadata)
+        schema_version += 1
+
+    if schema_version > METADATA_SCHEMA_VERSION:
+        LOG.error(
+            "Metadata schema version %s is newer than this tool's version %s.",
+            schema_version,
+            METADATA_SCHEMA_VERSION,
+        )
+        return None
+
+    return metadata
+
+
+def encode_metadata(metadata: ModuleConfig | dict) -> str:
+    """Serialize module metadata for a metanode attribute.
+
+    Args:
+        metadata (ModuleConfig | dict): Module config or its dictionary.
+
+    Returns:
+        str: Compact JSON string with the schema version.
+    """
+    if not isinstance(metadata, dict):
+        metadata = asdict(metadata)
+
+    return json.dumps(
+        {"schema_version": METADATA_SCHEMA_VERSION, "data": metadata},
+        separators=(",", ":"),
+    )
+
+
+def decode_metadata(metadata_string: str) -> dict:
+    """Parse a metanode's metadata attribute string.
+
+    Reads the versioned JSON format and the older Python literal format, upgrading
+    either to the current schema version.
+
+    Args:
+        metadata_string (str): Metadata attribute value.
+
+    Returns:
+        dict: Metadata dictionary. None if the string can't be parsed.
+    """
+    if not metadata_string:
+        return None
+
+    try:
+        metadata = json.loads(metadata_string)
+    except json.JSONDecodeError:
+        # Version 0, str() of the metadata dictionary
+        try:
+            metadata = {"schema_version": 0, "data": ast.literal_eval(metadata_string)}
+        except (ValueError, SyntaxError):
+            LOG.debug("Metadata couldn't be parsed: %s", metadata_string)
+            return None
+
+    if not isinstance(metadata, dict) or not isinstance(metadata.get("data"), dict):
+        LOG.debug("Metadata has an unknown layout: %s", metadata_string)
+        return None
+
+    return migrate_metadata(metadata["data"], metadata.get("schema_version", 0))
@@ -0,0 +1,448 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Batch rig builds on a pool of mayapy workers.
+
+Builds a list of rig recipes in parallel. Each rig runs in its own mayapy process,
+which opens the base file, builds the recipe with the headless build engine and
+publishes the rig to the output directory. A crashed or hung worker only fails its
+own rig. Every worker writes its output to a log file per rig and its module build
+results to a results file, which are collected into one batch report with per-rig
+timing.
+
+Worker processes are started and waited on from a thread pool, so the pool size is
+the number of mayapy processes running at once.
+
+Pass --stub to run the stand-in worker with the current python instead of mayapy,
+which runs the build engine against a stub maya to test batches without Maya.
+Arguments batch_build doesn't know, like --incremental or the stand-in worker's
+--fail-module, are passed on to every worker. Give them after the recipes or as
+--name=value, so their values aren't read as recipe paths.
+
+Command line usage (from the src/tools directory):
+
+    python -m Rigging.VulcanRig.src.engine.batch_build RECIPE [RECIPE ...]
+        --base-scene BASE_FILE --output-directory DIRECTORY [--workers COUNT]
+        [--timeout SECONDS] [--proxy-only] [--mayapy MAYAPY] [--stub]
+        [--report REPORT_JSON] [worker arguments ...]
+"""
+
+from __future__ import annotations
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import List
+
+from Core import core_paths as cpath
+from Core.util import file_util_tools as fut
+
+# Main paths
+MAIN_PATHS = cpath.core_paths()
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+DEFAULT_WORKER_COUNT = max(1, (os.cpu_count() or 2) // 2)
+
+BUILD_WORKER_MODULE = "Rigging.VulcanRig.src.engine.build_engine"
+STUB_WORKER_MODULE = "Rigging.VulcanRig.src.engine.stub_build_worker"
+
+
+@dataclass
+class RigBuildJob:
+    recipe_path: str
+    base_scene: str
+    output_path: str
+    proxy_only: bool = False
+    # Unique in the batch, names the job's log and results files
+    name: str = ""
+
+    def __post_init__(self):
+        self.name = self.name or get_recipe_name(self.recipe_path)
+
+
+@dataclass
+class RigBuildJobResult:
+    recipe_path: str
+    output_path: str
+    return_code: int
+    seconds: float
+    log_path: str
+    # ModuleBuildResult values of each module, empty if the worker didn't finish
+    module_results: List[dict] = field(default_factory=list)
+    error: str = ""
+
+    @property
+    def succeeded(self) -> bool:
+        return self.return_code == 0 and not self.error
+
+
+def get_mayapy_path() -> str:
+    """Get the mayapy executable from the MAYAPY environment variable or PATH."""
+    return os.environ.get("MAYAPY", "mayapy")
+
+
+def get_recipe_name(recipe_path: str) -> str:
+    """Get a recipe's file name without extension."""
+    return os.path.splitext(os.path.basename(recipe_path))[0]
+
+
+def get_unique_job_names(recipe_paths: List[str]) -> List[str]:
+    """Name each recipe's job uniquely within a batch.
+
+    Recipes sharing a file name, like character/rig.json files, are prefixed with
+    their folder name, and numbered if that is still taken.
+
+    Args:
+        recipe_paths (List[str]): Rig recipe paths.
+
+    Returns:
+        List[str]: Job name of each recipe in recipe order.
+    """
+    recipe_names = [get_recipe_name(recipe_path) for recipe_path in recipe_paths]
+    job_names = []
+    for recipe_path, recipe_name in zip(recipe_paths, recipe_names):
+        job_name = recipe_name
+        if recipe_names.count(recipe_name) > 1:
+            folder_name = os.path.basename(
+                os.path.dirname(os.path.abspath(recipe_path))
+            )
+            job_name = f"{folder_name}_{recipe_name}"
+
+        unique_name = job_name
+        name_number = 1
+        while unique_name in job_names:
+            unique_name = f"{job_name}{name_number}"
+            name_number += 1
+        job_names.append(unique_name)
+
+    return job_names
+
+
+def create_jobs(
+    recipe_paths: List[str],
+    base_scene: str,
+    output_directory: str,
+    proxy_only: bool = False,
+) -> List[RigBuildJob]:
+    """Create a build job per recipe, publishing to <output_directory>/<job>.mb.
+
+    Job names are the recipe names, made unique when recipes share a file name so
+    concurrent jobs never write the same rig, log or results file.
+
+    Args:
+        recipe_paths (List[str]): Rig recipe paths.
+        base_scene (str): Maya file each rig is built into.
+        output_directory (str): Directory rigs are published to.
+        proxy_only (bool, optional): Only build module proxies. Defaults to False.
+
+    Returns:
+        List[RigBuildJob]: Build jobs.
+    """
+    build_jobs = []
+    for recipe_path, job_name in zip(recipe_paths, get_unique_job_names(recipe_paths)):
+        build_jobs.append(
+            RigBuildJob(
+                recipe_path,
+                base_scene,
+                f"{output_directory}/{job_name}.mb",
+                proxy_only,
+                job_name,
+            )
+        )
+
+    return build_jobs
+
+
+def create_worker_command(
+    build_job: RigBuildJob,
+    results_path: str,
+    executable: str,
+    worker_module: str,
+    worker_arguments: List[str] = None,
+) -> List[str]:
+    """Get the command line that runs a build job in a worker process.
+
+    Args:
+        build_job (RigBuildJob): Build job.
+        results_path (str): Path the worker writes its module results to.
+        executable (str): Python executable the worker runs with i.e. mayapy.
+        worker_module (str): Worker module run with -m.
+        worker_arguments (List[str], optional): Extra worker arguments.
+
+    Returns:
+        List[str]: Worker command line.
+    """
+    worker_command = [
+        executable,
+        "-m",
+        worker_module,
+        build_job.recipe_path,
+        "--scene",
+        build_job.base_scene,
+        "--output",
+        build_job.output_path,
+        "--results",
+        results_path,
+    ]
+    if build_job.proxy_only:
+        worker_command.append("--proxy-only")
+    worker_command.extend(worker_arguments or [])
+
+    return worker_command
+
+
+def run_build_job(
+    build_job: RigBuildJob,
+    log_directory: str,
+    executable: str,
+    worker_module: str = BUILD_WORKER_MODULE,
+    timeout: float = None,
+    worker_arguments: List[str] = None,
+) -> RigBuildJobResult:
+    """Build one rig in a worker process.
+
+    Args:
+        build_job (RigBuildJob): Build job.
+        log_directory (str): Directory for the worker's log and results files.
+        executable (str): Python executable the worker runs with i.e. mayapy.
+        worker_module (str, optional): Worker module run with -m.
+            Defaults to the headless build engine.
+        timeout (float, optional): Seconds before the worker is killed.
+            Defaults to no limit.
+        worker_arguments (List[str], optional): Extra arguments for the worker,
+            like --incremental.
+
+    Returns:
+        RigBuildJobResult: Build job result. Never raises for worker failures.
+    """
+    log_path = f"{log_directory}/{build_job.name}.log"
+    results_path = f"{log_directory}/{build_job.name}_results.json"
+    if os.path.isfile(results_path):
+        os.remove(results_path)
+
+    worker_environment = dict(os.environ)
+    worker_environment["PYTHONPATH"] = os.pathsep.join(
+        filter(
+            None,
+            [MAIN_PATHS["python_tools_path"], worker_environment.get("PYTHONPATH")],
+        )
+    )
+
+    return_code = -1
+    error = ""
+    start_time = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log_file:
+        try:
+            return_code = subprocess.run(
+                create_worker_command(
+                    build_job,
+                    results_path,
+                    executable,
+                    worker_module,
+                    worker_arguments,
+                ),
+                cwd=MAIN_PATHS["python_tools_path"],
+                env=worker_environment,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                timeout=timeout,
+                check=False,
+            ).returncode
+        except subprocess.TimeoutExpired:
+            error = f"Worker timed out after {timeout} seconds."
+        except OSError as worker_error:
+            error = f"Worker could not start: {worker_error}"
+    seconds = time.perf_counter() - start_time
+
+    module_results = []
+    if os.path.isfile(results_path):
+        module_results = (fut.get_json_data(results_path) or {}).get("modules", [])
+    if not error and return_code != 0:
+        error = f"Worker exited with code {return_code}. See {log_path}"
+
+    return RigBuildJobResult(
+        build_job.recipe_path,
+        build_job.output_path,
+        return_code,
+        seconds,
+        log_path,
+        module_results,
+        error,
+    )
+
+
+def run_batch(
+    build_jobs: List[RigBuildJob],
+    log_directory: str,
+    worker_count: int = DEFAULT_WORKER_COUNT,
+    executable: str = None,
+    worker_module: str = BUILD_WORKER_MODULE,
+    timeout: float = None,
+    worker_arguments: List[str] = None,
+) -> List[RigBuildJobResult]:
+    """Build rigs on a pool of worker processes.
+
+    Args:
+        build_jobs (List[RigBuildJob]): Build jobs.
+        log_directory (str): Directory for worker log and results files.
+        worker_count (int, optional): Workers running at once.
+            Defaults to DEFAULT_WORKER_COUNT.
+        executable (str, optional): Worker python executable. Defaults to mayapy.
+        worker_module (str, optional): Worker module run with -m.
+            Defaults to the headless build engine.
+        timeout (float, optional): Seconds before a worker is killed.
+            Defaults to no limit.
+        worker_arguments (List[str], optional): Extra arguments for every worker,
+            like --incremental.
+
+    Returns:
+        List[RigBuildJobResult]: Result of each job in job order.
+    """
+    executable = executable or get_mayapy_path()
+    fut.create_directory(log_directory)
+    for build_job in build_jobs:
+        fut.create_directory(cpath.get_parent_directory(build_job.output_path, 0))
+
+    job_results = [None] * len(build_jobs)
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        job_futures = {
+            executor.submit(
+                run_build_job,
+                build_job,
+                log_directory,
+                executable,
+                worker_module,
+                timeout,
+                worker_arguments,
+            ): job_index
+            for job_index, build_job in enumerate(build_jobs)
+        }
+        for job_future in as_completed(job_futures):
+            job_result = job_future.result()
+            job_results[job_futures[job_future]] = job_result
+            if job_result.succeeded:
+                LOG.info(
+                    "Built %s in %.1fs", job_result.recipe_path, job_result.seconds
+                )
+            else:
+                LOG.error("Failed %s: %s", job_result.recipe_path, job_result.error)
+
+    return job_results
+
+
+def format_batch_results(job_results: List[RigBuildJobResult]) -> str:
+    """Format batch results as readable text, one rig per line."""
+    result_lines = []
+    for job_result in job_results:
+        failed_modules = [
+            module_result["metanode"]
+            for module_result in job_result.module_results
+            if module_result.get("error")
+        ]
+        result_lines.append(
+            f"{'ok' if job_result.succeeded else 'FAILED':<7}"
+            f"{job_result.seconds:8.1f}s  {job_result.recipe_path} "
+            f"({len(job_result.module_results)} modules"
+            f"{', failed: ' + ', '.join(failed_modules) if failed_modules else ''})"
+        )
+        if job_result.error:
+            result_lines.append(f"{'':17}{job_result.error}")
+
+    failed_count = len(
+        [job_result for job_result in job_results if not job_result.succeeded]
+    )
+    result_lines.append(
+        f"{len(job_results) - failed_count} built, {failed_count} failed"
+    )
+
+    return "\n".join(result_lines)
+
+
+def save_batch_report(job_results: List[RigBuildJobResult], report_path: str) -> str:
+    """Save batch results as JSON.
+
+    Returns:
+        str: Saved report path.
+    """
+    fut.write_json_data(
+        {
+            "rigs": [
+                dict(asdict(job_result), succeeded=job_result.succeeded)
+                for job_result in job_results
+            ]
+        },
+        report_path,
+    )
+    LOG.info("Saved batch build report: %s", report_path)
+
+    return report_path
+
+
+def main(arguments: List[str] = None) -> int:
+    """Run the batch rig build command line interface."""
+    parser = argparse.ArgumentParser(
+        description="Build rig recipes in parallel. Other arguments go to workers."
+    )
+    parser.add_argument("recipes", nargs="+", help="Rig recipe paths.")
+    parser.add_argument(
+        "--base-scene", required=True, help="Maya file each rig is built into."
+    )
+    parser.add_argument(
+        "--output-directory", required=True, help="Directory to publish rigs to."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKER_COUNT,
+        help="Worker processes running at once.",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="Seconds allowed per rig."
+    )
+    parser.add_argument(
+        "--proxy-only", action="store_true", help="Only build module proxies."
+    )
+    parser.add_argument("--mayapy", default=None, help="mayapy executable path.")
+    parser.add_argument(
+        "--stub",
+        action="store_true",
+        help="Run the stand-in worker with this python instead of mayapy.",
+    )
+    parser.add_argument("--report", default=None, help="Path to save a JSON report.")
+    parsed_arguments, worker_arguments = parser.parse_known_args(arguments)
+    logging.basicConfig(level=logging.INFO)
+
+    output_directory = os.path.abspath(parsed_arguments.output_directory).replace(
+        "\\", "/"
+    )
+    build_jobs = create_jobs(
+        [os.path.abspath(recipe_path) for recipe_path in parsed_arguments.recipes],
+        os.path.abspath(parsed_arguments.base_scene),
+        output_directory,
+        parsed_arguments.proxy_only,
+    )
+    job_results = run_batch(
+        build_jobs,
+        f"{output_directory}/logs",
+        parsed_arguments.workers,
+        sys.executable if parsed_arguments.stub else parsed_arguments.mayapy,
+        STUB_WORKER_MODULE if parsed_arguments.stub else BUILD_WORKER_MODULE,
+        parsed_arguments.timeout,
+        worker_arguments,
+    )
+    print(format_batch_results(job_results))
+
+    if parsed_arguments.report:
+        save_batch_report(job_results, parsed_arguments.report)
+
+    if all(job_result.succeeded for job_result in job_results):
+        return 0
+
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,501 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Headless rig build engine.
+
+Builds a rig from a rig recipe without the Vulcan window, so rigs can be rebuilt
+from mayapy on a farm. Each module type registers a build function that creates the
+module's Maya nodes from its config and returns the config to store on its
+metanode. Modules build parents first. A failed module is logged and skipped along
+with its children while the rest of the rig still builds.
+
+Rebuilding into a scene that already has the rig compares each recipe module's
+hash with the hash stored on its metanode. Changed and removed modules are torn
+down by deleting their metanode and everything under it, so a module builder must
+create all its nodes under its metanode or register a MODULE_TEARDOWNS function
+that removes the rest. Changed modules and the modules under them are then built
+again. A changed Root module or bind proxy needs a full build from the base file.
+
+The Vulcan window can't load recipes yet. To edit one, build it with this engine,
+open the built rig in Maya so the window restores its module stack, then export
+the edited stack as a recipe again.
+
+Command line usage (from the src/tools directory, with mayapy):
+
+    mayapy -m Rigging.VulcanRig.src.engine.build_engine RECIPE
+        [--scene BASE_OR_RIG_FILE] [--output RIG_FILE] [--proxy-only]
+        [--incremental [--base-scene BASE_FILE]] [--results RESULTS_JSON]
+"""
+
+from __future__ import annotations
+import argparse
+import copy
+from dataclasses import asdict, dataclass, field
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from maya import cmds
+
+from Core.util import file_util_tools as fut
+
+from ..data import module_metadata
+from ..data.build_options import ModuleBuildMethod
+from ..data.module_graph import ModuleGraph
+from ..data.module_types import ModuleType
+from ..rig_modules import bind_proxy_module, root_build
+from ..rig_modules.biped_modules import biped_spine_build
+from ..util import metadata_utils
+from . import rig_recipe
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+# Module build functions by ModuleType name
+MODULE_BUILDERS: Dict[str, Callable] = {}
+# Module teardown functions by ModuleType name. Defaults to teardown_module.
+MODULE_TEARDOWNS: Dict[str, Callable[[str], None]] = {}
+
+
+def register_module_builder(module_type: ModuleType):
+    """Register the headless build function of a module type.
+
+    The function takes the module's config and the build method, creates the Maya
+    nodes and returns the config to store on the module's metanode.
+
+    Args:
+        module_type (ModuleType): Module type the function builds.
+
+    Returns:
+        Callable: Decorator registering the build function.
+    """
+
+    def register(build_function):
+        MODULE_BUILDERS[module_type.name] = build_function
+        return build_function
+
+    return register
+
+
+def teardown_module(metanode: str) -> None:
+    """Delete a module's metanode and the nodes under it."""
+    if not cmds.objExists(metanode):
+        return
+
+    cmds.lockNode(metanode, lock=False)
+    cmds.delete(metanode)
+
+
+@register_module_builder(ModuleType.ROOT)
+def build_root(
+    root_config: module_metadata.RootConfig, build_method: ModuleBuildMethod
+) -> module_metadata.RootConfig:
+    # Root is always fully built since every other module is built under it
+    del build_method
+    # Headless builds have no undo, so batch the Root nodes with the API builder
+    built_config = root_build.build_root_module(
+        root_config.asset_name, use_api_builder=True
+    )
+    built_config.side = root_config.side
+
+    return built_config
+
+
+@register_module_builder(ModuleType.BIPED_SPINE)
+def build_biped_spine(
+    spine_config: module_metadata.BipedSpineConfig, build_method: ModuleBuildMethod
+) -> module_metadata.BipedSpineConfig:
+    # generate_spine_module() isn't finished (its FK controls use undefined helpers),
+    # so rig builds fail the module instead of reporting a proxy as a built rig
+    if build_method == ModuleBuildMethod.BUILD_MAYA:
+        raise NotImplementedError(
+            "Headless spine rig builds aren't supported yet. Use --proxy-only."
+        )
+
+    return biped_spine_build.build_spine_proxy(spine_config)
+
+
+@dataclass
+class ModuleBuildResult:
+    metanode: str
+    module_type: str
+    seconds: float = 0.0
+    error: str = ""
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.error
+
+
+@dataclass
+class RebuildPlan:
+    # Scene modules to tear down, children first
+    to_remove: List[str] = field(default_factory=list)
+    # Recipe modules to build, parents first
+    to_build: List[str] = field(default_factory=list)
+    # Root or bind proxy changed, build the whole rig from the base file
+    full_rebuild: bool = False
+
+
+def plan_rebuild(
+    module_graph: ModuleGraph, built_hashes: Dict[str, str]
+) -> RebuildPlan:
+    """Find which modules need rebuilding for a recipe.
+
+    A module is rebuilt if its hash differs from the one it was built with, or its
+    parent is rebuilt. Modules built but no longer in the recipe are removed.
+
+    Args:
+        module_graph (ModuleGraph): Recipe module graph.
+        built_hashes (Dict[str, str]): Build hash of each module in the scene.
+
+    Returns:
+        RebuildPlan: Modules to tear down and build.
+    """
+    rebuild_plan = RebuildPlan()
+    dirty_metanodes = set()
+    for module_node in module_graph.iter_depth_first():
+        if (
+            module_node.parent in dirty_metanodes
+            or built_hashes.get(module_node.metanode) != module_node.module.build_hash
+        ):
+            dirty_metanodes.add(module_node.metanode)
+            rebuild_plan.to_build.append(module_node.metanode)
+            if module_node.module_type == ModuleType.ROOT.name:
+                rebuild_plan.full_rebuild = True
+
+    rebuild_plan.to_remove = [
+        metanode
+        for metanode in reversed(rebuild_plan.to_build)
+        if metanode in built_hashes
+    ] + [metanode for metanode in built_hashes if metanode not in module_graph]
+
+    return rebuild_plan
+
+
+class RigBuildEngine:
+    """Builds the modules of a module graph into the open Maya scene."""
+
+    def __init__(
+        self,
+        module_graph: ModuleGraph,
+        metanode_registry: metadata_utils.MetanodeRegistry = None,
+    ):
+        """Initialize engine.
+
+        Args:
+            module_graph (ModuleGraph): Graph with a ModuleConfig attached to each
+                node, like rig_recipe.load_module_graph returns.
+            metanode_registry (metadata_utils.MetanodeRegistry, optional): Registry
+                to write module metadata through. Defaults to the session registry.
+        """
+        self.module_graph = module_graph
+        self.metanode_registry = (
+            metanode_registry or metadata_utils.get_metanode_registry()
+        )
+
+    def build(
+        self,
+        build_method: ModuleBuildMethod = ModuleBuildMethod.BUILD_MAYA,
+        metanodes: Iterable[str] = None,
+    ) -> List[ModuleBuildResult]:
+        """Build modules, parents first.
+
+        Args:
+            build_method (ModuleBuildMethod, optional): BUILD_PROXY to only create
+                module nodes, BUILD_MAYA to build the rig. Defaults to BUILD_MAYA.
+            metanodes (Iterable[str], optional): Modules to build. The others must
+                already be built in the scene. Defaults to all modules.
+
+        Returns:
+            List[ModuleBuildResult]: Result of each module in build order.
+        """
+        self.metanode_registry.scan()
+        if metanodes is not None:
+            metanodes = set(metanodes)
+
+        build_results = []
+        built_configs: Dict[str, module_metadata.ModuleConfig] = {}
+        failed_metanodes = set()
+        for module_node in list(self.module_graph.iter_depth_first()):
+            if metanodes is not None and module_node.metanode not in metanodes:
+                continue
+
+            build_result = ModuleBuildResult(
+                module_node.metanode, module_node.module_type
+            )
+            build_results.append(build_result)
+
+            build_function = MODULE_BUILDERS.get(module_node.module_type)
+            if module_node.parent in failed_metanodes:
+                build_result.error = f"Parent module '{module_node.parent}' failed."
+            elif build_function is None:
+                build_result.error = f"No builder for {module_node.module_type}."
+            if build_result.error:
+                LOG.error("Skipping '%s': %s", module_node.metanode, build_result.error)
+                failed_metanodes.add(module_node.metanode)
+                continue
+
+            start_time = time.perf_counter()
+            try:
+                built_config = build_function(
+                    copy.deepcopy(module_node.module), build_method
+                )
+            except Exception as build_error:  # pylint: disable=broad-except
+                # Isolate module failures so the rest of the rig still builds
+                LOG.exception("Module '%s' failed to build.", module_node.metanode)
+                build_result.error = str(build_error) or type(build_error).__name__
+                failed_metanodes.add(module_node.metanode)
+                continue
+            finally:
+                build_result.seconds = time.perf_counter() - start_time
+
+            built_config.build_hash = module_node.module.build_hash
+            # Maya may give the node a different name if the recipe name was taken
+            if built_config.metanode != module_node.metanode:
+                self.module_graph.rename_module(
+                    module_node.metanode, built_config.metanode
+                )
+                build_result.metanode = built_config.metanode
+            module_node.module = built_config
+            built_configs[built_config.metanode] = built_config
+
+        self._write_metadata(built_configs)
+
+        return build_results
+
+    def rebuild(
+        self, build_method: ModuleBuildMethod = ModuleBuildMethod.BUILD_MAYA
+    ) -> Tuple[RebuildPlan, List[ModuleBuildResult]]:
+        """Rebuild only the modules that changed since the scene's rig was built.
+
+        Args:
+            build_method (ModuleBuildMethod, optional): Defaults to BUILD_MAYA.
+
+        Returns:
+            tuple: (RebuildPlan, build results). Nothing is built if the plan needs
+                a full rebuild.
+        """
+        self.metanode_registry.scan()
+        built_hashes = {
+            metanode: metadata.get("build_hash", "")
+            for metanode, metadata in self.metanode_registry.iter_metadata()
+        }
+        rebuild_plan = plan_rebuild(self.module_graph, built_hashes)
+        if rebuild_plan.full_rebuild:
+            LOG.info("Root module or bind proxy changed, full rebuild needed.")
+            return rebuild_plan, []
+
+        with self.metanode_registry.batch():
+            for metanode in rebuild_plan.to_remove:
+                module_type = self.metanode_registry.get_metadata(metanode).get(
+                    "module_type", ""
+                )
+                MODULE_TEARDOWNS.get(module_type, teardown_module)(metanode)
+                self.metanode_registry.unregister(metanode)
+
+            # Kept modules stop listing torn down children
+            removed_metanodes = set(rebuild_plan.to_remove)
+            for metanode, metadata in list(self.metanode_registry.iter_metadata()):
+                child_metanodes = metadata.get("child_metanodes", [])
+                if removed_metanodes.isdisjoint(child_metanodes):
+                    continue
+                kept_metadata = self.metanode_registry.get_metadata(metanode)
+                kept_metadata["child_metanodes"] = [
+                    child_name
+                    for child_name in child_metanodes
+                    if child_name not in removed_metanodes
+                ]
+                self.metanode_registry.write_metadata(metanode, kept_metadata)
+
+        LOG.info(
+            "Rebuilding %s of %s module(s).",
+            len(rebuild_plan.to_build),
+            len(self.module_graph),
+        )
+        return rebuild_plan, self.build(build_method, rebuild_plan.to_build)
+
+    def _write_metadata(
+        self, built_configs: Dict[str, module_metadata.ModuleConfig]
+    ) -> None:
+        with self.metanode_registry.batch():
+            for metanode, built_config in built_configs.items():
+                built_config.parent_metanode = self.module_graph.get_parent(metanode)
+                built_config.child_metanodes = self._get_existing_children(
+                    metanode, built_configs
+                )
+                self.metanode_registry.write_metadata(metanode, asdict(built_config))
+
+            # Parents kept from an earlier build list their rebuilt children too
+            for metanode in {
+                self.module_graph.get_parent(built_metanode)
+                for built_metanode in built_configs
+            }:
+                if metanode in built_configs or metanode not in self.metanode_registry:
+                    continue
+                parent_metadata = self.metanode_registry.get_metadata(metanode)
+                parent_metadata["child_metanodes"] = self._get_existing_children(
+                    metanode, built_configs
+                )
+                self.metanode_registry.write_metadata(metanode, parent_metadata)
+
+    def _get_existing_children(
+        self, metanode: str, built_configs: Dict[str, module_metadata.ModuleConfig]
+    ) -> List[str]:
+        return [
+            child_name
+            for child_name in self.module_graph.get_children(metanode)
+            if child_name in built_configs or child_name in self.metanode_registry
+        ]
+
+
+def build_recipe(
+    recipe: dict, build_method: ModuleBuildMethod = ModuleBuildMethod.BUILD_MAYA
+) -> List[ModuleBuildResult]:
+    """Build a rig recipe into the open Maya scene.
+
+    Args:
+        recipe (dict): Recipe data.
+        build_method (ModuleBuildMethod, optional): Defaults to BUILD_MAYA.
+
+    Returns:
+        List[ModuleBuildResult]: Result of each module in build order.
+    """
+    build_engine = RigBuildEngine(rig_recipe.load_module_graph(recipe))
+    if recipe.get("bind_proxy") or recipe.get("bind_proportions"):
+        bind_proxy_module.refit_bind_skeleton(
+            recipe.get("bind_proxy"),
+            recipe.get("bind_proportions"),
+            use_api_builder=True,
+        )
+
+    return build_engine.build(build_method)
+
+
+def rebuild_recipe(
+    recipe: dict, build_method: ModuleBuildMethod = ModuleBuildMethod.BUILD_MAYA
+) -> Tuple[RebuildPlan, List[ModuleBuildResult]]:
+    """Rebuild the changed modules of a rig recipe in a scene already holding the rig.
+
+    Args:
+        recipe (dict): Recipe data.
+        build_method (ModuleBuildMethod, optional): Defaults to BUILD_MAYA.
+
+    Returns:
+        tuple: (RebuildPlan, build results). Nothing is built if the plan needs
+            a full rebuild.
+    """
+    build_engine = RigBuildEngine(rig_recipe.load_module_graph(recipe))
+    return build_engine.rebuild(build_method)
+
+
+def format_results(build_results: List[ModuleBuildResult]) -> str:
+    """Format build results as readable text, one module per line."""
+    result_lines = [
+        f"{'ok' if build_result.succeeded else 'FAILED':<7}"
+        f"{build_result.seconds:8.3f}s  {build_result.metanode} "
+        f"({build_result.module_type}) {build_result.error}".rstrip()
+        for build_result in build_results
+    ]
+    failed_count = len(
+        [build_result for build_result in build_results if not build_result.succeeded]
+    )
+    result_lines.append(
+        f"{len(build_results) - failed_count} built, {failed_count} failed"
+    )
+
+    return "\n".join(result_lines)
+
+
+def save_results(build_results: List[ModuleBuildResult], results_path: str) -> str:
+    """Save build results as JSON for batch build drivers.
+
+    Returns:
+        str: Saved results path.
+    """
+    fut.write_json_data(
+        {"modules": [asdict(build_result) for build_result in build_results]},
+        results_path,
+    )
+
+    return results_path
+
+
+def initialize_standalone() -> None:
+    """Start Maya standalone when running from mayapy."""
+    try:
+        import maya.standalone  # pylint: disable=import-outside-toplevel
+
+        maya.standalone.initialize(name="python")
+    except RuntimeError:
+        # Already running inside an interactive or initialized Maya session
+        pass
+
+
+def main(arguments: List[str] = None) -> int:
+    """Run the headless rig build command line interface."""
+    parser = argparse.ArgumentParser(description="Build a rig from a rig recipe.")
+    parser.add_argument("recipe", help="Rig recipe path.")
+    parser.add_argument("--scene", default=None, help="Maya file to build into.")
+    parser.add_argument("--output", default=None, help="Path to save the rig to.")
+    parser.add_argument(
+        "--proxy-only", action="store_true", help="Only build module proxies."
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rebuild changed modules of the rig in --scene.",
+    )
+    parser.add_argument(
+        "--base-scene",
+        default=None,
+        help="Maya file to fully build into when an incremental rebuild can't.",
+    )
+    parser.add_argument(
+        "--results", default=None, help="Path to save build results JSON to."
+    )
+    parsed_arguments = parser.parse_args(arguments)
+
+    initialize_standalone()
+
+    if parsed_arguments.scene:
+        cmds.file(parsed_arguments.scene, open=True, force=True)
+
+    recipe = rig_recipe.load_recipe(parsed_arguments.recipe)
+    build_method = (
+        ModuleBuildMethod.BUILD_PROXY
+        if parsed_arguments.proxy_only
+        else ModuleBuildMethod.BUILD_MAYA
+    )
+    if parsed_arguments.incremental:
+        rebuild_plan, build_results = rebuild_recipe(recipe, build_method)
+        if rebuild_plan.full_rebuild:
+            if not parsed_arguments.base_scene:
+                LOG.error("Full rebuild needed, pass --base-scene to build one.")
+                return 1
+            cmds.file(parsed_arguments.base_scene, open=True, force=True)
+            build_results = build_recipe(recipe, build_method)
+    else:
+        build_results = build_recipe(recipe, build_method)
+    print(format_results(build_results))
+
+    if parsed_arguments.output:
+        cmds.file(rename=parsed_arguments.output)
+        cmds.file(
+            save=True,
+            force=True,
+            type=(
+                "mayaAscii" if parsed_arguments.output.endswith(".ma") else "mayaBinary"
+            ),
+        )
+        LOG.info("Saved rig: %s", parsed_arguments.output)
+
+    if parsed_arguments.results:
+        save_results(build_results, parsed_arguments.results)
+
+    if all(build_result.succeeded for build_result in build_results):
+        return 0
+
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
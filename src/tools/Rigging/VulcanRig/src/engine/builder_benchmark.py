@@ -0,0 +1,198 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Benchmark the rig builders on a biped spine.
+
+Builds the same biped spine setup with the maya.cmds and OpenMaya rig builders in a
+new scene each run and compares their build times. The spine has a bind chain from
+the bind proxy spine positions, IK, FK and driver chains, an offset group and
+control per FK joint, a settings control with an IK/FK blend attribute, and a
+matrix network driving each driver joint from its FK joint.
+
+Command line usage (from the src/tools directory, with mayapy):
+
+    mayapy -m Rigging.VulcanRig.src.engine.builder_benchmark [--repeat COUNT]
+        [--copies COUNT]
+"""
+
+from __future__ import annotations
+import argparse
+import logging
+import os
+import statistics
+import time
+from typing import Dict, List
+
+from maya import cmds
+
+from ..data.bind_modules_positions import BindModulePositions
+from ..util import rig_builder
+from .build_engine import initialize_standalone
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+KINEMATIC_CHAIN_SUFFIXES = ("IK_JNT", "FK_JNT", "DRV_JNT")
+
+
+def get_spine_chain() -> List[dict]:
+    """Get the spine joint names and world positions of the bind proxy."""
+    return [
+        {**joint_position, "name": joint_position["name"].replace("_BPX", "")}
+        for joint_position in BindModulePositions.SPINE.value
+    ]
+
+
+def build_spine(builder: rig_builder.RigBuilder, spine_copies: int = 1) -> int:
+    """Build the benchmark biped spine setup with a rig builder.
+
+    Args:
+        builder (rig_builder.RigBuilder): Builder to build with. Committed here.
+        spine_copies (int, optional): Number of spine setups to build, to measure
+            larger rigs. Defaults to 1.
+
+    Returns:
+        int: Number of nodes created.
+    """
+    spine_chain = get_spine_chain()
+    created_count = 0
+    for copy_index in range(spine_copies):
+        prefix = f"C{copy_index}"
+        module_group = builder.create_node("transform", f"{prefix}_spine_GRP")
+        settings_control = builder.create_node(
+            "transform", f"{prefix}_spineSettings_CTL", module_group
+        )
+        ik_fk_blend = builder.add_attr(
+            settings_control, "ikFkBlend", "double", default_value=0.0
+        )
+        created_count += 2
+
+        chains: Dict[str, List[str]] = {}
+        for suffix in ("BND_JNT", *KINEMATIC_CHAIN_SUFFIXES):
+            chain_joints = []
+            parent_joint = module_group
+            parent_position = [0.0, 0.0, 0.0]
+            for spine_joint in spine_chain:
+                chain_joints.append(
+                    builder.create_joint(
+                        f"{prefix}_{spine_joint['name']}_{suffix}",
+                        parent_joint,
+                        [
+                            position - parent_value
+                            for position, parent_value in zip(
+                                spine_joint["position"], parent_position
+                            )
+                        ],
+                        [0.0, 0.0, 90.0],
+                    )
+                )
+                parent_joint = chain_joints[-1]
+                parent_position = spine_joint["position"]
+            chains[suffix] = chain_joints
+            created_count += len(chain_joints)
+
+        parent_control = module_group
+        for fk_joint, driver_joint in zip(chains["FK_JNT"], chains["DRV_JNT"]):
+            offset_group = builder.create_node(
+                "transform", f"{fk_joint}_Offset_GRP", parent_control
+            )
+            fk_control = builder.create_node(
+                "transform", f"{fk_joint}_CTL", offset_group
+            )
+            builder.set_attr(f"{fk_control}.rotateOrder", 2)
+            builder.add_attr(fk_control, "space", "long", default_value=0)
+            builder.connect_attr(f"{fk_control}.rotate", f"{fk_joint}.rotate")
+
+            mult_matrix = builder.create_node("multMatrix", f"{driver_joint}_MMX")
+            decompose_matrix = builder.create_node(
+                "decomposeMatrix", f"{driver_joint}_DCM"
+            )
+            builder.connect_attr(
+                f"{fk_joint}.worldMatrix[0]", f"{mult_matrix}.matrixIn[0]"
+            )
+            builder.connect_attr(
+                f"{driver_joint}.parentInverseMatrix[0]", f"{mult_matrix}.matrixIn[1]"
+            )
+            builder.connect_attr(
+                f"{mult_matrix}.matrixSum", f"{decompose_matrix}.inputMatrix"
+            )
+            builder.connect_attr(
+                f"{decompose_matrix}.outputRotate", f"{driver_joint}.rotate"
+            )
+            builder.connect_attr(ik_fk_blend, f"{offset_group}.visibility")
+            parent_control = fk_control
+            created_count += 4
+
+    builder.commit()
+
+    return created_count
+
+
+def time_builder(use_api: bool, repeat: int, spine_copies: int) -> List[float]:
+    """Time building the spine setup in a new scene each run.
+
+    Returns:
+        List[float]: Seconds of each run.
+    """
+    run_times = []
+    for _ in range(repeat):
+        cmds.file(new=True, force=True)
+        start_time = time.perf_counter()
+        build_spine(rig_builder.get_rig_builder(use_api), spine_copies)
+        run_times.append(time.perf_counter() - start_time)
+
+    return run_times
+
+
+def run_benchmark(repeat: int = 5, spine_copies: int = 1) -> Dict[str, List[float]]:
+    """Time both rig builders on the biped spine setup.
+
+    Args:
+        repeat (int, optional): Runs per builder. Defaults to 5.
+        spine_copies (int, optional): Spine setups built per run. Defaults to 1.
+
+    Returns:
+        Dict[str, List[float]]: Run seconds by builder name.
+    """
+    # Warm up node type lookups and plugin loading before timing
+    time_builder(True, 1, 1)
+
+    return {
+        "cmds": time_builder(False, repeat, spine_copies),
+        "api": time_builder(True, repeat, spine_copies),
+    }
+
+
+def format_benchmark(run_times: Dict[str, List[float]]) -> str:
+    """Format benchmark run times as readable text, one builder per line."""
+    result_lines = [
+        f"{builder_name:<6} best {min(times) * 1000:8.2f}ms  "
+        f"mean {statistics.mean(times) * 1000:8.2f}ms"
+        for builder_name, times in run_times.items()
+    ]
+    result_lines.append(
+        f"api speedup: {min(run_times['cmds']) / min(run_times['api']):.1f}x"
+    )
+
+    return "\n".join(result_lines)
+
+
+def main(arguments: List[str] = None) -> int:
+    """Run the rig builder benchmark command line interface."""
+    parser = argparse.ArgumentParser(description="Benchmark rig builders.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per builder.")
+    parser.add_argument(
+        "--copies", type=int, default=1, help="Spine setups built per run."
+    )
+    parsed_arguments = parser.parse_args(arguments)
+
+    initialize_standalone()
+
+    print(
+        format_benchmark(
+            run_benchmark(parsed_arguments.repeat, parsed_arguments.copies)
+        )
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,312 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Rig recipe files.
+
+A rig recipe is the serialized module graph of a rig: every module's metanode name,
+type, side, parent and config values, listed parents first, plus the bind proxy
+joint positions. An optional bind_proportions entry re-fits the bind skeleton to
+new proportions before the modules are built, with a uniform or per axis scale and
+per joint bone length scales. The headless build engine builds a rig from a
+recipe, and the Vulcan window edits and exports them.
+
+Each module has a content hash of its own entry and the bind skeleton. The
+hash is stored on the module's metanode when built, so a rebuild only needs to
+rebuild modules whose hash changed and the modules under them.
+
+Recipe layout:
+
+    {
+        "format_version": 2,
+        "asset_name": "TestSkeleton",
+        "bind_proxy": {"pelvis": [0.0, 98.7, 2.4], ...},
+        "bind_proportions": {"scale": 1.05, "bone_scales": {"calf_r": 1.1, ...}},
+        "modules": [
+            {
+                "metanode": "Asset",
+                "module_type": "ROOT",
+                "side": "C",
+                "parent": "",
+                "config": {"asset_name": "TestSkeleton", ...},
+                "hash": "5f0c..."
+            },
+            ...
+        ]
+    }
+"""
+
+from dataclasses import asdict
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Tuple
+
+from Core import core_paths as cpath
+from Core.util import file_util_tools as fut
+
+from ..data import module_metadata
+from ..data.module_graph import ModuleGraph
+from ..data.module_types import ModuleSide, ModuleType
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+RECIPE_FORMAT_VERSION = 2
+
+# Config fields stored on the recipe module entry, derived from the graph or set
+# when building
+GRAPH_FIELDS = (
+    "metanode",
+    "module_type",
+    "side",
+    "parent_metanode",
+    "child_metanodes",
+    "build_hash",
+)
+
+
+def _hash_json(data) -> str:
+    return hashlib.sha1(
+        json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+def hash_bind_proxy(
+    bind_proxy: Dict[str, List[float]], bind_proportions: dict = None
+) -> str:
+    """Hash bind proxy joint positions, rounded to hide float noise.
+
+    Args:
+        bind_proxy (Dict[str, List[float]]): Bind proxy joint world positions.
+        bind_proportions (dict, optional): Bind skeleton re-fit proportions.
+
+    Returns:
+        str: Bind skeleton hash.
+    """
+    positions = {
+        joint_name: [round(value, 4) for value in position]
+        for joint_name, position in bind_proxy.items()
+    }
+    # Recipes without proportions keep the hashes they were built with
+    if not bind_proportions:
+        return _hash_json(positions)
+
+    return _hash_json({"positions": positions, "proportions": bind_proportions})
+
+
+def hash_recipe_module(recipe_module: dict, bind_proxy_hash: str) -> str:
+    """Hash a recipe module entry.
+
+    Every module is built on the bind skeleton, so the bind proxy hash is part of
+    every module's hash.
+
+    Args:
+        recipe_module (dict): Recipe module entry.
+        bind_proxy_hash (str): Hash of the recipe's bind proxy positions.
+
+    Returns:
+        str: Module content hash.
+    """
+    return _hash_json(
+        {
+            "module_type": recipe_module["module_type"],
+            "side": recipe_module.get("side", ModuleSide.CENTER.value),
+            "parent": recipe_module.get("parent", ""),
+            "config": recipe_module.get("config", {}),
+            "bind_proxy": bind_proxy_hash,
+        }
+    )
+
+
+def create_recipe(
+    module_graph: ModuleGraph,
+    asset_name: str = "",
+    bind_proxy: Dict[str, List[float]] = None,
+    bind_proportions: dict = None,
+) -> dict:
+    """Serialize a module graph whose nodes carry their module configs.
+
+    Args:
+        module_graph (ModuleGraph): Graph with a ModuleConfig attached to each node.
+        asset_name (str, optional): Rig asset name.
+        bind_proxy (Dict[str, List[float]], optional): Bind proxy joint world
+            positions by joint name.
+        bind_proportions (dict, optional): Bind skeleton re-fit proportions.
+
+    Returns:
+        dict: Recipe data.
+    """
+    bind_proxy = bind_proxy or {}
+    bind_proxy_hash = hash_bind_proxy(bind_proxy, bind_proportions)
+    recipe_modules = []
+    for module_node in module_graph.iter_depth_first():
+        module_config = asdict(module_node.module) if module_node.module else {}
+        recipe_modules.append(
+            {
+                "metanode": module_node.metanode,
+                "module_type": module_node.module_type,
+                "side": module_node.side,
+                "parent": module_node.parent,
+                "config": {
+                    field_name: value
+                    for field_name, value in module_config.items()
+                    if field_name not in GRAPH_FIELDS
+                },
+            }
+        )
+        recipe_modules[-1]["hash"] = hash_recipe_module(
+            recipe_modules[-1], bind_proxy_hash
+        )
+
+    recipe = {
+        "format_version": RECIPE_FORMAT_VERSION,
+        "asset_name": asset_name,
+        "bind_proxy": bind_proxy,
+        "modules": recipe_modules,
+    }
+    if bind_proportions:
+        recipe["bind_proportions"] = bind_proportions
+
+    return recipe
+
+
+def recipe_from_metadata(
+    metadata_items: Iterable[Tuple[str, dict]],
+    bind_proxy: Dict[str, List[float]] = None,
+) -> dict:
+    """Create a recipe from scene metanode metadata.
+
+    Args:
+        metadata_items (Iterable[Tuple[str, dict]]): (metanode, metadata) pairs,
+            like MetanodeRegistry.iter_metadata().
+        bind_proxy (Dict[str, List[float]], optional): Bind proxy joint world
+            positions by joint name.
+
+    Returns:
+        dict: Recipe data.
+    """
+    metadata_by_node = dict(metadata_items)
+    module_graph = ModuleGraph()
+    module_graph.load_metadata(metadata_by_node.items())
+
+    asset_name = ""
+    for metanode, metadata in metadata_by_node.items():
+        module_config = create_module_config(metadata)
+        if module_config is None:
+            LOG.warning("Module '%s' has no known config type.", metanode)
+            continue
+        module_graph.get_node(metanode).module = module_config
+        if metadata.get("module_type") == ModuleType.ROOT.name:
+            asset_name = module_config.asset_name
+
+    return create_recipe(module_graph, asset_name, bind_proxy)
+
+
+def create_module_config(metadata: dict) -> module_metadata.ModuleConfig:
+    """Create the ModuleConfig matching a metadata dictionary's module type.
+
+    Returns:
+        module_metadata.ModuleConfig: Module config. None if the module type has no
+            config dataclass or the metadata doesn't match it.
+    """
+    config_type = module_metadata.MODULE_CONFIG_TYPES.get(metadata.get("module_type"))
+    if config_type is None:
+        return None
+
+    return module_metadata.convert_dict_to_dataclass(metadata, config_type)
+
+
+def load_module_graph(recipe: dict) -> ModuleGraph:
+    """Deserialize a recipe into a module graph with a ModuleConfig on each node.
+
+    Module hashes are recomputed from the recipe content, so hand edited recipes
+    rebuild correctly, and set as each config's build_hash.
+
+    Args:
+        recipe (dict): Recipe data.
+
+    Returns:
+        ModuleGraph: Module graph.
+    """
+    recipe = upgrade_recipe(recipe)
+    bind_proxy_hash = hash_bind_proxy(
+        recipe["bind_proxy"], recipe.get("bind_proportions")
+    )
+
+    module_graph = ModuleGraph()
+    recipe_modules = recipe["modules"]
+    for recipe_module in recipe_modules:
+        metadata = dict(
+            recipe_module.get("config", {}),
+            metanode=recipe_module["metanode"],
+            module_type=recipe_module["module_type"],
+            side=recipe_module.get("side", ModuleSide.CENTER.value),
+        )
+        module_config = create_module_config(metadata)
+        if module_config is None:
+            raise ValueError(
+                f"Recipe module '{recipe_module['metanode']}' has an unknown module "
+                f"type or config: {recipe_module['module_type']}"
+            )
+        module_config.build_hash = hash_recipe_module(recipe_module, bind_proxy_hash)
+        module_graph.add_module(
+            module_config.metanode,
+            module_config.module_type,
+            module_config.side,
+            module=module_config,
+        )
+
+    # Parents are listed first, but link after adding all modules in case they
+    # were reordered by hand
+    for recipe_module in recipe_modules:
+        parent_name = recipe_module.get("parent", "")
+        if parent_name and not module_graph.set_parent(
+            recipe_module["metanode"], parent_name
+        ):
+            raise ValueError(
+                f"Recipe module '{recipe_module['metanode']}' has an invalid parent: "
+                f"{parent_name}"
+            )
+
+    return module_graph
+
+
+def upgrade_recipe(recipe: dict) -> dict:
+    """Upgrade recipe data to the current format version.
+
+    Args:
+        recipe (dict): Recipe data.
+
+    Returns:
+        dict: Recipe data in the current format.
+    """
+    format_version = recipe.get("format_version")
+    if format_version == 1:
+        # Version 1 had no bind proxy positions or module hashes
+        recipe = dict(recipe, format_version=2, bind_proxy={})
+        format_version = 2
+
+    if format_version != RECIPE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported rig recipe format: {format_version}")
+
+    return recipe
+
+
+def save_recipe(recipe: dict, recipe_path: str) -> str:
+    """Save a recipe as JSON.
+
+    Returns:
+        str: Saved recipe path.
+    """
+    fut.create_directory(cpath.get_parent_directory(recipe_path, 0))
+    fut.write_json_data(recipe, recipe_path)
+    LOG.info("Saved rig recipe: %s", recipe_path)
+
+    return recipe_path
+
+
+def load_recipe(recipe_path: str) -> Dict:
+    """Load a saved recipe."""
+    recipe = fut.get_json_data(recipe_path)
+    if recipe is None:
+        raise ValueError(f"Rig recipe could not be read: {recipe_path}")
+
+    return recipe
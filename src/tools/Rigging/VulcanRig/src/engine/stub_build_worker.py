@@ -0,0 +1,385 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Stand-in rig build worker for testing batch builds without Maya.
+
+Runs the real build_engine command line against a stub maya package whose cmds
+holds an in-memory scene. Each registered module builder is swapped for a stub that
+creates the module's metanode, so module ordering, failure isolation, metadata
+writes, incremental rebuilds and results files all go through the engine itself.
+Saving writes the scene as JSON, and opening a saved stub scene loads it again, so
+--incremental rebuilds work on rigs saved by an earlier run. PySide6 is stubbed too
+if it isn't installed. Batch drivers run it with the system python to test job fan
+out, logs and failure isolation locally.
+
+Command line usage (from the src/tools directory):
+
+    python -m Rigging.VulcanRig.src.engine.stub_build_worker RECIPE
+        [build_engine arguments ...] [--fail-module METANODE ...]
+"""
+
+from __future__ import annotations
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+import types
+from typing import Callable, Dict, List
+
+from Core.util import file_util_tools as fut
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+# Maya modules the build engine imports, stubbed by install_stub_maya()
+STUB_MAYA_MODULES = ["maya.mel", "maya.api", "maya.api.OpenMaya", "maya.standalone"]
+# Qt modules the build engine imports, stubbed by install_stub_qt()
+STUB_QT_MODULES = [
+    "PySide6",
+    "PySide6.QtCore",
+    "PySide6.QtGui",
+    "PySide6.QtUiTools",
+    "PySide6.QtWidgets",
+]
+
+
+def _create_unsupported_call(call_name: str) -> Callable:
+    def unsupported_call(*_arguments, **_flags):
+        raise RuntimeError(f"{call_name} isn't supported in stub builds.")
+
+    return unsupported_call
+
+
+class StubNode:
+    """One node of the stub scene."""
+
+    def __init__(self, parent: str = "", node_type: str = "transform"):
+        self.parent = parent
+        self.node_type = node_type
+        self.locked = False
+        # Attribute values by attribute name
+        self.attributes: Dict[str, str] = {}
+
+
+class StubCmds(types.ModuleType):
+    """Minimal in-memory stand-in for the maya.cmds calls the build engine makes.
+
+    Any other cmds function raises RuntimeError when called, which the engine
+    reports as a failed module.
+    """
+
+    def __init__(self):
+        super().__init__("maya.cmds")
+        self.scene_path = ""
+        self.nodes: Dict[str, StubNode] = {}
+
+    def __getattr__(self, command_name: str) -> Callable:
+        if command_name.startswith("__"):
+            raise AttributeError(command_name)
+
+        return _create_unsupported_call(f"cmds.{command_name}")
+
+    def file(self, file_path: str = None, **flags) -> str:
+        """Open, rename or save the stub scene.
+
+        Opening a scene saved by the stub loads its nodes. Any other file opens as
+        an empty scene.
+        """
+        if flags.get("open"):
+            if not os.path.isfile(file_path):
+                raise RuntimeError(f"File not found: {file_path}")
+            self.nodes = self._read_scene(file_path)
+            self.scene_path = file_path
+        elif flags.get("rename"):
+            self.scene_path = flags["rename"]
+        elif flags.get("save"):
+            fut.write_json_data(
+                {
+                    "nodes": {
+                        node_name: {
+                            "parent": stub_node.parent,
+                            "type": stub_node.node_type,
+                            "locked": stub_node.locked,
+                            "attributes": stub_node.attributes,
+                        }
+                        for node_name, stub_node in self.nodes.items()
+                    }
+                },
+                self.scene_path,
+            )
+
+        return self.scene_path
+
+    @staticmethod
+    def _read_scene(file_path: str) -> Dict[str, StubNode]:
+        try:
+            scene_data = fut.get_json_data(file_path)
+        except ValueError:
+            # Not a stub scene, like a real Maya base file
+            return {}
+        if not isinstance(scene_data, dict):
+            return {}
+
+        scene_nodes = {}
+        for node_name, node_data in scene_data.get("nodes", {}).items():
+            stub_node = StubNode(node_data["parent"], node_data["type"])
+            stub_node.locked = node_data["locked"]
+            stub_node.attributes = node_data["attributes"]
+            scene_nodes[node_name] = stub_node
+
+        return scene_nodes
+
+    def group(
+        self, empty: bool = True, name: str = "null1", parent: str = "", **_flags
+    ) -> str:
+        """Create a node, numbering the name like Maya if it's taken."""
+        del empty
+        if parent and parent not in self.nodes:
+            raise RuntimeError(f"No object matches name: {parent}")
+
+        node_name = name
+        node_number = 1
+        while node_name in self.nodes:
+            node_name = f"{name}{node_number}"
+            node_number += 1
+        self.nodes[node_name] = StubNode(parent)
+
+        return node_name
+
+    def delete(self, node: str) -> None:
+        """Delete a node and the nodes under it."""
+        if self.nodes[node].locked:
+            raise RuntimeError(f"Cannot delete locked node '{node}'.")
+
+        for child_name in [
+            node_name
+            for node_name, stub_node in self.nodes.items()
+            if stub_node.parent == node
+        ]:
+            self.delete(child_name)
+        del self.nodes[node]
+
+    def ls(self, *patterns, type: str = None, long: bool = False, **_flags):
+        """List nodes by name, or nodes with an attribute for a "*.attribute" name.
+
+        Args:
+            patterns: Node names, lists of node names or "*.attribute" patterns.
+                Defaults to every node.
+            type (str, optional): Only list nodes of this type.
+            long (bool, optional): List full DAG paths.
+
+        Returns:
+            List[str]: Matching nodes.
+        """
+        # Named like maya.cmds flags pylint: disable=redefined-builtin
+        pattern_names = []
+        for pattern in patterns or ["*"]:
+            if isinstance(pattern, (list, tuple)):
+                pattern_names.extend(pattern)
+            else:
+                pattern_names.append(pattern)
+
+        node_names = []
+        for pattern in pattern_names:
+            if pattern == "*":
+                node_names.extend(self.nodes)
+            elif pattern.startswith("*."):
+                node_names.extend(
+                    node_name
+                    for node_name, stub_node in self.nodes.items()
+                    if pattern[2:] in stub_node.attributes
+                )
+            elif pattern.rsplit("|", 1)[-1] in self.nodes:
+                node_names.append(pattern.rsplit("|", 1)[-1])
+
+        return [
+            self._get_long_name(node_name) if long else node_name
+            for node_name in dict.fromkeys(node_names)
+            if type is None or self.nodes[node_name].node_type == type
+        ]
+
+    def _get_long_name(self, node: str) -> str:
+        long_name = f"|{node}"
+        parent_name = self.nodes[node].parent
+        while parent_name:
+            long_name = f"|{parent_name}{long_name}"
+            parent_name = self.nodes[parent_name].parent
+
+        return long_name
+
+    # Named like maya.cmds pylint: disable=invalid-name
+    def objExists(self, node: str) -> bool:
+        return node in self.nodes
+
+    def lockNode(self, node: str, lock: bool = True, **_flags) -> None:
+        self.nodes[node].locked = lock
+
+    def addAttr(self, node: str, longName: str = "", **_flags) -> None:
+        self.nodes[node].attributes[longName] = ""
+
+    def attributeQuery(
+        self, attribute_name: str, node: str = "", exists: bool = False
+    ) -> bool:
+        del exists
+        return attribute_name in self.nodes[node].attributes
+
+    def setAttr(self, plug: str, *values, **_flags) -> None:
+        node_name, attribute_name = plug.split(".", 1)
+        if values:
+            self.nodes[node_name].attributes[attribute_name] = values[0]
+
+    def getAttr(self, plug: str, **_flags) -> str:
+        node_name, attribute_name = plug.split(".", 1)
+        return self.nodes[node_name].attributes.get(attribute_name, "")
+
+
+class StubClassType(type):
+    """Metaclass of stub module classes, whose class attributes can't be called."""
+
+    def __getattr__(cls, attribute_name: str) -> Callable:
+        if attribute_name.startswith("__"):
+            raise AttributeError(attribute_name)
+
+        return _create_unsupported_call(f"{cls.__qualname__}.{attribute_name}")
+
+
+class StubObject(metaclass=StubClassType):
+    """Stand-in for an instance of a stub module class.
+
+    It can be created, like Qt objects created on import, but none of its methods
+    can be called.
+    """
+
+    def __init__(self, *_arguments, **_flags):
+        pass
+
+    def __getattr__(self, attribute_name: str) -> Callable:
+        if attribute_name.startswith("__"):
+            raise AttributeError(attribute_name)
+
+        return _create_unsupported_call(f"{type(self).__qualname__}.{attribute_name}")
+
+
+class StubModule(types.ModuleType):
+    """Stand-in for a Maya or Qt module the stub build never calls into.
+
+    Any attribute is a StubObject class, so imports, type checks, annotations and
+    subclassing against it still work. Calling into it raises RuntimeError, which
+    the engine reports as a failed module.
+    """
+
+    def __getattr__(self, attribute_name: str) -> type:
+        if attribute_name.startswith("__"):
+            raise AttributeError(attribute_name)
+
+        stub_class = StubClassType(
+            attribute_name,
+            (StubObject,),
+            {"__qualname__": f"{self.__name__}.{attribute_name}"},
+        )
+        # Cached so every lookup gets the same class
+        setattr(self, attribute_name, stub_class)
+
+        return stub_class
+
+
+def _install_stub_modules(module_names: List[str]) -> None:
+    for module_name in module_names:
+        stub_module = StubModule(module_name)
+        stub_module.__path__ = []
+        sys.modules[module_name] = stub_module
+        parent_name, _, attribute_name = module_name.rpartition(".")
+        if parent_name:
+            setattr(sys.modules[parent_name], attribute_name, stub_module)
+
+
+def install_stub_maya() -> StubCmds:
+    """Install a stub maya package for modules imported afterwards.
+
+    Returns:
+        StubCmds: The stub maya.cmds holding the in-memory scene.
+    """
+    stub_cmds = StubCmds()
+    maya_module = types.ModuleType("maya")
+    maya_module.__path__ = []
+    maya_module.cmds = stub_cmds
+    sys.modules["maya"] = maya_module
+    sys.modules["maya.cmds"] = stub_cmds
+    _install_stub_modules(STUB_MAYA_MODULES)
+
+    # build_engine.initialize_standalone() runs on startup
+    sys.modules["maya.standalone"].initialize = lambda **_flags: None
+
+    return stub_cmds
+
+
+def install_stub_qt() -> bool:
+    """Install a stub PySide6 package for modules imported afterwards.
+
+    Returns:
+        bool: True if installed. False if PySide6 is installed, which is used as is.
+    """
+    if importlib.util.find_spec("PySide6") is not None:
+        return False
+
+    _install_stub_modules(STUB_QT_MODULES)
+    return True
+
+
+def create_stub_module_builder(
+    stub_cmds: StubCmds, fail_modules: List[str] = None
+) -> Callable:
+    """Create a build function standing in for every module type's builder.
+
+    Args:
+        stub_cmds (StubCmds): Stub scene to build into.
+        fail_modules (List[str], optional): Metanodes to fail, for testing.
+
+    Returns:
+        Callable: Build function taking a module config and build method.
+    """
+    fail_modules = fail_modules or []
+
+    def build_stub_module(module_config, build_method):
+        del build_method
+        if module_config.metanode in fail_modules:
+            raise RuntimeError("Stub build failure.")
+
+        module_config.metanode = stub_cmds.group(
+            empty=True, name=module_config.metanode
+        )
+
+        return module_config
+
+    return build_stub_module
+
+
+def main(arguments: List[str] = None) -> int:
+    """Run the build engine command line interface with stub Maya and builders."""
+    parser = argparse.ArgumentParser(
+        description="Stand-in rig build worker. Other arguments go to build_engine."
+    )
+    parser.add_argument(
+        "--fail-module",
+        action="append",
+        default=[],
+        help="Metanode to fail building. Can be repeated.",
+    )
+    parsed_arguments, engine_arguments = parser.parse_known_args(arguments)
+    logging.basicConfig(level=logging.INFO)
+
+    stub_cmds = install_stub_maya()
+    install_stub_qt()
+    # Imported after the stub modules are installed
+    from . import build_engine  # pylint: disable=import-outside-toplevel
+
+    stub_module_builder = create_stub_module_builder(
+        stub_cmds, parsed_arguments.fail_module
+    )
+    # Only registered module types, so recipes the real engine can't build fail too
+    for module_type_name in list(build_engine.MODULE_BUILDERS):
+        build_engine.MODULE_BUILDERS[module_type_name] = stub_module_builder
+
+    return build_engine.main(engine_arguments)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -23,9 +23,10 @@ from Core.ui.UIUtilTools.src import pyside_util_tools as put
 from Core.ui.UIUtilTools.src import pyside_styling_util as pstyle
 from Core.util import maya_colors
 
-from . import gui_rig_modules, module_stack_util
+from . import gui_rig_modules
 from ..data.module_types import ModuleType
 from ..data import module_metadata
+from ..data.module_graph import ModuleGraph
 from ..data.node_affix_types import RigSideTypes
 
 from maya import cmds
@@ -49,9 +50,15 @@ LOG = logging.getLogger(os.path.basename(__file__))
 
 # Abstract Factories
 class StackFactory(ABC):
-    def __init__(self, stack_widget: QTreeWidget, details_panel: QVBoxLayout):
+    def __init__(
+        self,
+        stack_widget: QTreeWidget,
+        details_panel: QVBoxLayout,
+        module_graph: ModuleGraph,
+    ):
         self._stack_widget = stack_widget
         self._details_panel = details_panel
+        self._module_graph = module_graph
         self._item_height = 64
 
     @abstractmethod
@@ -78,25 +85,21 @@ class StackFactory(ABC):
         return new_item
 
     def _build_module_label(self, module_type: ModuleType):
-        new_module_label = f"{module_type.value['label']}_1"
+        # Only one Root module is allowed, so it is never numbered
         if module_type == ModuleType.ROOT:
-            new_module_label = module_type.value["label"]
+            return module_type.value["label"]
+
+        new_module_label = f"{module_type.value['label']}_1"
 
-        found_modules = module_stack_util.find_all_modules_of_type(
-            self._stack_widget, module_type, True
-        )
         # No modules found. Default to regular type name with _#
-        if len(found_modules) == 0:
+        if len(self._module_graph.get_modules_of_type(module_type.name)) == 0:
             return new_module_label
 
-        # Get list of module product labels
-        module_labels = [item.text(0) for item in found_modules]
-
         # Iterate name till the label doesn't exist in Stack
         i = 1
         while i < 100:
             if (
-                not f"{module_type.value['label']}_{i}" in module_labels
+                not f"{module_type.value['label']}_{i}" in self._module_graph
                 and not cmds.objExists(f"{module_type.value['label']}_{i}")
             ):
                 new_module_label = f"{module_type.value['label']}_{i}"
@@ -122,33 +125,23 @@ class GuiStackFactory(StackFactory):
     ):
         LOG.debug("Adding %s type Gui object to module stack...", module_type)
         # Must have a Root module to add a child to
-        if (
-            not module_type == ModuleType.ROOT
-            and len(
-                module_stack_util.find_all_modules_of_type(
-                    self._stack_widget, module_type.ROOT, True
-                )
-            )
-            == 0
-        ):
+        root_modules = self._module_graph.get_modules_of_type(ModuleType.ROOT.name)
+        if not module_type == ModuleType.ROOT and len(root_modules) == 0:
             LOG.warning("Must have a Root Module built first.")
             return None
 
-        # Only one Root module is allowed
+        # Only one Root module is allowed. A Root restored from the scene is already
+        # in the graph loaded from the scene's metadata.
         if (
             module_type == ModuleType.ROOT
-            and len(
-                module_stack_util.find_all_modules_of_type(
-                    self._stack_widget, ModuleType.ROOT, True
-                )
-            )
-            > 0
+            and item_metadata is None
+            and len(root_modules) > 0
         ):
             LOG.warning("Root Module already exists! Only one Root Module is allowed.")
             return None
 
         new_module_label = self._build_module_label(module_type)
-        if item_metadata is not None:
+        if item_metadata is not None and module_type != ModuleType.ROOT:
             new_module_label = item_metadata.metanode
 
         new_item = self._build_module_stack_gui(
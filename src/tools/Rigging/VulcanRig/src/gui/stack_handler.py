@@ -3,25 +3,22 @@
 # Can't find PySide2 modules pylint: disable=I1101
 
 from __future__ import annotations
-import ast
 import logging
 import os
 from typing import TYPE_CHECKING
 
-from maya import cmds
-
 # Import PySide modules
 from PySide6 import QtCore, QtGui
-from PySide6.QtWidgets import QMainWindow, QTreeWidget, QTreeWidgetItem
+from PySide6.QtWidgets import QFileDialog, QMainWindow, QTreeWidget, QTreeWidgetItem
 
 from Core import core_paths as cpath
 from Core.ui.UIUtilTools.src import pyside_util_tools as put
 
 from . import gui_factories
-from . import module_stack_util as msu
 from ..data import build_options, module_metadata
 from ..data.module_types import ModuleType
-from ..rig_modules import module_factory, module_product_factories
+from ..engine import rig_recipe
+from ..rig_modules import bind_proxy_module, module_factory, module_product_factories
 from ..util import vulcan_validations
 from ..util import metadata_utils
 
@@ -34,10 +31,12 @@ reload(gui_factories)
 reload(put)
 reload(build_options)
 reload(module_metadata)
-reload(msu)
 reload(module_factory)
 reload(module_product_factories)
 reload(vulcan_validations)
+reload(metadata_utils)
+reload(rig_recipe)
+reload(bind_proxy_module)
 
 # Current Module root path
 MODULE_PATH = f"{cpath.get_parent_directory(__file__, 2)}"
@@ -50,25 +49,27 @@ def initialize_scene(
 ) -> None:
 
     # Find the root module first
-    all_transforms = cmds.ls(type="transform")
-    root_meta_attribute = module_metadata.MetadataAttributes.MODULE_META_ATTRIBUTE.value
+    metanode_registry: metadata_utils.MetanodeRegistry = vulcan_window.metanode_registry
+    metanode_registry.scan()
+    vulcan_window.module_graph.load_metadata(metanode_registry.iter_metadata())
+    root_metanode = metanode_registry.get_root_metanode()
     root_module_data: module_metadata.RootConfig = None
-    for node in all_transforms:
-        if cmds.attributeQuery(root_meta_attribute, node=node, exists=True):
-            node_metadata = ast.literal_eval(
-                cmds.getAttr(f"{node}.{root_meta_attribute}")
-            )
-            root_module_data = module_metadata.convert_dict_to_dataclass(
-                node_metadata, module_metadata.RootConfig
-            )
-            break
+    if root_metanode is not None:
+        root_module_data = metanode_registry.get_config(
+            root_metanode, module_metadata.RootConfig
+        )
 
     if root_module_data is None:
         LOG.info("No Root Module metadata found in scene.")
         return
 
     # Found the root module, recreating the GUI elements in the stack
-    root_item = stack_factory.create_stack_module(ModuleType.ROOT)
+    root_item = stack_factory.create_stack_module(
+        ModuleType.ROOT, item_metadata=root_module_data
+    )
+    if root_item is None:
+        LOG.error("Root Module '%s' couldn't be added to the stack.", root_metanode)
+        return
 
     build_instructions = build_options.ModuleBuildOptions(
         build_method=build_options.ModuleBuildMethod.BUILD_PROXY,
@@ -89,7 +90,8 @@ def initialize_scene(
     LOG.warning("root module metadata: %s", root_module_data)
     LOG.warning("root module metadata type: %s", type(root_module_data))
 
-    generate_stack_children(vulcan_window, root_module)
+    with metanode_registry.batch():
+        generate_stack_children(vulcan_window, root_module)
 
 
 def generate_stack_children(
@@ -97,11 +99,14 @@ def generate_stack_children(
     parent_module: module_product_factories.ModuleProductFactory,
 ) -> None:
     LOG.info("Building Stack modules...")
-    meta_attribute = module_metadata.MetadataAttributes.MODULE_META_ATTRIBUTE.value
+    metanode_registry: metadata_utils.MetanodeRegistry = vulcan_window.metanode_registry
     parent_metadata = parent_module.get_metadata()
     for child_name in parent_metadata.child_metanodes:
         # Get Maya node metadata as dictionary
-        node_metadata = ast.literal_eval(cmds.getAttr(f"{child_name}.{meta_attribute}"))
+        node_metadata = metanode_registry.get_metadata(child_name)
+        if node_metadata is None:
+            LOG.warning("Child metanode '%s' not found in scene.", child_name)
+            continue
         # Match to the correct module type and generate module without building proxy
         # or Maya module. Just GUI and class objects.
         # TODO: Populate this match casing to include all other modules
@@ -109,8 +114,8 @@ def generate_stack_children(
         # type of module type and config to use?
         match node_metadata["module_type"]:
             case ModuleType.BIPED_SPINE.name:
-                module_config = module_metadata.convert_dict_to_dataclass(
-                    node_metadata, module_metadata.BipedSpineConfig
+                module_config = metanode_registry.get_config(
+                    child_name, module_metadata.BipedSpineConfig
                 )
                 # Metadata much match a known config data class
                 if module_config is None:
@@ -123,6 +128,9 @@ def generate_stack_children(
                     parent_module.get_stack_item(),
                     module_config,
                 )
+                if new_module is None:
+                    LOG.error("Module '%s' couldn't be added to the stack.", child_name)
+                    continue
                 parent_module.add_child(new_module)
                 # Generate top item's children recursively
                 generate_stack_children(vulcan_window, new_module)
@@ -148,9 +156,10 @@ def generate_module(
         vulcan_window.tree_stack.currentItem() is None
         and not module_type == ModuleType.ROOT
     ):
-        parent_item = msu.find_all_modules_of_type(
-            vulcan_window.tree_stack, ModuleType.ROOT
-        )[0]
+        module_graph = vulcan_window.module_graph
+        root_metanodes = module_graph.get_modules_of_type(ModuleType.ROOT.name)
+        if root_metanodes:
+            parent_item = module_graph.get_module(root_metanodes[0]).get_stack_item()
     else:
         parent_item = vulcan_window.tree_stack.currentItem()
 
@@ -201,3 +210,27 @@ def generate_module(
     LOG.debug("All current modules: %s", vulcan_window.current_modules)
 
     return new_module_object
+
+
+def export_rig_recipe(vulcan_window: VulcanRig, recipe_path: str = None) -> str:
+    """Save the scene's module stack as a rig recipe for headless builds.
+
+    Args:
+        vulcan_window (VulcanRig): Vulcan window.
+        recipe_path (str, optional): Path to save to. Asks the user if not given.
+
+    Returns:
+        str: Saved recipe path. None if cancelled.
+    """
+    if recipe_path is None:
+        recipe_path, _ = QFileDialog.getSaveFileName(
+            vulcan_window, "Export Rig Recipe", "", "Rig Recipe (*.json)"
+        )
+        if not recipe_path:
+            return None
+
+    recipe = rig_recipe.recipe_from_metadata(
+        vulcan_window.metanode_registry.iter_metadata(),
+        bind_proxy_module.get_bind_skeleton_positions(),
+    )
+    return rig_recipe.save_recipe(recipe, recipe_path)
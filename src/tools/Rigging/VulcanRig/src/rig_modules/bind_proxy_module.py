@@ -4,14 +4,21 @@
 from enum import Enum
 import logging
 import os
+import re
+from typing import Dict, List, Union
 
-from maya import cmds, mel
+from maya import cmds
 
 from Core import core_paths as cpath
 
 from ..data.bind_modules_positions import BindModulePositions
-from ..data.ue_skeleton_names import EpicBasicSkeleton, EpicCorrectiveJoints
-from ..util import vulcan_validations
+from ..data.bind_skeleton_table import (
+    BIND_MODULE_PARENTS,
+    PROXY_SUFFIX,
+    BindSkeletonTable,
+)
+from ..data.ue_skeleton_names import EpicBasicSkeleton
+from ..util import rig_builder, vulcan_validations
 
 from importlib import reload
 
@@ -23,27 +30,91 @@ MODULE_PATH = f"{cpath.get_parent_directory(__file__, 2)}"
 
 LOG = logging.getLogger(os.path.basename(__file__))
 
-HALF_BIND_SKELETON = (
-    f"{cpath.get_parent_directory(__file__, 1)}/data/half_bind_skeleton.fbx"
-)
+# Bind module chains of the proxy skeleton. The left side is mirrored on finalize.
+HALF_BIND_MODULES = [
+    bind_module
+    for bind_module in BIND_MODULE_PARENTS
+    if not bind_module.name.endswith("_L")
+]
 
 
 def create_unreal_bind_skeleton():
-    """Import right half of the unreal bind skeleton."""
+    """Create the right half of the unreal bind skeleton as proxy joints."""
     if vulcan_validations.does_bind_skeleton_exist():
         LOG.warning("Bind Proxy skeleton already exists in the scene!")
         return
 
-    cmds.file(
-        HALF_BIND_SKELETON,
-        i=True,
-        type="FBX",
-        ignoreVersion=True,
-        renameAll=True,
-        mergeNamespacesOnClash=False,
-        renamingPrefix="BPX",
-        options="fbx",
+    created_joints = apply_bind_skeleton_table(
+        BindSkeletonTable.from_bind_positions(PROXY_SUFFIX, HALF_BIND_MODULES)
+    )
+    # Orients the whole proxy hierarchy below the pelvis
+    orient_joint_chain(BindModulePositions.SPINE)
+    LOG.info("Created %s bind proxy joints.", len(created_joints))
+
+
+def get_bind_skeleton_positions() -> Dict[str, List[float]]:
+    """Get world positions of the bind skeleton joints in the scene.
+
+    Returns:
+        Dict[str, List[float]]: World position by joint name.
+    """
+    return {
+        joint.value: cmds.xform(
+            joint.value, query=True, worldSpace=True, translation=True
+        )
+        for joint in EpicBasicSkeleton
+        if cmds.objExists(joint.value)
+    }
+
+
+def refit_bind_skeleton(
+    joint_positions: Dict[str, List[float]] = None,
+    bind_proportions: dict = None,
+    use_api_builder: bool = False,
+) -> None:
+    """Re-fit the bind skeleton to new positions and proportions in one batch.
+
+    Joints are moved to their given world positions first. Joints below them that
+    aren't given a position move with their parent. The skeleton is then scaled
+    about the origin and its bones retargeted to the given proportions.
+
+    Args:
+        joint_positions (Dict[str, List[float]], optional): World position by joint
+            name. Defaults to keeping the current positions.
+        bind_proportions (dict, optional): "scale", a uniform or per axis factor,
+            and "bone_scales", a parent offset scale by joint name, like a recipe's
+            bind_proportions. Defaults to keeping the current proportions.
+        use_api_builder (bool, optional): Apply through OpenMaya modifiers in one
+            commit instead of maya.cmds. It can't be undone from Maya, so only use
+            it for headless builds. Defaults to False.
+    """
+    joint_positions = joint_positions or {}
+    bind_proportions = bind_proportions or {}
+    long_names = cmds.ls(
+        list(joint_positions) or [joint.value for joint in EpicBasicSkeleton],
+        type="joint",
+        long=True,
     )
+    if not long_names:
+        LOG.warning("No bind skeleton joints found to re-fit.")
+        return
+
+    # Read each hierarchy from its top joint, which reads the others below it
+    long_name_set = set(long_names)
+    root_joints = [
+        long_name
+        for long_name in long_names
+        if not any(
+            long_name[: match.start()] in long_name_set
+            for match in re.finditer(r"\|", long_name)
+        )
+    ]
+    bind_table = read_bind_skeleton_table(root_joints).move_joints(joint_positions)
+    if bind_proportions:
+        bind_table = bind_table.scale(bind_proportions.get("scale", 1.0)).retarget(
+            bind_proportions.get("bone_scales", {})
+        )
+    apply_bind_skeleton_table(bind_table, use_api_builder)
 
 
 def orient_joint_chain(module: BindModulePositions):
@@ -63,6 +134,116 @@ def orient_joint_chain(module: BindModulePositions):
     )
 
 
+def read_bind_skeleton_table(root_joint: Union[str, List[str]]) -> BindSkeletonTable:
+    """Read a joint hierarchy into a bind skeleton table with batched queries.
+
+    Args:
+        root_joint (Union[str, List[str]]): Root joint of the hierarchy, or root
+            joints of separate hierarchies.
+
+    Returns:
+        BindSkeletonTable: World positions and orientations of root_joint and every
+            joint below it.
+    """
+    # Listed depth first, so parents come before their children
+    long_names = cmds.ls(root_joint, dag=True, type="joint", long=True)
+    # Multiple object queries return every object's values in one flat list
+    positions = cmds.xform(long_names, query=True, worldSpace=True, translation=True)
+    orientations = cmds.xform(long_names, query=True, worldSpace=True, rotation=True)
+
+    long_name_set = set(long_names)
+    joints = []
+    for index, long_name in enumerate(long_names):
+        parent_long_name, joint_name = long_name.rsplit("|", 1)
+        joints.append(
+            (
+                joint_name,
+                (
+                    parent_long_name.rsplit("|", 1)[-1]
+                    if parent_long_name in long_name_set
+                    else ""
+                ),
+                positions[index * 3 : index * 3 + 3],
+            )
+        )
+
+    return BindSkeletonTable.from_joints(
+        joints,
+        [orientations[index * 3 : index * 3 + 3] for index in range(len(joints))],
+    )
+
+
+def get_parent_world_matrices(joint_names: List[str]) -> Dict[str, List[float]]:
+    """Get the world matrix of each joint's scene parent.
+
+    Args:
+        joint_names (List[str]): Joint names.
+
+    Returns:
+        Dict[str, List[float]]: Parent world matrix by joint name. Joints in world
+            are left out.
+    """
+    parent_matrices = {}
+    for joint_name in joint_names:
+        parent_names = cmds.listRelatives(joint_name, parent=True, fullPath=True)
+        if parent_names:
+            parent_matrices[joint_name] = cmds.xform(
+                parent_names[0], query=True, worldSpace=True, matrix=True
+            )
+
+    return parent_matrices
+
+
+def apply_bind_skeleton_table(
+    bind_table: BindSkeletonTable, use_api_builder: bool = False
+) -> List[str]:
+    """Match scene joints to a bind skeleton table in one batch.
+
+    Existing joints get their translation and joint orient set with zeroed
+    rotations. Root joints under a non-joint parent, like a group, are set relative
+    to it. Missing joints are created under their parents.
+
+    Args:
+        bind_table (BindSkeletonTable): Skeleton table.
+        use_api_builder (bool, optional): Apply through OpenMaya modifiers in one
+            commit instead of maya.cmds. It can't be undone from Maya, so only use
+            it for headless builds. Defaults to False.
+
+    Returns:
+        List[str]: Created joints.
+    """
+    existing_joints = set(cmds.ls(bind_table.names, type="joint"))
+    local_translations, local_orientations = bind_table.get_local_transforms(
+        get_parent_world_matrices(
+            [
+                joint_name
+                for joint_name in existing_joints
+                if not bind_table.get_parent_name(joint_name)
+            ]
+        )
+    )
+
+    created_joints = []
+    with rig_builder.get_rig_builder(use_api_builder) as builder:
+        for index, joint_name in enumerate(bind_table.names):
+            translation = local_translations[index].tolist()
+            joint_orient = local_orientations[index].tolist()
+            if joint_name in existing_joints:
+                builder.set_attr(f"{joint_name}.translate", translation)
+                builder.set_attr(f"{joint_name}.rotate", [0.0, 0.0, 0.0])
+                builder.set_attr(f"{joint_name}.jointOrient", joint_orient)
+            else:
+                builder.create_joint(
+                    joint_name,
+                    bind_table.get_parent_name(joint_name) or None,
+                    translation,
+                    joint_orient,
+                )
+                created_joints.append(joint_name)
+
+    return [builder.get_name(joint_name) for joint_name in created_joints]
+
+
 def finalize_bind_skeleton():
     """Mirror proxy Bind skeleton."""
     if not cmds.objExists(f"{EpicBasicSkeleton.PELVIS.value}_BPX"):
@@ -73,23 +254,17 @@ def finalize_bind_skeleton():
         )
         return
 
-    cmds.select(f"{EpicBasicSkeleton.PELVIS.value}_BPX", replace=True)
-    # Remove BPX suffix
-    mel.eval('searchReplaceNames "_BPX" " " hierarchy')
-
-    # Mirror Joints
-    cmds.select(
-        BindModulePositions.LEG_R.value[0]["name"].replace("_BPX", ""), replace=True
+    proxy_table = read_bind_skeleton_table(
+        f"{EpicBasicSkeleton.PELVIS.value}{PROXY_SUFFIX}"
     )
-    cmds.mirrorJoint(mirrorYZ=True, mirrorBehavior=True, searchReplace=["_r", "_l"])
 
-    cmds.select(
-        BindModulePositions.ARM_R.value[0]["name"].replace("_BPX", ""), replace=True
-    )
-    cmds.mirrorJoint(mirrorYZ=True, mirrorBehavior=True, searchReplace=["_r", "_l"])
+    # Remove BPX suffix
+    with rig_builder.get_rig_builder() as builder:
+        for joint_name in proxy_table.names:
+            builder.rename_node(joint_name, joint_name.replace(PROXY_SUFFIX, ""))
 
-    # Mirror last lone joints
-    cmds.select(EpicCorrectiveJoints.CLAVICLE_PEC_R.value, replace=True)
-    cmds.mirrorJoint(mirrorYZ=True, mirrorBehavior=True, searchReplace=["_r", "_l"])
-    cmds.select(EpicCorrectiveJoints.SPINE_04_LATISSIMUS_R.value, replace=True)
-    cmds.mirrorJoint(mirrorYZ=True, mirrorBehavior=True, searchReplace=["_r", "_l"])
+    # Mirror right side joints to the left side
+    created_joints = apply_bind_skeleton_table(
+        proxy_table.rename(PROXY_SUFFIX, "").mirror("_r", "_l", "YZ", True)
+    )
+    LOG.info("Mirrored %s bind skeleton joints.", len(created_joints))
@@ -59,21 +59,59 @@ MODULE_PATH = f"{cpath.get_parent_directory(__file__, 2)}"
 LOG = logging.getLogger(os.path.basename(__file__))
 
 
+def build_spine_proxy(
+    spine_config: module_metadata.BipedSpineConfig,
+) -> module_metadata.BipedSpineConfig:
+    """Create the spine module's top node under the Root modules group.
+
+    Args:
+        spine_config (module_metadata.BipedSpineConfig): Spine module metadata.
+
+    Returns:
+        module_metadata.BipedSpineConfig: Spine metadata with the created metanode.
+            Not yet written to the metanode.
+    """
+    spine_config.metanode = cmds.group(
+        empty=True,
+        name=spine_config.module_name,
+        parent=module_metadata.RootOrganizeNodes.MODULES_GRP.value,
+    )
+    spine_config.module_type = ModuleType.BIPED_SPINE.name
+
+    return spine_config
+
+
+def get_spine_joints(spine_config: module_metadata.BipedSpineConfig):
+    """Get the spine's start and end bind joints, defaulting to the Epic skeleton.
+
+    Returns:
+        tuple: (start joint, end joint)
+    """
+    return (
+        spine_config.start_joint or EpicBasicSkeleton.SPINE_01.value,
+        spine_config.end_joint or EpicBasicSkeleton.SPINE_05.value,
+    )
+
+
 def create_kinematic_chain(start_joint: str, end_joint: str, is_ik: bool = True):
     """Create a new Kinematic chain, either IK or FK."""
     suffix = "IK_JNT"
     if not is_ik:
         suffix = "FK_JNT"
-    new_joint_chain = []
-    for chain_joint in vutil.duplicate_joint_chain(start_joint, end_joint):
-        new_joint_name = f"{chain_joint.split('_dup')[0]}_{suffix}"
-        new_joint_chain.append(cmds.rename(chain_joint, new_joint_name))
 
-    return new_joint_chain
+    return vutil.duplicate_joint_chain(start_joint, end_joint, suffix)
 
 
-def generate_spine_module(start_joint: str, end_joint: str):
-    """Creates the spine module control rig."""
+def generate_spine_module(start_joint: str, end_joint: str, module_group: str = None):
+    """Creates the spine module control rig.
+
+    Args:
+        start_joint (str): First spine bind joint.
+        end_joint (str): Last spine bind joint.
+        module_group (str, optional): Spine module metanode to build the kinematic
+            chains and controls under, so tearing down the module removes them.
+            Defaults to the world.
+    """
     controller_factory = control_factory.ControlFactory()
     #################################################################################
     # Get start and end joint from UI
@@ -81,11 +119,12 @@ def generate_spine_module(start_joint: str, end_joint: str):
     # end_joint = lineEndJnt.text()
     #################################################################################
 
-    # Duplicate joint chain from start to end joint twice; rename one to IK and the other to FK
-    # Duplicate arm hierarchy for IK joints and rename
-    ik_chain = create_kinematic_chain(start_joint, end_joint)
-    # Duplicate arm hierarchy for FK joints and rename
-    fk_chain = create_kinematic_chain(start_joint, end_joint, False)
+    # Duplicate joint chain from start to end joint as IK and FK chains
+    kinematic_chains = vutil.duplicate_joint_chains(
+        start_joint, end_joint, ["IK_JNT", "FK_JNT"], parent=module_group
+    )
+    ik_chain = kinematic_chains["IK_JNT"]
+    fk_chain = kinematic_chains["FK_JNT"]
     #################################################################################
     # Create root controller with offset
     root_ctrl = controller_factory.create_controller(
@@ -95,6 +134,8 @@ def generate_spine_module(start_joint: str, end_joint: str):
     root_ctrl_offset = controller_factory.create_offset_group(
         root_ctrl.split("_CTL")[0], fk_chain[0], match_rotation=False
     )
+    if module_group:
+        root_ctrl_offset = cmds.parent(root_ctrl_offset, module_group)[0]
     cmds.parent(root_ctrl, root_ctrl_offset)
     animation_utils.reset_transforms(root_ctrl, rotation=True)
     cmds.setAttr(f"{root_ctrl}.scale", 2.1, 2.1, 2.1, type="double3")
@@ -18,7 +18,6 @@ from . import biped_spine_build
 
 from .. import module_product_factories
 
-from Rigging.VulcanRig.src.data.ue_skeleton_names import EpicBasicSkeleton
 from Rigging.VulcanRig.src.data import module_metadata, build_options
 from Rigging.VulcanRig.src.data.module_types import ModuleType
 from Rigging.VulcanRig.src.util import vulcan_utils as vutil
@@ -92,12 +91,7 @@ class BipedSpineModule(module_product_factories.ModuleProductFactory):
         cmds.undoInfo(chunkName="ProxyBipedSpineModule_chunk", openChunk=True)
         LOG.warning("BUILD SPINE PROXY!")
         # Create Maya top module node
-        metadata = self.get_metadata()
-        cmds.group(
-            empty=True,
-            name=metadata.module_name,
-            parent=module_metadata.RootOrganizeNodes.MODULES_GRP.value,
-        )
+        metadata = biped_spine_build.build_spine_proxy(self.get_metadata())
 
         parent_metadata = self._vulcan_window.current_modules[
             self._parent_item
@@ -110,7 +104,7 @@ class BipedSpineModule(module_product_factories.ModuleProductFactory):
         self.set_metadata(
             module_metadata.BipedSpineConfig(
                 module_name=metadata.module_name,
-                metanode=metadata.module_name,
+                metanode=metadata.metanode,
                 parent_metanode=parent_metanode,
                 module_type=ModuleType.BIPED_SPINE.name,
             )
@@ -187,8 +181,15 @@ class BipedSpineModule(module_product_factories.ModuleProductFactory):
 
     def generate_spine(self):
         """Build the actual Maya rig system."""
+        # Store the picked joints so recipe builds use the same ones
+        metadata = self.get_metadata()
+        metadata.start_joint = self.txt_start_joint.text()
+        metadata.end_joint = self.txt_end_joint.text()
+        self.set_metadata(metadata)
+
         biped_spine_build.generate_spine_module(
-            self.txt_start_joint.text(), self.txt_end_joint.text()
+            *biped_spine_build.get_spine_joints(metadata),
+            module_group=metadata.metanode,
         )
 
     def set_details_panel_defaults(self):
@@ -199,7 +200,8 @@ class BipedSpineModule(module_product_factories.ModuleProductFactory):
         self.txt_start_joint.setPlaceholderText(joints_placeholder_text)
         self.txt_end_joint.setPlaceholderText(joints_placeholder_text)
 
-        if cmds.objExists(EpicBasicSkeleton.SPINE_01.value):
-            self.txt_start_joint.setText(EpicBasicSkeleton.SPINE_01.value)
-        if cmds.objExists(EpicBasicSkeleton.SPINE_05.value):
-            self.txt_end_joint.setText(EpicBasicSkeleton.SPINE_05.value)
+        start_joint, end_joint = biped_spine_build.get_spine_joints(self.get_metadata())
+        if cmds.objExists(start_joint):
+            self.txt_start_joint.setText(start_joint)
+        if cmds.objExists(end_joint):
+            self.txt_end_joint.setText(end_joint)
@@ -3,7 +3,6 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-import ast
 from dataclasses import asdict
 import logging
 import os
@@ -13,7 +12,7 @@ from PySide6.QtWidgets import QMainWindow, QTreeWidgetItem
 
 from maya import cmds
 
-from ..data.module_metadata import MetadataAttributes, ModuleConfig
+from ..data.module_metadata import ModuleConfig
 from ..data.module_types import ModuleType
 
 from Core.ui.UIUtilTools.src import pyside_util_tools as put
@@ -44,8 +43,6 @@ class ModuleProductFactory(ABC):
         self._stack_item: QTreeWidgetItem
         self._parent_item: QTreeWidgetItem
         self._parent_module: ModuleProductFactory
-        self._child_items: List[QTreeWidgetItem] = []
-        self._child_modules: List[ModuleProductFactory] = []
 
         self._module_config_type: ModuleConfig
         self._is_root_module: bool = False
@@ -67,7 +64,7 @@ class ModuleProductFactory(ABC):
 
     def get_children_names(self) -> List[str]:
         """Get Module's child metanode names."""
-        return self.get_metadata().child_metanodes
+        return self._vulcan_window.module_graph.get_children(self._metadata.metanode)
 
     def get_children_items(self) -> List[QTreeWidgetItem]:
         """Get Module's child Tree items."""
@@ -75,38 +72,33 @@ class ModuleProductFactory(ABC):
 
     def get_children_modules(self) -> List[ModuleProductFactory]:
         """Get Module's child module objects."""
-        return self._child_modules
+        module_graph = self._vulcan_window.module_graph
+        child_modules = [
+            module_graph.get_module(child_name)
+            for child_name in module_graph.get_children(self._metadata.metanode)
+        ]
+        return [child_module for child_module in child_modules if child_module]
 
     def add_child(self, child_module: ModuleProductFactory) -> None:
-        """Add Child metanode name to Parent's metadata children."""
-        # metadata = self.get_metadata()
-        if not child_module.get_metadata().metanode in self._metadata.child_metanodes:
-            self._metadata.child_metanodes.append(child_module.get_metadata().metanode)
-            self.set_metadata(self._metadata)
-
-        # Add Module to this module's child modules
-        if not child_module in self._child_modules:
-            self._child_modules.append(child_module)
+        """Add Child module in the module graph and Parent's metadata children."""
+        module_graph = self._vulcan_window.module_graph
+        child_name = child_module.get_metadata().metanode
+        if module_graph.has_child(self._metadata.metanode, child_name):
+            return
 
-        # Add Module stack item to this module's child items
-        if not child_module.get_stack_item() in self._child_items:
-            self._child_items.append(child_module.get_stack_item())
+        module_graph.set_parent(child_name, self._metadata.metanode)
+        self._update_child_metanodes()
 
-    # def remove_child(self, child_name: str) -> bool:
     def remove_child(self, child_module: ModuleProductFactory) -> bool:
-        """Remove the child name from the metadata's list of children metanodes."""
-        # metadata = self.get_metadata()
+        """Remove the child from the module graph and metadata's children metanodes."""
+        module_graph = self._vulcan_window.module_graph
         child_name = child_module.get_metadata().metanode
-        if child_name not in self._metadata.child_metanodes:
-            LOG.debug("Child '%s' doesn't exist in metadata.", child_name)
+        if not module_graph.has_child(self._metadata.metanode, child_name):
+            LOG.debug("Child '%s' doesn't exist in module graph.", child_name)
             return False
 
-        self._metadata.child_metanodes.remove(child_module.get_metadata().metanode)
-        self.set_metadata(self._metadata)
-
-        # Remove child item and module objects
-        self._child_items.remove(child_module.get_stack_item())
-        self._child_modules.remove(child_module)
+        module_graph.detach(child_name)
+        self._update_child_metanodes()
 
         return True
 
@@ -120,13 +112,9 @@ class ModuleProductFactory(ABC):
 
     def get_metanode_metadata(self) -> ModuleConfig:
         """Get the metanode's metadata."""
-        metadata_dict = ast.literal_eval(
-            cmds.getAttr(
-                f"{self._metadata.metanode}."
-                f"{MetadataAttributes.MODULE_META_ATTRIBUTE.value}"
-            )
+        return self._vulcan_window.metanode_registry.get_config(
+            self._metadata.metanode, self._module_config_type
         )
-        return self._module_config_type(**metadata_dict)
 
     def set_metadata(self, new_metadata: ModuleConfig) -> None:
         """Set the module's metadata.
@@ -138,6 +126,7 @@ class ModuleProductFactory(ABC):
             new_metadata (ModuleConfig): New metadata to update to.
         """
         self._metadata = new_metadata
+        self._update_module_graph()
         self._update_metanode_metadata(new_metadata)
 
     def get_metadata(self) -> ModuleConfig:
@@ -172,15 +161,20 @@ class ModuleProductFactory(ABC):
         # Unloack and Rename Maya node
         cmds.lockNode(modified_metadata.metanode, lock=False)
         cmds.rename(modified_metadata.metanode, new_name)
-        # Update module's metadata
-        modified_metadata.module_name = new_name
-        modified_metadata.metanode = new_name
-        self.set_metadata(modified_metadata)
-
-        # Update Parent's child name
-        self.get_parent_module().update_child_name(new_name, old_name)
-        # Update Children's parent name
-        self.update_children_parent(new_name)
+        metanode_registry = self._vulcan_window.metanode_registry
+        metanode_registry.unregister(old_name)
+        self._vulcan_window.module_graph.rename_module(old_name, new_name)
+        # Write each changed metanode once after all metadata is updated
+        with metanode_registry.batch():
+            # Update module's metadata
+            modified_metadata.module_name = new_name
+            modified_metadata.metanode = new_name
+            self.set_metadata(modified_metadata)
+
+            # Update Parent's child name
+            self.get_parent_module().update_child_name()
+            # Update Children's parent name
+            self.update_children_parent(new_name)
 
         # Lock nodes
         cmds.lockNode(new_name)
@@ -190,18 +184,21 @@ class ModuleProductFactory(ABC):
     def delete_module(self) -> None:
         """Delete this module and all associated Maya nodes."""
         cmds.lockNode(self._metadata.metanode, lock=False)
-        # Remove child name from Parent's children list
-        # self._parent_module.remove_child(self._metadata.metanode)
-        self._parent_module.remove_child(self)
-        # Set the children's parent name in metadata
-        for child_module in self._child_modules:
-            child_module.set_parent_metanode(self._parent_module)
-            self._parent_module.add_child(child_module)
+        child_modules = self.get_children_modules()
+        with self._vulcan_window.metanode_registry.batch():
+            # Remove module from graph, moving its children to the Parent
+            self._vulcan_window.module_graph.remove_module(self._metadata.metanode)
+            # pylint: disable-next=protected-access
+            self._parent_module._update_child_metanodes()
+            # Set the children's parent name in metadata
+            for child_module in child_modules:
+                child_module.set_parent_metanode(self._parent_module)
 
         # Move all children items to the removed item's parent first
         put.move_children_to_parent(self._parent_item, self._stack_item)
         # Delete Maya Node
         cmds.delete(self._metadata.metanode)
+        self._vulcan_window.metanode_registry.unregister(self._metadata.metanode)
         # Remove module item and module object
         put.remove_tree_item(self._stack_item.treeWidget(), self._stack_item)
         del self
@@ -230,58 +227,42 @@ class ModuleProductFactory(ABC):
         """Set the parent module class object."""
         self._parent_module = new_parent_module
 
-    def update_child_name(self, new_name: str, old_name: str) -> None:
-        """Update child name in metadata only."""
-        modified_metadata = self.get_metadata()
-        modified_metadata.child_metanodes = [
-            new_name if item == old_name else item
-            for item in modified_metadata.child_metanodes
-        ]
-
-        self.set_metadata(modified_metadata)
+    def update_child_name(self) -> None:
+        """Update child names in metadata from the already renamed module graph."""
+        self._update_child_metanodes()
 
     def update_children_parent(self, new_parent: str) -> None:
         """Update all Chilren module's metadata Parent Metanode name."""
-        if len(put.get_tree_item_children(self._stack_item)) == 0:
-            LOG.debug("No Child items found.")
+        child_modules = self.get_children_modules()
+        if len(child_modules) == 0:
+            LOG.debug("No Child modules found.")
             return
 
-        for child_item in put.get_tree_item_children(self._stack_item):
-            child_module = self._vulcan_window.current_modules[child_item]
-            child_module_metadata = child_module.get_metadata()
-            child_module_metadata.parent_metanode = new_parent
-            child_module.set_metadata(child_module_metadata)
+        with self._vulcan_window.metanode_registry.batch():
+            for child_module in child_modules:
+                child_module_metadata = child_module.get_metadata()
+                child_module_metadata.parent_metanode = new_parent
+                child_module.set_metadata(child_module_metadata)
 
-    def _update_metanode_metadata(self, new_metadata: ModuleConfig) -> bool:
-        """Set the Module's metadata on module's designated node."""
-        metanode_object = self._metadata.metanode
-        if not cmds.objExists(metanode_object):
-            LOG.error("Module's metadata node could not be found!")
-            return False
+    def _update_child_metanodes(self) -> None:
+        """Set metadata children metanodes from the module graph."""
+        self._metadata.child_metanodes = self.get_children_names()
+        self.set_metadata(self._metadata)
 
-        if not cmds.attributeQuery(
-            MetadataAttributes.MODULE_META_ATTRIBUTE.value,
-            node=self._metadata.metanode,
-            exists=True,
-        ):
-            cmds.addAttr(
-                metanode_object,
-                longName=MetadataAttributes.MODULE_META_ATTRIBUTE.value,
-                dataType="string",
-            )
-
-        # Unlock and Set the new metadata and relock
-        cmds.lockNode(metanode_object, lock=False)
-        cmds.setAttr(
-            f"{metanode_object}.{MetadataAttributes.MODULE_META_ATTRIBUTE.value}",
-            lock=False,
-        )
-        cmds.setAttr(
-            f"{metanode_object}.{MetadataAttributes.MODULE_META_ATTRIBUTE.value}",
-            str(asdict(new_metadata)),
-            type="string",
-            lock=True,
+    def _update_module_graph(self) -> None:
+        """Add this module to the module graph, or update its type and side."""
+        if not self._metadata.metanode:
+            return
+
+        self._vulcan_window.module_graph.add_module(
+            self._metadata.metanode,
+            self._metadata.module_type,
+            self._metadata.side,
+            module=self,
         )
-        cmds.lockNode(metanode_object)
 
-        return True
+    def _update_metanode_metadata(self, new_metadata: ModuleConfig) -> bool:
+        """Set the Module's metadata on module's designated node."""
+        return self._vulcan_window.metanode_registry.write_metadata(
+            self._metadata.metanode, asdict(new_metadata)
+        )
@@ -0,0 +1,110 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Root Rig Module build instructions."""
+
+import logging
+import os
+
+from maya import cmds
+
+from Core.util import maya_colors
+
+from ..controls.control_factory import ControlFactory
+from ..data import module_metadata
+from ..data.build_options import ControllerBuildOptions
+from ..data.module_types import ModuleType
+from ..data.ue_skeleton_names import EpicBasicSkeleton
+from ..util import rig_builder
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+
+def build_root_module(
+    asset_name: str = "", use_api_builder: bool = False
+) -> module_metadata.RootConfig:
+    """Create Root nodes and starting proxy joint hierarchy.
+
+    Args:
+        asset_name (str, optional): Asset name to store in the Root metadata.
+        use_api_builder (bool, optional): Create the groups and joints with one
+            batched OpenMaya modifier instead of maya.cmds. It can't be undone from
+            Maya, so only use it for headless builds. Defaults to False.
+
+    Returns:
+        module_metadata.RootConfig: Root module metadata. Not yet written to the
+            Root metanode.
+    """
+    with rig_builder.get_rig_builder(use_api_builder) as builder:
+        top_group = builder.create_node(
+            "transform", module_metadata.RootOrganizeNodes.DEFAULT_TOP_NODE.value
+        )
+        joints_group = builder.create_node(
+            "transform", module_metadata.RootOrganizeNodes.JOINTS_GRP.value, top_group
+        )
+        controls_group = builder.create_node(
+            "transform",
+            module_metadata.RootOrganizeNodes.CONTROLS_GRP.value,
+            top_group,
+        )
+        guts_group = builder.create_node(
+            "transform", module_metadata.RootOrganizeNodes.GUTS_GRP.value, top_group
+        )
+        modules_group = builder.create_node(
+            "transform",
+            module_metadata.RootOrganizeNodes.MODULES_GRP.value,
+            top_group,
+        )
+
+        # Setup root proxy joints
+        root_joint = builder.create_joint("root", joints_group)
+        builder.create_joint("interaction", root_joint)
+        builder.create_joint("center_of_mass", root_joint)
+
+        # Parent existing bind skeleton pelvis to root
+        builder.set_parent(EpicBasicSkeleton.PELVIS.value, root_joint)
+
+    root_groups = [
+        builder.get_name(root_group)
+        for root_group in [
+            top_group,
+            joints_group,
+            controls_group,
+            guts_group,
+            modules_group,
+        ]
+    ]
+
+    # Create controllers
+    control_factory = ControlFactory()
+    # Create orient controller
+    orient_ctl = control_factory.create_controller(
+        ControllerBuildOptions(
+            "orient", "Orient", parent_node=builder.get_name(controls_group)
+        )
+    )
+    # World offset
+    offset_ctl = control_factory.create_controller(
+        ControllerBuildOptions("circle", "WorldOffset", parent_node=orient_ctl)
+    )
+    cmds.setAttr(f"{offset_ctl}.sx", 5)
+    cmds.setAttr(f"{offset_ctl}.sy", 5)
+    cmds.setAttr(f"{offset_ctl}.sz", 5)
+    cmds.select(offset_ctl, replace=True)
+    cmds.makeIdentity(apply=True, translate=True, rotate=True, scale=True, normal=False)
+    # Path Follow offset
+    path_follow_ctl = control_factory.create_controller(
+        ControllerBuildOptions("chevron", "PathFollow", parent_node=offset_ctl)
+    )
+
+    # Change color controller
+    maya_colors.set_draw_override_color(orient_ctl, "yellow")
+    maya_colors.set_draw_override_color(offset_ctl, "yellow")
+    maya_colors.set_draw_override_color(path_follow_ctl, "purple")
+
+    # Lock all group nodes to prevent renaming or reparenting
+    cmds.lockNode(root_groups)
+
+    return module_metadata.RootConfig(
+        metanode=builder.get_name(top_group),
+        module_type=ModuleType.ROOT.name,
+        asset_name=asset_name,
+    )
@@ -27,12 +27,8 @@ from Core import core_paths as cpath
 from Core.ui.UIUtilTools.src import pyside_util_tools as put
 from Core.util import maya_colors
 
-from . import module_product_factories
+from . import module_product_factories, root_build
 from ..data import module_metadata
-from ..data.build_options import ControllerBuildOptions
-from ..data.module_types import ModuleType
-from ..data.ue_skeleton_names import EpicBasicSkeleton
-from ..controls.control_factory import ControlFactory
 from ..util import vulcan_validations
 
 if TYPE_CHECKING:
@@ -41,6 +37,7 @@ if TYPE_CHECKING:
 from importlib import reload
 
 reload(module_product_factories)
+reload(root_build)
 reload(maya_colors)
 reload(vulcan_validations)
 reload(module_metadata)
@@ -75,80 +72,8 @@ class RootModule(module_product_factories.ModuleProductFactory):
         LOG.info("Building Root module...")
         cmds.undoInfo(chunkName="BuildRootModule_chunk", openChunk=True)
 
-        top_group = cmds.group(
-            empty=True, name=module_metadata.RootOrganizeNodes.DEFAULT_TOP_NODE.value
-        )
-
-        joints_group = cmds.group(
-            empty=True,
-            name=module_metadata.RootOrganizeNodes.JOINTS_GRP.value,
-            parent=top_group,
-        )
-        controls_group = cmds.group(
-            empty=True,
-            name=module_metadata.RootOrganizeNodes.CONTROLS_GRP.value,
-            parent=top_group,
-        )
-        guts_group = cmds.group(
-            empty=True,
-            name=module_metadata.RootOrganizeNodes.GUTS_GRP.value,
-            parent=top_group,
-        )
-        modules_group = cmds.group(
-            empty=True,
-            name=module_metadata.RootOrganizeNodes.MODULES_GRP.value,
-            parent=top_group,
-        )
-
-        # Create controllers
-        control_factory = ControlFactory()
-        # Create orient controller
-        orient_ctl = control_factory.create_controller(
-            ControllerBuildOptions("orient", "Orient", parent_node=controls_group)
-        )
-        # World offset
-        offset_ctl = control_factory.create_controller(
-            ControllerBuildOptions("circle", "WorldOffset", parent_node=orient_ctl)
-        )
-        cmds.setAttr(f"{offset_ctl}.sx", 5)
-        cmds.setAttr(f"{offset_ctl}.sy", 5)
-        cmds.setAttr(f"{offset_ctl}.sz", 5)
-        cmds.select(offset_ctl, replace=True)
-        cmds.makeIdentity(
-            apply=True, translate=True, rotate=True, scale=True, normal=False
-        )
-        # Path Follow offset
-        path_follow_ctl = control_factory.create_controller(
-            ControllerBuildOptions("chevron", "PathFollow", parent_node=offset_ctl)
-        )
-
-        # Change color controller
-        maya_colors.set_draw_override_color(orient_ctl, "yellow")
-        maya_colors.set_draw_override_color(offset_ctl, "yellow")
-        maya_colors.set_draw_override_color(path_follow_ctl, "purple")
-
-        # Setup root proxy joints
-        cmds.select(clear=True)
-        root_joint = cmds.joint(name="root", position=[0, 0, 0])
-        cmds.joint(name="interaction", position=[0, 0, 0])
-        cmds.select(root_joint, replace=True)
-        cmds.joint(name="center_of_mass", position=[0, 0, 0])
-        cmds.parent(root_joint, joints_group)
-
-        # Parent existing bind skeleton pelvis to root
-        cmds.parent(EpicBasicSkeleton.PELVIS.value, root_joint)
-
         # Update metadata config
-        self.set_metadata(
-            module_metadata.RootConfig(
-                metanode=module_metadata.RootOrganizeNodes.DEFAULT_TOP_NODE.value,
-                module_type=ModuleType.ROOT.name,
-            )
-        )
-        # Lock all group nodes to prevent renaming or reparenting
-        cmds.lockNode(
-            [top_group, joints_group, controls_group, guts_group, modules_group]
-        )
+        self.set_metadata(root_build.build_root_module())
 
         cmds.undoInfo(chunkName="BuildRootModule_chunk", closeChunk=True)
 
@@ -2,10 +2,12 @@
 """Various Vulcan metadata utility functions."""
 
 from __future__ import annotations
+from contextlib import contextmanager
+import copy
 from dataclasses import dataclass, field
 import logging
 import os
-from typing import TYPE_CHECKING
+from typing import Dict, Iterator, List, Tuple, Type, TYPE_CHECKING
 
 from PySide6.QtWidgets import QTreeWidgetItem
 
@@ -13,11 +15,13 @@ from maya import cmds
 
 from Core import core_paths as cpath
 
+from ..data import module_metadata
+from ..data.module_metadata import MetadataAttributes, ModuleConfig
+from ..data.module_types import ModuleType
 from ..rig_modules.module_product_factories import ModuleProductFactory
 
 # from . import gui_factories
 # from ..rig_modules import module_factory
-# from ..data.module_types import ModuleType
 
 if TYPE_CHECKING:
     from ..vulcan_rig import VulcanRig
@@ -28,3 +32,314 @@ from importlib import reload
 MODULE_PATH = f"{cpath.get_parent_directory(__file__, 2)}"
 
 LOG = logging.getLogger(os.path.basename(__file__))
+
+META_ATTRIBUTE = MetadataAttributes.MODULE_META_ATTRIBUTE.value
+
+
+_METANODE_REGISTRY = None
+
+
+@dataclass
+class MetanodeEntry:
+    """Decoded metadata of one metanode."""
+
+    metadata: dict
+    # Attribute string last read from or written to the node
+    encoded: str = ""
+    # Metadata changed in memory but not yet written to the node
+    dirty: bool = False
+
+
+def write_metanode_metadata(metanode: str, metadata_string: str) -> bool:
+    """Write a metadata string to a metanode's locked metadata attribute.
+
+    Args:
+        metanode (str): Metanode name.
+        metadata_string (str): Encoded metadata.
+
+    Returns:
+        bool: True if written, False if the metanode doesn't exist.
+    """
+    if not cmds.objExists(metanode):
+        LOG.error("Module's metadata node '%s' could not be found!", metanode)
+        return False
+
+    # Unlock and Set the new metadata and relock
+    cmds.lockNode(metanode, lock=False)
+    if not cmds.attributeQuery(META_ATTRIBUTE, node=metanode, exists=True):
+        cmds.addAttr(metanode, longName=META_ATTRIBUTE, dataType="string")
+    cmds.setAttr(f"{metanode}.{META_ATTRIBUTE}", lock=False)
+    cmds.setAttr(
+        f"{metanode}.{META_ATTRIBUTE}", metadata_string, type="string", lock=True
+    )
+    cmds.lockNode(metanode)
+
+    return True
+
+
+class MetanodeRegistry:
+    """Scene metanodes indexed by node name and module type.
+
+    The scene is queried once with a single attribute pattern instead of checking
+    every transform. Each node's metadata is decoded once and cached with the
+    attribute string it came from, so rescanning only decodes nodes whose string
+    changed. Lookups by name or module type are dictionary lookups afterwards.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, MetanodeEntry] = {}
+        self._nodes_by_type: Dict[str, List[str]] = {}
+        self._batch_depth = 0
+
+    def scan(self) -> int:
+        """Rebuild the registry from all metanodes in the scene.
+
+        Returns:
+            int: Number of metanodes found.
+        """
+        cached_entries = self._entries
+        self.clear()
+        metanodes = (
+            cmds.ls(f"*.{META_ATTRIBUTE}", objectsOnly=True, recursive=True) or []
+        )
+        for metanode in metanodes:
+            cached_entry = cached_entries.get(metanode)
+            if cached_entry is not None and cached_entry.dirty:
+                # Keep changes not yet written to the node
+                self._add_entry(metanode, cached_entry)
+                continue
+
+            metadata_string = cmds.getAttr(f"{metanode}.{META_ATTRIBUTE}")
+            if cached_entry is not None and cached_entry.encoded == metadata_string:
+                self._add_entry(metanode, cached_entry)
+                continue
+
+            metadata = module_metadata.decode_metadata(metadata_string)
+            if metadata is None:
+                LOG.warning("Skipping metanode with invalid metadata: %s", metanode)
+                continue
+            self._add_entry(metanode, MetanodeEntry(metadata, metadata_string))
+
+        LOG.debug("Found %s metanode(s) in scene.", len(self._entries))
+
+        return len(self._entries)
+
+    def load(self, metanode: str) -> bool:
+        """Read and decode one metanode's metadata from the scene.
+
+        Args:
+            metanode (str): Metanode name.
+
+        Returns:
+            bool: True if the metanode has valid metadata.
+        """
+        if not cmds.objExists(metanode) or not cmds.attributeQuery(
+            META_ATTRIBUTE, node=metanode, exists=True
+        ):
+            return False
+
+        metadata_string = cmds.getAttr(f"{metanode}.{META_ATTRIBUTE}")
+        metadata = module_metadata.decode_metadata(metadata_string)
+        if metadata is None:
+            return False
+
+        self._add_entry(metanode, MetanodeEntry(metadata, metadata_string))
+
+        return True
+
+    def clear(self) -> None:
+        """Remove all registered metanodes."""
+        self._entries = {}
+        self._nodes_by_type = {}
+
+    def _add_entry(self, metanode: str, metanode_entry: MetanodeEntry) -> None:
+        self.unregister(metanode)
+        self._entries[metanode] = metanode_entry
+        self._nodes_by_type.setdefault(
+            metanode_entry.metadata.get("module_type", ""), []
+        ).append(metanode)
+
+    def set_metadata(self, metanode: str, metadata: dict) -> None:
+        """Change a metanode's metadata in memory and mark it for writing.
+
+        Args:
+            metanode (str): Metanode name.
+            metadata (dict): New metadata dictionary.
+        """
+        cached_entry = self._entries.get(metanode)
+        encoded = cached_entry.encoded if cached_entry is not None else ""
+        self._add_entry(metanode, MetanodeEntry(metadata, encoded, dirty=True))
+
+    def write_metadata(self, metanode: str, metadata: dict) -> bool:
+        """Change a metanode's metadata and write it, or defer it inside a batch.
+
+        Args:
+            metanode (str): Metanode name.
+            metadata (dict): New metadata dictionary.
+
+        Returns:
+            bool: False if the metanode doesn't exist in the scene anymore.
+        """
+        self.set_metadata(metanode, metadata)
+        if self._batch_depth == 0:
+            self.flush([metanode])
+
+        return metanode in self._entries
+
+    @contextmanager
+    def batch(self):
+        """Defer metadata writes until the outermost batch ends.
+
+        Modules can change their metadata many times during one operation, like a
+        rename or delete touching every child. Inside a batch each change only
+        updates memory, and every changed metanode is written once at the end.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                written_count = self.flush()
+                LOG.debug("Wrote metadata of %s metanode(s).", written_count)
+
+    def is_dirty(self, metanode: str) -> bool:
+        """Check if a metanode has changes not yet written to the scene."""
+        metanode_entry = self._entries.get(metanode)
+        return metanode_entry is not None and metanode_entry.dirty
+
+    def flush(self, metanodes: List[str] = None) -> int:
+        """Write changed metadata to the scene.
+
+        Args:
+            metanodes (List[str], optional): Metanodes to write.
+                Defaults to all changed metanodes.
+
+        Returns:
+            int: Number of metanodes written.
+        """
+        if metanodes is None:
+            metanodes = list(self._entries)
+
+        written_count = 0
+        for metanode in metanodes:
+            metanode_entry = self._entries.get(metanode)
+            if metanode_entry is None or not metanode_entry.dirty:
+                continue
+
+            metadata_string = module_metadata.encode_metadata(metanode_entry.metadata)
+            if metadata_string != metanode_entry.encoded:
+                if not write_metanode_metadata(metanode, metadata_string):
+                    self.unregister(metanode)
+                    continue
+                written_count += 1
+
+            metanode_entry.encoded = metadata_string
+            metanode_entry.dirty = False
+
+        return written_count
+
+    def unregister(self, metanode: str) -> None:
+        """Remove a metanode from the registry.
+
+        Args:
+            metanode (str): Metanode name.
+        """
+        metanode_entry = self._entries.pop(metanode, None)
+        if metanode_entry is None:
+            return
+
+        type_nodes = self._nodes_by_type.get(
+            metanode_entry.metadata.get("module_type", ""), []
+        )
+        if metanode in type_nodes:
+            type_nodes.remove(metanode)
+
+    def get_metadata(self, metanode: str) -> dict:
+        """Get a copy of a metanode's metadata dictionary.
+
+        Args:
+            metanode (str): Metanode name.
+
+        Returns:
+            dict: Metadata dictionary. None if the metanode isn't registered.
+        """
+        metanode_entry = self._entries.get(metanode)
+        if metanode_entry is None:
+            return None
+
+        return copy.deepcopy(metanode_entry.metadata)
+
+    def iter_metadata(self) -> Iterator[Tuple[str, dict]]:
+        """Iterate registered metanodes and their metadata.
+
+        The dictionaries are the cached ones and must not be modified.
+
+        Yields:
+            Tuple[str, dict]: Metanode name and metadata dictionary.
+        """
+        for metanode, metanode_entry in self._entries.items():
+            yield metanode, metanode_entry.metadata
+
+    def get_config(
+        self, metanode: str, config_type: Type[ModuleConfig]
+    ) -> ModuleConfig:
+        """Get a metanode's metadata as a module config.
+
+        Metanodes not registered yet are read from the scene.
+
+        Args:
+            metanode (str): Metanode name.
+            config_type (Type[ModuleConfig]): Module config dataclass to create.
+
+        Returns:
+            ModuleConfig: Module config. None if the metanode has no metadata of
+                that config type.
+        """
+        if metanode not in self._entries and not self.load(metanode):
+            return None
+
+        return module_metadata.convert_dict_to_dataclass(
+            self.get_metadata(metanode), config_type
+        )
+
+    def get_metanodes_of_type(self, module_type: ModuleType) -> List[str]:
+        """Get all metanodes of a module type.
+
+        Args:
+            module_type (ModuleType): Module type to look for.
+
+        Returns:
+            List[str]: Metanode names.
+        """
+        return list(self._nodes_by_type.get(module_type.name, []))
+
+    def get_root_metanode(self) -> str:
+        """Get the Root module's metanode. None if there's no Root module."""
+        root_metanodes = self._nodes_by_type.get(ModuleType.ROOT.name)
+        if not root_metanodes:
+            return None
+
+        if len(root_metanodes) > 1:
+            LOG.warning(
+                "Multiple Root metanodes found, using '%s': %s",
+                root_metanodes[0],
+                root_metanodes,
+            )
+
+        return root_metanodes[0]
+
+    def __contains__(self, metanode: str) -> bool:
+        return metanode in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def get_metanode_registry() -> MetanodeRegistry:
+    """Get the metanode registry shared for the Maya session."""
+    global _METANODE_REGISTRY  # pylint: disable=global-statement
+    if _METANODE_REGISTRY is None:
+        _METANODE_REGISTRY = MetanodeRegistry()
+
+    return _METANODE_REGISTRY
@@ -0,0 +1,453 @@
+# Copyright (C) 2024 Robert Wiese - All Rights Reserved.
+"""Rig construction builders.
+
+Builders create nodes, parent them, add and set attributes and connect plugs
+through one small API, so rig modules can pick how the work reaches Maya:
+
+- CmdsRigBuilder runs each call immediately through maya.cmds.
+- ApiRigBuilder queues each call on OpenMaya 2.0 DG/DAG modifiers and runs them all
+  in one doIt() on commit. It skips the string command round trip per attribute,
+  so bulk construction is much faster. Modifier changes made outside an MPxCommand
+  aren't recorded on Maya's undo queue, so it's only for headless builds.
+
+Modules opt in by creating nodes through a builder and committing it once done:
+
+    with rig_builder.get_rig_builder() as builder:
+        group = builder.create_node("transform", "C_spine_GRP")
+        builder.set_attr(f"{group}.visibility", False)
+
+Nodes are referred to by the name they were created with until the builder is
+committed. Use get_name() for the node's final name in the scene afterwards, since
+Maya may number names that were taken.
+"""
+
+from abc import ABC, abstractmethod
+import logging
+import os
+import re
+from typing import Any, Dict, Sequence, Tuple
+
+from maya import cmds
+
+import maya.api.OpenMaya as om
+
+LOG = logging.getLogger(os.path.basename(__file__))
+
+# Attribute types add_attr() supports
+ATTRIBUTE_TYPES = ("double", "long", "bool", "string", "matrix", "message")
+
+PLUG_INDEX_REGEX = re.compile(r"^(\w+)\[(\d+)\]$")
+
+# Whether a node type is a DAG node, by node type
+_DAG_NODE_TYPES: Dict[str, bool] = {}
+
+
+def is_dag_node_type(node_type: str) -> bool:
+    """Check if a node type is a DAG node type. Cached per type."""
+    if node_type not in _DAG_NODE_TYPES:
+        _DAG_NODE_TYPES[node_type] = "dagNode" in (
+            cmds.nodeType(node_type, inherited=True, isTypeName=True) or []
+        )
+
+    return _DAG_NODE_TYPES[node_type]
+
+
+# Abstract Builder
+class RigBuilder(ABC):
+    """Rig construction builder."""
+
+    @abstractmethod
+    def create_node(self, node_type: str, name: str, parent: str = None) -> str:
+        """Create a node.
+
+        Args:
+            node_type (str): Maya node type i.e. transform, joint, multMatrix.
+            name (str): Node name.
+            parent (str, optional): Parent of a DAG node. Defaults to world.
+
+        Returns:
+            str: Name to refer to the node by in this builder.
+        """
+        raise NotImplementedError("You should implement this method")
+
+    @abstractmethod
+    def set_parent(self, node: str, parent: str = None) -> None:
+        """Parent a DAG node, keeping its local transform. No parent for world."""
+        raise NotImplementedError("You should implement this method")
+
+    @abstractmethod
+    def rename_node(self, node: str, new_name: str) -> None:
+        """Rename a node. Keep referring to it by its old name in this builder."""
+        raise NotImplementedError("You should implement this method")
+
+    @abstractmethod
+    def add_attr(
+        self,
+        node: str,
+        long_name: str,
+        attribute_type: str = "double",
+        default_value: Any = None,
+        keyable: bool = True,
+    ) -> str:
+        """Add a dynamic attribute.
+
+        Args:
+            node (str): Node name.
+            long_name (str): Attribute name.
+            attribute_type (str, optional): One of ATTRIBUTE_TYPES.
+                Defaults to double.
+            default_value (Any, optional): Default value of numeric attributes.
+            keyable (bool, optional): Show in the channel box. Defaults to True.
+
+        Returns:
+            str: Attribute plug name.
+        """
+        raise NotImplementedError("You should implement this method")
+
+    @abstractmethod
+    def set_attr(self, plug: str, value: Any) -> None:
+        """Set a plug value in UI units like cmds.setAttr.
+
+        Values can be a bool, int, float or str, a sequence of values for compound
+        plugs like translate, or 16 floats for matrix plugs.
+        """
+        raise NotImplementedError("You should implement this method")
+
+    @abstractmethod
+    def connect_attr(self, source_plug: str, destination_plug: str) -> None:
+        """Connect two plugs, replacing the destination's existing connection."""
+        raise NotImplementedError("You should implement this method")
+
+    @abstractmethod
+    def commit(self) -> None:
+        """Apply every queued change to the scene."""
+        raise NotImplementedError("You should implement this method")
+
+    @abstractmethod
+    def get_name(self, node: str) -> str:
+        """Get a created node's name in the scene after committing."""
+        raise NotImplementedError("You should implement this method")
+
+    def create_joint(
+        self,
+        name: str,
+        parent: str = None,
+        translation: Sequence[float] = None,
+        joint_orient: Sequence[float] = None,
+    ) -> str:
+        """Create a joint.
+
+        Args:
+            name (str): Joint name.
+            parent (str, optional): Parent node. Defaults to world.
+            translation (Sequence[float], optional): Translation relative to parent.
+            joint_orient (Sequence[float], optional): Joint orient in degrees.
+
+        Returns:
+            str: Name to refer to the joint by in this builder.
+        """
+        new_joint = self.create_node("joint", name, parent)
+        if translation is not None:
+            self.set_attr(f"{new_joint}.translate", translation)
+        if joint_orient is not None:
+            self.set_attr(f"{new_joint}.jointOrient", joint_orient)
+
+        return new_joint
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        if exception_type is None:
+            self.commit()
+
+
+# Concrete Builders
+class CmdsRigBuilder(RigBuilder):
+    """Builder running each call immediately through maya.cmds."""
+
+    def __init__(self):
+        # Scene names of nodes created or renamed, by builder name
+        self._node_names: Dict[str, str] = {}
+
+    def _get_node(self, node: str) -> str:
+        return self._node_names.get(node, node)
+
+    def _get_plug(self, plug: str) -> str:
+        node, attribute_path = plug.split(".", 1)
+        return f"{self._get_node(node)}.{attribute_path}"
+
+    def create_node(self, node_type: str, name: str, parent: str = None) -> str:
+        flags = {"name": name, "skipSelect": True}
+        if parent:
+            flags["parent"] = self._get_node(parent)
+        self._node_names[name] = cmds.createNode(node_type, **flags)
+
+        return name
+
+    def set_parent(self, node: str, parent: str = None) -> None:
+        if parent:
+            cmds.parent(self._get_node(node), self._get_node(parent), relative=True)
+        else:
+            cmds.parent(self._get_node(node), world=True, relative=True)
+
+    def rename_node(self, node: str, new_name: str) -> None:
+        self._node_names[node] = cmds.rename(self._get_node(node), new_name)
+
+    def add_attr(
+        self,
+        node: str,
+        long_name: str,
+        attribute_type: str = "double",
+        default_value: Any = None,
+        keyable: bool = True,
+    ) -> str:
+        flags = {"longName": long_name}
+        if attribute_type in ("string", "matrix"):
+            flags["dataType"] = attribute_type
+        else:
+            flags["attributeType"] = attribute_type
+            flags["keyable"] = keyable
+        if default_value is not None:
+            flags["defaultValue"] = default_value
+        cmds.addAttr(self._get_node(node), **flags)
+
+        return f"{node}.{long_name}"
+
+    def set_attr(self, plug: str, value: Any) -> None:
+        plug = self._get_plug(plug)
+        if isinstance(value, str):
+            cmds.setAttr(plug, value, type="string")
+        elif isinstance(value, (list, tuple, om.MMatrix)) and len(value) == 16:
+            cmds.setAttr(plug, *value, type="matrix")
+        elif isinstance(value, (list, tuple, om.MVector)):
+            cmds.setAttr(plug, *value)
+        else:
+            cmds.setAttr(plug, value)
+
+    def connect_attr(self, source_plug: str, destination_plug: str) -> None:
+        cmds.connectAttr(
+            self._get_plug(source_plug), self._get_plug(destination_plug), force=True
+        )
+
+    def commit(self) -> None:
+        pass
+
+    def get_name(self, node: str) -> str:
+        return self._get_node(node)
+
+
+class ApiRigBuilder(RigBuilder):
+    """Builder queueing calls on OpenMaya modifiers, run in one doIt()."""
+
+    def __init__(self):
+        # DG nodes are created first so the DAG modifier can connect to them
+        self._dg_modifier = om.MDGModifier()
+        self._dag_modifier = om.MDagModifier()
+        self._created_nodes: Dict[str, om.MObject] = {}
+        self._added_attributes: Dict[Tuple[str, str], om.MObject] = {}
+        self._committed = False
+
+    def _get_node(self, node: str) -> om.MObject:
+        node_object = self._created_nodes.get(node)
+        if node_object is not None:
+            return node_object
+
+        selection_list = om.MSelectionList()
+        selection_list.add(node)
+
+        return selection_list.getDependNode(0)
+
+    def _get_plug(self, plug: str) -> om.MPlug:
+        node, attribute_path = plug.split(".", 1)
+        node_object = self._get_node(node)
+
+        found_plug = None
+        for attribute_name in attribute_path.split("."):
+            plug_index = None
+            index_match = PLUG_INDEX_REGEX.match(attribute_name)
+            if index_match:
+                attribute_name, plug_index = index_match.group(1), index_match.group(2)
+
+            added_attribute = self._added_attributes.get((node, attribute_name))
+            if added_attribute is not None:
+                found_plug = om.MPlug(node_object, added_attribute)
+            else:
+                found_plug = om.MFnDependencyNode(node_object).findPlug(
+                    attribute_name, False
+                )
+            if plug_index is not None:
+                found_plug = found_plug.elementByLogicalIndex(int(plug_index))
+
+        return found_plug
+
+    def _check_not_committed(self) -> None:
+        if self._committed:
+            raise RuntimeError("Rig builder was already committed.")
+
+    def create_node(self, node_type: str, name: str, parent: str = None) -> str:
+        self._check_not_committed()
+        if is_dag_node_type(node_type):
+            node_object = self._dag_modifier.createNode(
+                node_type, self._get_node(parent) if parent else om.MObject.kNullObj
+            )
+        else:
+            node_object = self._dg_modifier.createNode(node_type)
+        self._dag_modifier.renameNode(node_object, name)
+        self._created_nodes[name] = node_object
+
+        return name
+
+    def set_parent(self, node: str, parent: str = None) -> None:
+        self._check_not_committed()
+        self._dag_modifier.reparentNode(
+            self._get_node(node),
+            self._get_node(parent) if parent else om.MObject.kNullObj,
+        )
+
+    def rename_node(self, node: str, new_name: str) -> None:
+        self._check_not_committed()
+        node_object = self._get_node(node)
+        self._dag_modifier.renameNode(node_object, new_name)
+        self._created_nodes[node] = node_object
+
+    def add_attr(
+        self,
+        node: str,
+        long_name: str,
+        attribute_type: str = "double",
+        default_value: Any = None,
+        keyable: bool = True,
+    ) -> str:
+        self._check_not_committed()
+        numeric_types = {
+            "double": om.MFnNumericData.kDouble,
+            "long": om.MFnNumericData.kInt,
+            "bool": om.MFnNumericData.kBoolean,
+        }
+        if attribute_type in numeric_types:
+            attribute_fn = om.MFnNumericAttribute()
+            attribute_object = attribute_fn.create(
+                long_name,
+                long_name,
+                numeric_types[attribute_type],
+                default_value if default_value is not None else 0,
+            )
+            attribute_fn.keyable = keyable
+        elif attribute_type == "string":
+            attribute_object = om.MFnTypedAttribute().create(
+                long_name, long_name, om.MFnData.kString
+            )
+        elif attribute_type == "matrix":
+            attribute_object = om.MFnMatrixAttribute().create(long_name, long_name)
+        elif attribute_type == "message":
+            attribute_object = om.MFnMessageAttribute().create(long_name, long_name)
+        else:
+            raise ValueError(f"Unsupported attribute type: {attribute_type}")
+
+        self._dag_modifier.addAttribute(self._get_node(node), attribute_object)
+        self._added_attributes[(node, long_name)] = attribute_object
+
+        return f"{node}.{long_name}"
+
+    def set_attr(self, plug: str, value: Any) -> None:
+        self._check_not_committed()
+        self._set_plug_value(self._get_plug(plug), value)
+
+    def _set_plug_value(self, plug: om.MPlug, value: Any) -> None:
+        if isinstance(value, str):
+            self._dag_modifier.newPlugValueString(plug, value)
+        elif isinstance(value, (list, tuple, om.MMatrix)) and len(value) == 16:
+            self._dag_modifier.newPlugValue(
+                plug, om.MFnMatrixData().create(om.MMatrix(list(value)))
+            )
+        elif isinstance(value, (list, tuple, om.MVector)):
+            for child_index, child_value in enumerate(value):
+                self._set_plug_value(plug.child(child_index), child_value)
+        elif isinstance(value, bool):
+            self._dag_modifier.newPlugValueBool(plug, value)
+        elif isinstance(value, int) and self._is_integer_plug(plug):
+            self._dag_modifier.newPlugValueInt(plug, value)
+        else:
+            self._set_plug_double(plug, float(value))
+
+    @staticmethod
+    def _is_integer_plug(plug: om.MPlug) -> bool:
+        plug_attribute = plug.attribute()
+        if plug_attribute.hasFn(om.MFn.kEnumAttribute):
+            return True
+
+        return plug_attribute.hasFn(
+            om.MFn.kNumericAttribute
+        ) and om.MFnNumericAttribute(plug_attribute).numericType() in (
+            om.MFnNumericData.kInt,
+            om.MFnNumericData.kShort,
+            om.MFnNumericData.kByte,
+            om.MFnNumericData.kChar,
+        )
+
+    def _set_plug_double(self, plug: om.MPlug, value: float) -> None:
+        # Convert from UI units like cmds.setAttr does
+        if plug.attribute().hasFn(om.MFn.kUnitAttribute):
+            unit_type = om.MFnUnitAttribute(plug.attribute()).unitType()
+            if unit_type == om.MFnUnitAttribute.kAngle:
+                self._dag_modifier.newPlugValueMAngle(
+                    plug, om.MAngle(value, om.MAngle.uiUnit())
+                )
+                return
+            if unit_type == om.MFnUnitAttribute.kDistance:
+                self._dag_modifier.newPlugValueMDistance(
+                    plug, om.MDistance(value, om.MDistance.uiUnit())
+                )
+                return
+
+        self._dag_modifier.newPlugValueDouble(plug, value)
+
+    def connect_attr(self, source_plug: str, destination_plug: str) -> None:
+        self._check_not_committed()
+        destination = self._get_plug(destination_plug)
+        existing_source = destination.source()
+        if not existing_source.isNull:
+            self._dag_modifier.disconnect(existing_source, destination)
+        self._dag_modifier.connect(self._get_plug(source_plug), destination)
+
+    def commit(self) -> None:
+        self._check_not_committed()
+        self._dg_modifier.doIt()
+        self._dag_modifier.doIt()
+        self._committed = True
+
+    def undo(self) -> None:
+        """Undo a committed builder's changes."""
+        if not self._committed:
+            return
+
+        self._dag_modifier.undoIt()
+        self._dg_modifier.undoIt()
+        self._committed = False
+
+    def get_name(self, node: str) -> str:
+        node_object = self._created_nodes.get(node)
+        if node_object is None:
+            return node
+        if node_object.hasFn(om.MFn.kDagNode):
+            return om.MFnDagNode(node_object).partialPathName()
+
+        return om.MFnDependencyNode(node_object).name()
+
+
+def get_rig_builder(use_api: bool = False) -> RigBuilder:
+    """Get a new rig builder.
+
+    Args:
+        use_api (bool, optional): Batch changes with OpenMaya modifiers instead of
+            running maya.cmds per call. The changes can't be undone from Maya, so
+            only use it for headless builds. Defaults to False.
+
+    Returns:
+        RigBuilder: New rig builder.
+    """
+    if use_api:
+        return ApiRigBuilder()
+
+    return CmdsRigBuilder()
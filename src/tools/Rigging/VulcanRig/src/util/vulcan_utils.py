@@ -3,8 +3,9 @@
 
 import logging
 import os
+from typing import Dict, List
 
-from maya import cmds
+from maya import cmds, mel
 
 from Core import core_paths as cpath
 
@@ -22,62 +23,82 @@ LOG = logging.getLogger(os.path.basename(__file__))
 
 def duplicate_joint_chain(start_joint: str, end_joint: str, suffix: str = "dup"):
     """Duplicates joint hierarchy given the start and end joints in chain."""
-    # Check to delete twist joints if desired
-    # if not include_twist_joints:
-    #     joint_children = cmds.listRelatives(start_joint, allDescendents=True)
-    #     for child in joint_children:
-    #         if "twist" in child or "Twist" in child:
-    #             cmds.delete(child)
-
-    # # Pickwalk down starting from the start_joint until it reaches the end joint,
-    # # storing each joint in a list on the way
-    # i = 0
-    # newJnts = [start_joint]
-    # cmds.select(start_joint, replace=True)
-    # while i < 99:
-    #     # Pick walk and store each new joint down hierarchy
-    #     curJnt = cmds.pickWalk(direction="down")[0]
-    #     if end_joint in curJnt:
-    #         # If the end_joint is equal to the current joint during pick walking, append to list and break loop
-    #         newJnts.append(curJnt)
-    #         break
-    #     else:
-    #         newJnts.append(curJnt)
-    #     i += 1
-
-    # Duplicate new joint list hierarchy
-    joint_hierarchy = get_nodes_to_child(start_joint, end_joint)
-    duplicate_joints = cmds.duplicate(
-        joint_hierarchy, parentOnly=True, renameChildren=True
-    )
-    # Parent to world space
-    cmds.parent(duplicate_joints[0], world=True)
+    return duplicate_joint_chains(start_joint, end_joint, [suffix])[suffix]
 
-    i = 0
-    new_joints = []
-    for chain_joint in duplicate_joints:
-        new_joints.append(cmds.rename(chain_joint, f"{joint_hierarchy[i]}_{suffix}"))
-        i += 1
 
-    return new_joints
+def duplicate_joint_chains(
+    start_joint: str, end_joint: str, suffixes: List[str], parent: str = None
+) -> Dict[str, List[str]]:
+    """Duplicate a joint chain once per suffix, i.e. IK, FK and driver chains.
 
+    Joints are named <joint>_<suffix>. Names are computed before duplicating and
+    every joint is renamed once, in a single batched rename, so building several
+    chains takes a few commands instead of a few per joint.
 
-def get_nodes_to_child(start_node: str, end_node: str, reverse: bool = False):
-    """Get all nodes in between (inclusive) the start and end nodes in a hierarchy.
+    Args:
+        start_joint (str): First joint in the chain.
+        end_joint (str): Last joint in the chain.
+        suffixes (List[str]): Suffix of each new chain.
+        parent (str, optional): Node to parent the chains under.
+            Defaults to world.
 
-    Note that the descending parameter inverts how this function operates. By default,
-    it is expecting to
+    Returns:
+        Dict[str, List[str]]: New joint names from start to end by suffix.
     """
-    start_node_dag_path = cmds.ls(start_node, long=True)[0].split("|")
-    end_node_dag_path = cmds.ls(end_node, long=True)[0].split("|")
+    joint_hierarchy = get_nodes_to_child(start_joint, end_joint)
+    chain_names = {
+        suffix: [f"{chain_joint}_{suffix}" for chain_joint in joint_hierarchy]
+        for suffix in suffixes
+    }
+
+    # Duplicates get unique short names, so they can be renamed in any order
+    duplicate_chains = [
+        cmds.duplicate(joint_hierarchy, parentOnly=True, renameChildren=True)
+        for _ in suffixes
+    ]
+    chain_roots = [duplicate_joints[0] for duplicate_joints in duplicate_chains]
+    if parent:
+        chain_roots = cmds.parent(chain_roots, parent)
+    else:
+        chain_roots = cmds.parent(chain_roots, world=True)
+    for duplicate_joints, chain_root in zip(duplicate_chains, chain_roots):
+        duplicate_joints[0] = chain_root
+
+    # Maya numbers names that are taken, so rename those one by one to get them
+    taken_names = set(
+        cmds.ls([name for names in chain_names.values() for name in names]) or []
+    )
+    rename_commands = []
+    for suffix, duplicate_joints in zip(suffixes, duplicate_chains):
+        for joint_index, duplicate_joint in enumerate(duplicate_joints):
+            new_name = chain_names[suffix][joint_index]
+            if new_name in taken_names:
+                LOG.warning("Joint name '%s' already exists.", new_name)
+                chain_names[suffix][joint_index] = cmds.rename(
+                    duplicate_joint, new_name
+                )
+            else:
+                rename_commands.append(f'rename "{duplicate_joint}" "{new_name}";')
+    if rename_commands:
+        mel.eval("".join(rename_commands))
+
+    return chain_names
 
-    higher_node_index = start_node_dag_path.index(start_node)
-    lower_node_dag_path = end_node_dag_path
-    if len(end_node_dag_path) < len(start_node_dag_path):
-        higher_node_index = end_node_dag_path.index(end_node)
-        lower_node_dag_path = start_node_dag_path
 
-    all_nodes = list(lower_node_dag_path[higher_node_index:])
+def get_nodes_to_child(start_node: str, end_node: str, reverse: bool = False):
+    """Get all nodes in between (inclusive) the start and end nodes in a hierarchy.
+
+    The start and end nodes can be given in either order. Nodes are returned from
+    the higher node down, or sorted in reverse if reverse is True.
+    """
+    higher_node = start_node
+    lower_node_dag_path = cmds.ls(end_node, long=True)[0].split("|")
+    if start_node not in lower_node_dag_path:
+        # End node is above the start node
+        higher_node = end_node
+        lower_node_dag_path = cmds.ls(start_node, long=True)[0].split("|")
+
+    all_nodes = lower_node_dag_path[lower_node_dag_path.index(higher_node) :]
     if reverse:
         all_nodes.sort(reverse=True)
 
@@ -44,7 +44,7 @@ from .rig_modules import root_module
 
 # Rigging Utilities
 from .data.module_types import ModuleType
-from .data import module_metadata
+from .data import module_graph, module_metadata
 
 # from .data import metadata_controller
 
@@ -76,6 +76,7 @@ reload(module_product_factories)
 reload(gui_factories)
 reload(bind_proxy_module)
 reload(module_metadata)
+reload(module_graph)
 reload(module_factory)
 
 
@@ -133,6 +134,10 @@ class VulcanRig(QMainWindow):
         # self.current_modules: Dict[
         #     QTreeWidgetItem, Dict[str, module_product_factories.ModuleProductFactory]
         # ] = {}
+        # Scene metanodes by name and module type, decoded once per session
+        self.metanode_registry = metadata_utils.get_metanode_registry()
+        # Rig modules and their relationships. The stack tree is a view of it.
+        self.module_graph = module_graph.ModuleGraph()
 
         # Final UI setup
         # Set up default UI settings
@@ -152,7 +157,7 @@ class VulcanRig(QMainWindow):
 
         # Gui stack factory
         self.gui_stack_factory = gui_factories.GuiStackFactory(
-            self.tree_stack, self.root.vb_details
+            self.tree_stack, self.root.vb_details, self.module_graph
         )
         # Create Module Factory
         self.module_factory = module_factory.ModuleFactory(self)
@@ -197,6 +202,7 @@ class VulcanRig(QMainWindow):
         tree_context_menu = QMenu()
         rename_module_action = QAction("Rename Module", self.tree_stack)
         delete_module_action = QAction("Delete Module", self.tree_stack)
+        export_recipe_action = QAction("Export Rig Recipe", self.tree_stack)
         debug_unlock_node_action = QAction("DEV - Unlock Node", self.tree_stack)
         debug_module_metadata_action = QAction(
             "DEV - Show Module Metadata", self.tree_stack
@@ -204,6 +210,9 @@ class VulcanRig(QMainWindow):
 
         rename_module_action.triggered.connect(clicked_module.rename_module)
         delete_module_action.triggered.connect(clicked_module.delete_module)
+        export_recipe_action.triggered.connect(
+            lambda: stack_handler.export_rig_recipe(self)
+        )
         debug_unlock_node_action.triggered.connect(
             lambda: self.trigger_dev_unlock_metanode(position)
         )
@@ -213,6 +222,7 @@ class VulcanRig(QMainWindow):
 
         tree_context_menu.addAction(rename_module_action)
         tree_context_menu.addAction(delete_module_action)
+        tree_context_menu.addAction(export_recipe_action)
         tree_context_menu.addAction(debug_unlock_node_action)
         tree_context_menu.addAction(debug_module_metadata_action)
 
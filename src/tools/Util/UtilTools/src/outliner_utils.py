@@ -8,8 +8,13 @@ from maya import cmds
 LOG = logging.getLogger(os.path.basename(__file__))
 
 
-def create_shot_tree() -> None:
-    """Create shot group nodes for organization."""
+def create_shot_tree(extra_group_names: list = None) -> None:
+    """Create shot group nodes for organization.
+
+    Args:
+        extra_group_names (list, optional): Additional group node names to create
+            along with the default shot groups. Defaults to None.
+    """
     group_names = [
         "ENV",
         "CHAR",
@@ -23,6 +28,10 @@ def create_shot_tree() -> None:
         "CAM",
         "VEH",
     ]
+    for group_name in extra_group_names or []:
+        if group_name not in group_names:
+            group_names.append(group_name)
+
     all_attributes = [".tx", ".ty", ".tz", ".rx", ".ry", ".rz", ".sx", ".sy", ".sz"]
 
     for group_node in group_names:
@@ -2,6 +2,7 @@
 """Various maya utility functions."""
 # Can't find PySide2 modules pylint: disable=I1101
 
+from contextlib import contextmanager
 import logging
 import os
 import re
@@ -115,3 +116,27 @@ def check_scene_for_joints():
         return False
 
     return True
+
+
+@contextmanager
+def suspend_scene_updates(suspend_undo: bool = True):
+    """Suspend viewport refresh and optionally undo recording for batch operations.
+
+    Previous undo state is restored on exit even if the batch operation fails.
+
+    Args:
+        suspend_undo (bool, optional): Whether to also stop recording undo.
+            Defaults to True.
+    """
+    undo_state = cmds.undoInfo(query=True, state=True)
+    cmds.refresh(suspend=True)
+    if suspend_undo:
+        cmds.undoInfo(stateWithoutFlush=False)
+
+    try:
+        yield
+    finally:
+        if suspend_undo:
+            cmds.undoInfo(stateWithoutFlush=undo_state)
+        cmds.refresh(suspend=False)
+        cmds.refresh(force=True)